@@ -0,0 +1,5 @@
+"""Benchmarks for the lamplight hot paths.
+
+Run from the ``lamplight`` project directory, e.g.
+``python -m benchmarks.bench_solr_client``.
+"""
@@ -0,0 +1,89 @@
+"""Reference parsing cost: the old inline regex vs ``bible.utilities.parser``.
+
+Before: ``search`` ran a backtracking ``findall`` over every query, phrases
+included.  After: phrases are ruled out by a character check and references
+go through anchored, precompiled patterns.
+
+    python -m benchmarks.bench_parser -n 20000
+    python -m benchmarks.bench_parser --queries queries.txt
+"""
+
+import argparse
+import re
+import time
+
+from bible.utilities import parser as reference_parser
+
+# the pattern search used to run inline
+OLD_RE = r"(\d*)[ ]*([\w\s]+)[ ]*(-?\d+)\:?(-?\d*)"
+
+# queries as they show up in the access logs, by class
+CORPUS = {
+    "reference": [
+        "Luke 1:28",
+        "luk1",
+        "1 John 3:16",
+        "1JOhn 3:16",
+        "song of songs 1:2",
+        "Luke 1:5-12",
+        "Jn 3.16",
+        "Luek 1:28",
+    ],
+    "list": [
+        "Luke 1:1; John 3:16",
+        "Mk 1:1-3; 2:4",
+        "Gen 1:1; Jn 1:1; 1 Jn 1:1",
+    ],
+    "phrase": [
+        "priestly",
+        "inasmuch",
+        "Do not be afraid, Zacharias",
+        "blessed among women",
+        "the house of David",
+        "in the sixth month the angel Gabriel was sent from God",
+        "for nothing will be impossible with God " * 8,
+    ],
+}
+
+
+def old_parse(query):
+    """What search did before: an uncompiled findall on every query.
+
+    It only returned the raw groups of the first match, so references cost
+    it less than the parser, which also builds the citations.
+    """
+    return re.findall(OLD_RE, query.strip()) or None
+
+
+def run(label, parse, queries, iterations):
+    """Time ``iterations`` passes over the queries; returns ns per query."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for query in queries:
+            parse(query)
+    elapsed = time.perf_counter() - start
+    return elapsed / (iterations * len(queries)) * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--iterations", type=int, default=20000)
+    parser.add_argument(
+        "--queries", help="File of queries, one per line, to time as one class"
+    )
+    args = parser.parse_args()
+
+    corpus = CORPUS
+    if args.queries:
+        with open(args.queries, encoding="utf-8") as queries:
+            corpus = {"file": [line.strip() for line in queries if line.strip()]}
+
+    print(f"{'class':<10} {'old ns/q':>10} {'new ns/q':>10} {'speedup':>8}")
+    for label, queries in corpus.items():
+        old = run(label, old_parse, queries, args.iterations)
+        new = run(label, reference_parser.parse, queries, args.iterations)
+        print(f"{label:<10} {old:10.0f} {new:10.0f} {old / new:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""Preloading before fork: memory per worker and time to first request.
+
+A master is started in a fresh interpreter the way gunicorn's
+``preload_app`` does it (the WSGI application built, the sample translation
+in fakeredis), optionally preloading the indexes with ``bible.preload``,
+and workers are forked from it one at a time.  Each worker times its first
+search from the moment it was forked, then serves a typeahead and a
+navigation request so every index has been used, and reports its private
+memory (USS, from ``/proc/self/smaps_rollup``): what one more worker costs.
+Linux only.
+
+    python -m benchmarks.bench_preload -w 4
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from urllib.parse import urlencode
+from wsgiref.util import setup_testing_defaults
+
+# the first request each worker serves, then the ones that load the rest
+FIRST = ("/ll/search/", {"q": "Luke 1:28"})
+THEN = [("/ll/suggest/", {"q": "lu"}), ("/ll/navigate/", {"q": "Luke 1:5"})]
+
+
+def memory_mb():
+    """Private (USS) and proportional (PSS) memory of this process in MiB."""
+    fields = {}
+    with open("/proc/self/smaps_rollup", encoding="ascii") as f:
+        for line in f:
+            name, _, value = line.partition(":")
+            if value.strip().endswith("kB"):
+                fields[name] = int(value.split()[0])
+    return {
+        "uss_mb": (fields["Private_Clean"] + fields["Private_Dirty"]) / 1024,
+        "pss_mb": fields["Pss"] / 1024,
+    }
+
+
+def call(application, path, params):
+    """Send one GET through the WSGI application and return its status code."""
+    environ = {"PATH_INFO": path, "QUERY_STRING": urlencode(params)}
+    setup_testing_defaults(environ)
+    statuses = []
+    b"".join(application(environ, lambda status, headers: statuses.append(status)))
+    return int(statuses[0].split()[0])
+
+
+def worker(application, forked, out):
+    """Serve a worker's first requests and write what it cost to ``out``."""
+    status = call(application, *FIRST)
+    first = time.perf_counter() - forked
+    statuses = [status] + [call(application, *request) for request in THEN]
+    sample = {
+        "first_request_ms": first * 1e3,
+        "errors": sum(status != 201 for status in statuses),
+        **memory_mb(),
+    }
+    os.write(out, json.dumps(sample).encode())
+
+
+def run_master(preloaded, workers):
+    """Act as the gunicorn master: load the app, fork workers, print samples."""
+    os.environ["DJANGO_SETTINGS_MODULE"] = "benchmarks.settings_api"
+    # pylint: disable=import-outside-toplevel
+    from django.core.wsgi import get_wsgi_application
+    from django_redis import get_redis_connection
+
+    from .bench_search import load_data
+
+    application = get_wsgi_application()
+    load_data(get_redis_connection("default"))
+    if preloaded:
+        from bible.preload import preload
+
+        preload()
+
+    samples = []
+    for _ in range(workers):
+        read, write = os.pipe()
+        forked = time.perf_counter()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read)
+            try:
+                worker(application, forked, write)
+            finally:
+                os._exit(0)  # pylint: disable=protected-access
+        os.close(write)
+        with os.fdopen(read, "rb") as pipe:
+            samples.append(json.loads(pipe.read()))
+        os.waitpid(pid, 0)
+    print(json.dumps(samples))
+
+
+def run_mode(preloaded, workers):
+    """
+    Start a master in a new interpreter and collect its workers' samples.
+
+    Returns:
+        dict: The median of each measurement over the workers
+    """
+    master = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_preload", "--master"]
+        + ["preload" if preloaded else "lazy", "-w", str(workers)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    samples = json.loads(master.stdout.strip().splitlines()[-1])
+    result = {
+        key: statistics.median(sample[key] for sample in samples)
+        for key in ("first_request_ms", "uss_mb", "pss_mb")
+    }
+    result["errors"] = sum(sample["errors"] for sample in samples)
+    return result
+
+
+def report(results):
+    """Print a table of results and what preloading saves per worker."""
+    print(f"{'mode':<8} {'first ms':>9} {'USS MiB':>8} {'PSS MiB':>8} {'errors':>6}")
+    for label, result in results.items():
+        print(
+            f"{label:<8} {result['first_request_ms']:9.1f} {result['uss_mb']:8.2f}"
+            f" {result['pss_mb']:8.2f} {result['errors']:6d}"
+        )
+    lazy, preloaded = results["lazy"], results["preload"]
+    print(
+        f"preloading saves {lazy['uss_mb'] - preloaded['uss_mb']:.2f} MiB per worker"
+        f" and {lazy['first_request_ms'] - preloaded['first_request_ms']:.1f} ms"
+        " on its first request"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "-w", "--workers", type=int, default=4, help="Workers forked per master"
+    )
+    parser.add_argument("--master", choices=["lazy", "preload"], help=argparse.SUPPRESS)
+    parser.add_argument("-o", "--output", help="Write the results as JSON")
+    args = parser.parse_args()
+
+    if args.master:
+        run_master(args.master == "preload", args.workers)
+        return
+
+    results = {
+        "lazy": run_mode(False, args.workers),
+        "preload": run_mode(True, args.workers),
+    }
+    report(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"workers": args.workers, "modes": results}, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
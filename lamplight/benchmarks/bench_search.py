@@ -0,0 +1,216 @@
+"""Benchmark of the /ll/search/ hot path against local stand-ins.
+
+The whole Django request/response cycle runs in-process against fakeredis
+(loaded by the real ingest scripts) and the stub Solr server, so it needs
+no Redis or Solr and times only our code.  For each query class it
+records latency percentiles, requests per second and the Redis commands
+and round trips each request costs.  The results can be saved as JSON and
+compared with an earlier run to catch regressions between commits:
+
+    python -m benchmarks.bench_search -o before.json
+    python -m benchmarks.bench_search --compare before.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import urlencode
+
+SCRIPTS = Path(__file__).resolve().parent.parent / "lamplight/scripts"
+
+# the query classes the endpoint sees
+QUERY_CLASSES = {
+    "reference": ["Luke 1:28", "luke 1:5", "Luke 1:80"],
+    "misspelled": ["Luek 1:28", "ulke 1:3", "lukr 1:46"],
+    "chapter": ["Luke 1"],
+    "range": ["Luke 1:5-12", "luk 1:46-55"],
+    "phrase": ["priestly", "Do not be afraid, Zacharias", "blessed among women"],
+}
+
+
+def percentile(timings, fraction):
+    """The given percentile of a sorted list of timings."""
+    if not timings:
+        return 0.0
+    return timings[min(len(timings) - 1, int(len(timings) * fraction))]
+
+
+def load_data(redis_conn):
+    """Load the sample translation with the ingest scripts."""
+    sys.path.insert(0, str(SCRIPTS))
+    import bible_to_redis  # pylint: disable=import-outside-toplevel,import-error
+    import version_to_redis  # pylint: disable=import-outside-toplevel,import-error
+
+    # the scripts report their progress, which would bury the results
+    with contextlib.redirect_stdout(io.StringIO()):
+        version_to_redis.csv_to_redis_hash(r=redis_conn)
+        bible_to_redis.csv_to_redis_hash(str(SCRIPTS / "bible.csv"), r=redis_conn)
+
+
+def run_class(client, counts, solr, queries, requests):
+    """Send ``requests`` searches cycling through ``queries``.
+
+    Returns:
+        dict: Request rate, latency percentiles (ms), Redis commands and round
+        trips per request, Solr queries per request and non-201 responses
+    """
+    from django.urls import reverse  # pylint: disable=import-outside-toplevel
+
+    urls = [f'{reverse("search")}?{urlencode({"q": query})}' for query in queries]
+    counts.clear()
+    solr_before = solr.requests
+    timings = []
+    errors = 0
+
+    start = time.perf_counter()
+    for i in range(requests):
+        sent = time.perf_counter()
+        response = client.get(urls[i % len(urls)])
+        timings.append(time.perf_counter() - sent)
+        if response.status_code != 201:
+            errors += 1
+    elapsed = time.perf_counter() - start
+
+    timings.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "rps": requests / elapsed,
+        "p50_ms": percentile(timings, 0.50) * 1e3,
+        "p95_ms": percentile(timings, 0.95) * 1e3,
+        "p99_ms": percentile(timings, 0.99) * 1e3,
+        "redis_commands": counts["commands"] / requests,
+        "redis_round_trips": counts["round_trips"] / requests,
+        "solr_queries": (solr.requests - solr_before) / requests,
+    }
+
+
+def git_revision():
+    """Short hash of the checked-out commit, if there is one."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def report(results, previous=None):
+    """Print a table of results, with the change in p50 against a previous run."""
+    print(
+        f"{'class':<11} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+        f" {'redis':>6} {'trips':>6} {'solr':>5}"
+        + (f" {'p50 vs prev':>12}" if previous else "")
+    )
+    for label, result in results.items():
+        line = (
+            f"{label:<11} {result['rps']:8.0f} {result['p50_ms']:8.3f}"
+            f" {result['p95_ms']:8.3f} {result['p99_ms']:8.3f}"
+            f" {result['redis_commands']:6.1f} {result['redis_round_trips']:6.1f}"
+            f" {result['solr_queries']:5.1f}"
+        )
+        before = (previous or {}).get(label)
+        if before:
+            change = (result["p50_ms"] / before["p50_ms"] - 1) * 100
+            line += f" {change:+11.1f}%"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "-n", "--requests", type=int, default=2000, help="Requests per query class"
+    )
+    parser.add_argument(
+        "-w", "--warmup", type=int, default=50, help="Untimed requests per class"
+    )
+    parser.add_argument(
+        "--cache", action="store_true", help="Leave the response cache on"
+    )
+    parser.add_argument(
+        "--solr-latency",
+        type=float,
+        default=0.0,
+        help="Seconds the stub Solr waits before answering",
+    )
+    parser.add_argument(
+        "--verse-store",
+        action="store_true",
+        help="Build the verse store and read verses from it instead of Redis",
+    )
+    parser.add_argument("-o", "--output", help="Write the results as JSON")
+    parser.add_argument("--compare", help="JSON results of an earlier run")
+    args = parser.parse_args()
+
+    os.environ["DJANGO_SETTINGS_MODULE"] = "benchmarks.settings"
+    import django  # pylint: disable=import-outside-toplevel
+
+    django.setup()
+
+    # pylint: disable=import-outside-toplevel
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.test import Client
+    from django_redis import get_redis_connection
+
+    from .stub_solr import StubSolr
+
+    solr = StubSolr(latency=args.solr_latency).start()
+    settings.SOLR = {**settings.SOLR, "URL": f"{solr.url}/verses/"}
+    settings.SEARCH_CACHE = {**settings.SEARCH_CACHE, "ENABLED": args.cache}
+    load_data(get_redis_connection("default"))
+    store_dir = tempfile.TemporaryDirectory()
+    settings.VERSE_STORE = {
+        "ENABLED": args.verse_store,
+        "PATH": os.path.join(store_dir.name, "{translation}.vs"),
+    }
+    if args.verse_store:
+        call_command("build_verse_store", stdout=io.StringIO())
+
+    client = Client()
+    results = {}
+    try:
+        for label, queries in QUERY_CLASSES.items():
+            run_class(client, settings.REDIS_COUNTS, solr, queries, args.warmup)
+            results[label] = run_class(
+                client, settings.REDIS_COUNTS, solr, queries, args.requests
+            )
+    finally:
+        solr.stop()
+        store_dir.cleanup()
+
+    previous = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)["classes"]
+    report(results, previous)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "revision": git_revision(),
+                    "python": platform.python_version(),
+                    "requests": args.requests,
+                    "cache": args.cache,
+                    "verse_store": args.verse_store,
+                    "classes": results,
+                },
+                f,
+                indent=4,
+            )
+
+
+if __name__ == "__main__":
+    main()
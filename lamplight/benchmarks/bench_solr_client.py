@@ -0,0 +1,77 @@
+"""Per-request overhead of a fresh pysolr client vs the shared pooled one.
+
+Before: ``search`` built ``pysolr.Solr(...)`` per request, so every query
+opened a new TCP connection.  After: ``bible.utilities.solr.get_solr``
+returns one client whose session keeps connections alive.
+
+    python -m benchmarks.bench_solr_client -n 2000 --threads 4
+"""
+
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pysolr
+
+from bible.utilities.solr import build_solr
+
+from .stub_solr import StubSolr
+
+PARAMS = {
+    "pf": "_text_^10",
+    "fl": "id,_text_",
+    "sort": "score desc",
+    "defType": "edismax",
+    "ps": 10,
+}
+
+
+def run(label, get_client, url, query, requests, threads):
+    """Time ``requests`` searches spread over ``threads`` threads."""
+
+    def one(_):
+        start = time.perf_counter()
+        get_client(url).search(query, **PARAMS)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        timings = sorted(pool.map(one, range(requests)))
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{label:<8} {requests / elapsed:9.0f} req/s"
+        f"  mean {statistics.mean(timings) * 1e3:7.3f} ms"
+        f"  p50 {timings[len(timings) // 2] * 1e3:7.3f} ms"
+        f"  p99 {timings[int(len(timings) * 0.99)] * 1e3:7.3f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("-q", "--query", default="priestly")
+    args = parser.parse_args()
+
+    server = StubSolr().start()
+    url = f"{server.url}/verses/"
+    pooled = build_solr(url, timeout=10, pool_size=args.threads)
+
+    try:
+        run(
+            "fresh",
+            lambda u: pysolr.Solr(u, timeout=10),
+            url,
+            args.query,
+            args.requests,
+            args.threads,
+        )
+        run("pooled", lambda u: pooled, url, args.query, args.requests, args.threads)
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
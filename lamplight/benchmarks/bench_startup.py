@@ -0,0 +1,188 @@
+"""Benchmark of worker startup: import time, time to first response and RSS.
+
+Each run is a fresh interpreter, the way a gunicorn worker comes up after
+``sudo systemctl restart gunicorn`` or when a new instance is added: it
+builds the WSGI application, then answers its first search through it.
+The sample translation is loaded into fakeredis in between, untimed, as a
+real worker finds it already in Redis.  Settings profiles are compared side
+by side, and the results can be saved and compared between commits:
+
+    python -m benchmarks.bench_startup -o before.json
+    python -m benchmarks.bench_startup --compare before.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from urllib.parse import urlencode
+
+# settings module behind each profile, with the benchmark's stand-ins
+PROFILES = {
+    "full": "benchmarks.settings",
+    "api": "benchmarks.settings_api",
+}
+
+# answered from Redis alone, so no Solr is needed
+QUERY = "Luke 1:28"
+
+METRICS = ["import_ms", "first_response_ms", "rss_mb", "modules"]
+
+
+def rss_mb():
+    """Resident set size of this process in MiB."""
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource  # pylint: disable=import-outside-toplevel
+
+    # peak rather than current, in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def start_worker(settings_module):
+    """Start a worker in this interpreter and print what it cost as JSON."""
+    start = time.perf_counter()
+    os.environ["DJANGO_SETTINGS_MODULE"] = settings_module
+    # pylint: disable=import-outside-toplevel
+    from django.core.wsgi import get_wsgi_application
+
+    application = get_wsgi_application()
+    imported = time.perf_counter() - start
+
+    from wsgiref.util import setup_testing_defaults
+
+    from django_redis import get_redis_connection
+
+    from .bench_search import load_data
+
+    load_data(get_redis_connection("default"))
+
+    environ = {"PATH_INFO": "/ll/search/", "QUERY_STRING": urlencode({"q": QUERY})}
+    setup_testing_defaults(environ)
+    statuses = []
+    sent = time.perf_counter()
+    response = application(environ, lambda status, headers: statuses.append(status))
+    b"".join(response)
+    first = time.perf_counter() - sent
+
+    print(
+        json.dumps(
+            {
+                "status": int(statuses[0].split()[0]),
+                "import_ms": imported * 1e3,
+                "first_response_ms": (imported + first) * 1e3,
+                "rss_mb": rss_mb(),
+                "modules": len(sys.modules),
+            }
+        )
+    )
+
+
+def run_profile(settings_module, runs):
+    """
+    Start ``runs`` workers one after the other, each in a new interpreter.
+
+    Returns:
+        dict: The median of each metric, and the non-201 first responses
+    """
+    samples = []
+    for _ in range(runs):
+        child = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_startup", "--worker"]
+            + [settings_module],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        samples.append(json.loads(child.stdout.strip().splitlines()[-1]))
+    result = {
+        metric: statistics.median(sample[metric] for sample in samples)
+        for metric in METRICS
+    }
+    result["errors"] = sum(sample["status"] != 201 for sample in samples)
+    return result
+
+
+def report(results, previous=None):
+    """Print a table of results, with the change in first response time."""
+    print(
+        f"{'profile':<8} {'import ms':>10} {'first ms':>10} {'rss MiB':>8}"
+        f" {'modules':>8} {'errors':>6}"
+        + (f" {'first vs prev':>14}" if previous else "")
+    )
+    for label, result in results.items():
+        line = (
+            f"{label:<8} {result['import_ms']:10.1f}"
+            f" {result['first_response_ms']:10.1f} {result['rss_mb']:8.1f}"
+            f" {result['modules']:8.0f} {result['errors']:6d}"
+        )
+        before = (previous or {}).get(label)
+        if before:
+            change = (
+                result["first_response_ms"] / before["first_response_ms"] - 1
+            ) * 100
+            line += f" {change:+13.1f}%"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "-n", "--runs", type=int, default=10, help="Workers started per profile"
+    )
+    parser.add_argument(
+        "--profile",
+        choices=sorted(PROFILES),
+        action="append",
+        help="Profile to measure (default: all)",
+    )
+    parser.add_argument("--worker", metavar="SETTINGS", help=argparse.SUPPRESS)
+    parser.add_argument("-o", "--output", help="Write the results as JSON")
+    parser.add_argument("--compare", help="JSON results of an earlier run")
+    args = parser.parse_args()
+
+    if args.worker:
+        start_worker(args.worker)
+        return
+
+    # pylint: disable=import-outside-toplevel
+    import platform
+
+    from .bench_search import git_revision
+
+    results = {
+        label: run_profile(PROFILES[label], args.runs)
+        for label in args.profile or PROFILES
+    }
+
+    previous = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)["profiles"]
+    report(results, previous)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "revision": git_revision(),
+                    "python": platform.python_version(),
+                    "runs": args.runs,
+                    "profiles": results,
+                },
+                f,
+                indent=4,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Typeahead cost: ``/ll/suggest/`` lookups, keystroke by keystroke.
+
+Each query is typed one character at a time, as the search box sends it,
+against the trie built from the sample translation in fakeredis.  Reports
+microseconds per lookup in the trie itself and per request through Django.
+
+    python -m benchmarks.bench_suggest -n 2000
+"""
+
+import argparse
+import os
+import time
+from urllib.parse import urlencode
+
+from .bench_search import load_data, percentile
+
+# what users type, by class
+TYPED = {
+    "book": ["genesis", "1 john", "song of songs", "rev"],
+    "misspelled": ["luek", "genisis", "deutoronomy"],
+    "reference": ["luke 1:28", "1 john 3:16", "lk 1:5"],
+    "phrase": ["as many", "the lord", "do not be afraid"],
+}
+
+
+def keystrokes(queries):
+    """Every prefix of every query, as typed."""
+    return [query[:end] for query in queries for end in range(1, len(query) + 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "-n", "--requests", type=int, default=2000, help="Requests per class"
+    )
+    args = parser.parse_args()
+
+    os.environ["DJANGO_SETTINGS_MODULE"] = "benchmarks.settings"
+    import django  # pylint: disable=import-outside-toplevel
+
+    django.setup()
+
+    # pylint: disable=import-outside-toplevel
+    from django.test import Client
+    from django.urls import reverse
+    from django_redis import get_redis_connection
+
+    from bible.utilities.suggest import get_suggestions
+    from bible.utilities.versification import get_versification
+
+    redis_conn = get_redis_connection("default")
+    load_data(redis_conn)
+    suggestions = get_suggestions(redis_conn, "nasb95")
+    versification = get_versification(redis_conn, "nasb95")
+    client = Client()
+
+    print(
+        f"{'class':<11} {'trie p50 us':>12} {'trie p99 us':>12} {'request p50 us':>15}"
+    )
+    for label, queries in TYPED.items():
+        typed = keystrokes(queries)
+        lookups = []
+        requests = []
+        for i in range(args.requests):
+            query = typed[i % len(typed)]
+            start = time.perf_counter()
+            suggestions.suggest(query, versification)
+            lookups.append(time.perf_counter() - start)
+
+            url = f'{reverse("suggest")}?{urlencode({"q": query})}'
+            start = time.perf_counter()
+            client.get(url)
+            requests.append(time.perf_counter() - start)
+        lookups.sort()
+        requests.sort()
+        print(
+            f"{label:<11} {percentile(lookups, 0.5) * 1e6:12.1f}"
+            f" {percentile(lookups, 0.99) * 1e6:12.1f}"
+            f" {percentile(requests, 0.5) * 1e6:15.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Closed-loop HTTP load test for the search endpoint.
+
+Runs the same query mix against one or more deployments so they can be
+compared like for like, e.g. sync WSGI vs ASGI gunicorn at the same
+worker count:
+
+    gunicorn -w 4 -b :8001 lamplight.wsgi:application
+    gunicorn -w 4 -b :8002 -k uvicorn.workers.UvicornWorker lamplight.asgi:application
+    python -m benchmarks.load_test wsgi=http://localhost:8001 asgi=http://localhost:8002
+"""
+
+import argparse
+import itertools
+import json
+import threading
+import time
+from urllib.parse import urlencode
+
+import requests
+
+# a mix of the query classes the endpoint sees
+QUERIES = [
+    "John 3:16",
+    "Luke 1:28",
+    "Luek 1:28",
+    "1 John 3:16",
+    "Luke 1",
+    "Luke 1:5-12",
+    "priestly",
+    "Do not be afraid, Zacharias",
+]
+
+
+def percentile(timings, fraction):
+    """The given percentile of a sorted list of timings."""
+    if not timings:
+        return 0.0
+    return timings[min(len(timings) - 1, int(len(timings) * fraction))]
+
+
+def load(base_url, path, queries, clients, duration):
+    """Hit one deployment with ``clients`` concurrent clients for ``duration``s.
+
+    Returns:
+        dict: Request rate, latency percentiles (ms) and error count
+    """
+    timings = []
+    errors = 0
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client(offset):
+        nonlocal errors
+        session = requests.Session()
+        mine = []
+        failed = 0
+        for query in itertools.islice(itertools.cycle(queries), offset, None):
+            if time.perf_counter() >= deadline:
+                break
+            start = time.perf_counter()
+            try:
+                response = session.get(
+                    f"{base_url}{path}?{urlencode({'q': query})}", timeout=30
+                )
+                if response.status_code >= 500:
+                    failed += 1
+            except requests.RequestException:
+                failed += 1
+            mine.append(time.perf_counter() - start)
+        with lock:
+            timings.extend(mine)
+            errors += failed
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    timings.sort()
+    return {
+        "requests": len(timings),
+        "errors": errors,
+        "rps": len(timings) / elapsed,
+        "p50_ms": percentile(timings, 0.50) * 1e3,
+        "p95_ms": percentile(timings, 0.95) * 1e3,
+        "p99_ms": percentile(timings, 0.99) * 1e3,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "targets", nargs="+", help="label=base_url, e.g. wsgi=http://localhost:8001"
+    )
+    parser.add_argument("--path", default="/ll/search/")
+    parser.add_argument("-c", "--clients", type=int, default=16)
+    parser.add_argument("-d", "--duration", type=float, default=30)
+    parser.add_argument("-o", "--output", help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    results = {}
+    for target in args.targets:
+        label, _, base_url = target.partition("=")
+        results[label] = load(
+            base_url.rstrip("/"), args.path, QUERIES, args.clients, args.duration
+        )
+
+    print(
+        f"{'':<10} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}"
+    )
+    for label, result in results.items():
+        print(
+            f"{label:<10} {result['rps']:9.0f} {result['p50_ms']:9.2f}"
+            f" {result['p95_ms']:9.2f} {result['p99_ms']:9.2f} {result['errors']:7d}"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
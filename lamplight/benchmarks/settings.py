@@ -0,0 +1,56 @@
+"""Settings for running the search endpoint in-process against stand-ins.
+
+Redis is an in-memory fakeredis server reached through a connection class
+that counts commands and round trips, and the database is SQLite.  Solr's
+URL is filled in once the stub server has picked a port.
+"""
+
+import threading
+from collections import Counter
+
+import fakeredis
+
+from lamplight.settings import *  # noqa: F401,F403 pylint: disable=wildcard-import,unused-wildcard-import
+
+FAKE_SERVER = fakeredis.FakeServer()
+
+# Redis traffic since the last reset, summed over every connection
+REDIS_COUNTS = Counter()
+_counts_lock = threading.Lock()
+
+
+class CountingConnection(fakeredis.FakeRedisConnection):
+    """fakeredis connection that counts commands and round trips."""
+
+    def send_command(self, *args, **kwargs):
+        with _counts_lock:
+            REDIS_COUNTS["commands"] += 1
+        super().send_command(*args, **kwargs)
+
+    def pack_commands(self, commands):
+        commands = list(commands)
+        with _counts_lock:
+            REDIS_COUNTS["commands"] += len(commands)
+        return super().pack_commands(commands)
+
+    def send_packed_command(self, command, check_health=True):
+        with _counts_lock:
+            REDIS_COUNTS["round_trips"] += 1
+        super().send_packed_command(command, check_health)
+
+
+SECRET_KEY = "benchmark"
+ALLOWED_HOSTS = ["*"]
+DATABASES = {"default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}}
+LOGGING = {"version": 1}
+
+for _alias in CACHES:
+    CACHES[_alias]["OPTIONS"]["CONNECTION_POOL_KWARGS"] = {
+        **CACHES[_alias]["OPTIONS"].get("CONNECTION_POOL_KWARGS", {}),
+        "connection_class": CountingConnection,
+        "server": FAKE_SERVER,
+    }
+
+# the benchmark measures the views; --cache turns the response cache back on
+SEARCH_CACHE = {**SEARCH_CACHE, "ENABLED": False}
+ASYNC_VIEWS = False
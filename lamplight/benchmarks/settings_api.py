@@ -0,0 +1,11 @@
+"""The benchmark stand-ins with the API-only profile of ``lamplight.settings_api``."""
+
+from lamplight import settings_api
+
+from .settings import *  # noqa: F401,F403 pylint: disable=wildcard-import,unused-wildcard-import
+
+INSTALLED_APPS = settings_api.INSTALLED_APPS
+MIDDLEWARE = settings_api.MIDDLEWARE
+ROOT_URLCONF = settings_api.ROOT_URLCONF
+TEMPLATES = settings_api.TEMPLATES
+DATABASES = settings_api.DATABASES
@@ -0,0 +1,170 @@
+"""A tiny in-process stand-in for the Solr verses collection.
+
+It answers ``/solr/<collection>/select`` with naive term-count scoring over
+the documents ``biblecsv_to_solrdoc.py`` emits, which is enough to exercise
+the client side of full-text search without a Solr/ZooKeeper stack.
+Update requests are recorded in ``posted``; subclasses can override
+``update`` to fail some of them.
+Grouped selects get one group per ``group.query``, whose ``{!... v=$param}``
+local params name the parameter holding the query text.
+"""
+
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+DEFAULT_DOCS = Path(__file__).resolve().parent.parent / "lamplight/scripts/bible.json"
+
+WORD_RE = re.compile(r"\w+")
+# the parameter a group.query takes its text from, as in {!edismax v=$bq0}
+LOCAL_VALUE_RE = re.compile(r"^\{![^}]*\bv=\$(\w+)[^}]*\}$")
+
+
+def load_docs(path=DEFAULT_DOCS):
+    """Load Solr documents from a JSON array or JSON Lines file."""
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    if text.lstrip().startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like Solr's jetty
+    disable_nagle_algorithm = True
+    wbufsize = -1  # send headers and body in one segment
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+    def _reply(self, body, status=200):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _params(self):
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        if body and self.headers.get("Content-Type", "").startswith(
+            "application/x-www-form-urlencoded"
+        ):
+            params.update(parse_qs(body.decode("utf-8")))
+        return url.path, params, body
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        path, params, body = self._params()
+        self.server.requests += 1
+        if path.endswith("/select") or path.endswith("/select/"):
+            self._reply(self.server.select(params))
+        elif "/update" in path:
+            error = self.server.update(body, params)
+            if error:
+                self._reply({"error": {"msg": error}}, status=500)
+            else:
+                self._reply({"responseHeader": {"status": 0, "QTime": 0}})
+        else:
+            self._reply({"error": {"msg": f"unknown path {path}"}}, status=404)
+
+    do_POST = do_GET
+
+
+class StubSolr(ThreadingHTTPServer):
+    """Threaded HTTP server holding an in-memory verses collection."""
+
+    daemon_threads = True
+
+    def __init__(self, docs=None, host="127.0.0.1", port=0, latency=0.0):
+        super().__init__((host, port), _Handler)
+        self.docs = load_docs() if docs is None else docs
+        self.latency = latency
+        self.requests = 0
+        self.updates = 0
+        self.posted = []
+        self._terms = [
+            (doc, [w.lower() for w in WORD_RE.findall(doc.get("_text_", ""))])
+            for doc in self.docs
+        ]
+        self._thread = None
+
+    @property
+    def url(self):
+        """Base Solr URL, e.g. ``http://127.0.0.1:8983/solr``."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/solr"
+
+    def select(self, params):
+        """Score every document against ``q`` and return the top ``rows``.
+
+        With ``group=true`` each ``group.query`` is scored instead, and its
+        top ``group.limit`` documents returned under ``grouped``.
+        """
+        if self.latency:
+            threading.Event().wait(self.latency)
+
+        if params.get("group", [""])[0] == "true":
+            limit = int(params.get("group.limit", ["1"])[0])
+            grouped = {}
+            for group in params.get("group.query", []):
+                match = LOCAL_VALUE_RE.match(group)
+                query = params.get(match[1], [""])[0] if match else group
+                hits, docs = self._search(query, limit)
+                grouped[group] = {
+                    "matches": hits,
+                    "doclist": {"numFound": hits, "start": 0, "docs": docs},
+                }
+            return {"responseHeader": {"status": 0, "QTime": 0}, "grouped": grouped}
+
+        query = params.get("q", [""])[0]
+        hits, docs = self._search(query, int(params.get("rows", ["10"])[0]))
+        return {
+            "responseHeader": {"status": 0, "QTime": 0},
+            "response": {"numFound": hits, "start": 0, "docs": docs},
+        }
+
+    def _search(self, query, rows):
+        """Number of matching documents and the top ``rows`` of them."""
+        words = [w.lower() for w in WORD_RE.findall(query)]
+        phrase = " ".join(words)
+
+        hits = []
+        for doc, terms in self._terms:
+            score = sum(terms.count(w) for w in words)
+            if score:
+                if phrase and phrase in " ".join(terms):
+                    score += 10
+                hits.append((score, -len(terms), doc))
+        hits.sort(key=lambda hit: (hit[0], hit[1]), reverse=True)
+
+        return len(hits), [dict(doc, score=score) for score, _, doc in hits[:rows]]
+
+    def update(self, body, params):
+        """Record a request to an update handler and count its documents.
+
+        Returns:
+            str: An error to answer with instead of success, or None
+        """
+        if not body:
+            return None
+        payload = json.loads(body)
+        self.posted.append((payload, params))
+        self.updates += len(payload) if isinstance(payload, list) else 1
+        return None
+
+    def start(self):
+        """Serve from a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and close the socket."""
+        self.shutdown()
+        self.server_close()
@@ -1,6 +1,7 @@
 """Bible app management"""
 
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class BibleConfig(AppConfig):
@@ -8,3 +9,11 @@ class BibleConfig(AppConfig):
 
     default_auto_field = "django.db.models.BigAutoField"
     name = "bible"
+
+    def ready(self):
+        # gunicorn's preload_app: build the indexes once, before forking
+        if getattr(settings, "BIBLE_PRELOAD", False):
+            # pylint: disable-next=import-outside-toplevel
+            from .preload import preload
+
+            preload()
@@ -0,0 +1,223 @@
+"""Response cache for hot search queries.
+
+Responses are cached per normalized query and translations in two tiers: a
+small per-worker LRU in front of the shared ``search`` django_redis cache.
+Keys include each translation's data revision, which the ingest scripts bump
+whenever they load new data, so a reload invalidates every cached response
+without having to find and delete them.  The revision is read from Redis on
+every request, one round trip, rather than from the worker's tables, which
+only recheck it every ``BIBLE_INDEX_REFRESH_SECONDS``.
+"""
+
+import asyncio
+import functools
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse, HttpResponseNotModified
+from django_redis import get_redis_connection
+
+from .translations import requested
+from .utilities import aio, revision
+
+
+class DataRevision(revision.RevisionedIndex):
+    """Tracks a translation's data revision; there is no table to load."""
+
+    def load(self, redis_conn):
+        pass
+
+
+class LocalLRU:
+    """Thread-safe, size-bounded LRU with a per-entry time to live."""
+
+    def __init__(self, size, timeout):
+        self.size = size
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value):
+        """Cache a value, evicting the least recently used entries."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+
+
+def _config():
+    return getattr(settings, "SEARCH_CACHE", {})
+
+
+_local = LocalLRU(_config().get("LOCAL_SIZE", 1024), _config().get("LOCAL_TIMEOUT", 60))
+
+
+def normalize(query):
+    """Canonical form of a query so trivially different spellings share a key."""
+    return " ".join(query.lower().split())
+
+
+def cache_key(query, translations, revisions):
+    """Cache key for a query against given revisions of its translations."""
+    digest = hashlib.sha1(normalize(query).encode("utf-8")).hexdigest()
+    versions = ",".join(
+        f"{translation}.{current}"
+        for translation, current in zip(translations, revisions)
+    )
+    return f"{versions}:{digest}"
+
+
+def _catch_up(translations, revisions):
+    """Have tables older than the revisions just read recheck them before use.
+
+    So the view builds its response from data at least as new as the
+    revision it is cached under.
+    """
+    for translation, current in zip(translations, revisions):
+        if revision.index_instance(DataRevision, translation).revision != current:
+            revision.expire(translation)
+
+
+def current_revisions(redis_conn, translations):
+    """
+    The data revision of each translation, read from Redis.
+
+    Returns:
+        list: Revisions in the order of ``translations``
+    """
+    pipe = redis_conn.pipeline(transaction=False)
+    for translation in translations:
+        pipe.hget(translation, revision.REVISION_FIELD)
+    revisions = pipe.execute()
+    _catch_up(translations, revisions)
+    return revisions
+
+
+async def current_revisions_async(translations):
+    """Async version of ``current_revisions``."""
+    async with aio.get_redis().pipeline(transaction=False) as pipe:
+        for translation in translations:
+            pipe.hget(translation, revision.REVISION_FIELD)
+        revisions = await pipe.execute()
+    _catch_up(translations, revisions)
+    return revisions
+
+
+def _respond(request, entry):
+    """Build the response for a cache entry, honouring If-None-Match."""
+    if request.headers.get("If-None-Match") == entry["etag"]:
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(
+            entry["body"], status=entry["status"], content_type="application/json"
+        )
+    response["ETag"] = entry["etag"]
+    response["Cache-Control"] = f"public, max-age={_config().get('MAX_AGE', 60)}"
+    return response
+
+
+def _lookup(key):
+    """Find a cached entry, in this worker first and then in Redis."""
+    entry = _local.get(key)
+    if entry is None:
+        entry = caches["search"].get(key)
+        if entry is not None:
+            _local.set(key, entry)
+    return entry
+
+
+def _entry(response):
+    """The cache entry for a response."""
+    body = response.content
+    return {
+        "status": response.status_code,
+        "body": body,
+        "etag": f'"{hashlib.sha1(body).hexdigest()[:20]}"',
+    }
+
+
+def _store(key, entry):
+    caches["search"].set(key, entry)
+    _local.set(key, entry)
+
+
+def cache_response(view):
+    """Serve successful search responses from the response cache.
+
+    Works for both sync and async views.
+    """
+
+    if asyncio.iscoroutinefunction(view):
+
+        @functools.wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            query = request.GET.get("q")
+            translations = requested(request)
+            if not query or not translations or not _config().get("ENABLED", True):
+                return await view(request, *args, **kwargs)
+
+            revisions = await current_revisions_async(translations)
+            key = cache_key(query, translations, revisions)
+
+            entry = _local.get(key)
+            if entry is None:
+                entry = await sync_to_async(_lookup)(key)
+            if entry is not None:
+                return _respond(request, entry)
+
+            response = await view(request, *args, **kwargs)
+            if response.status_code != 201:
+                return response
+
+            entry = _entry(response)
+            await sync_to_async(_store)(key, entry)
+            return _respond(request, entry)
+
+        return async_wrapper
+
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        query = request.GET.get("q")
+        translations = requested(request)
+        if not query or not translations or not _config().get("ENABLED", True):
+            return view(request, *args, **kwargs)
+
+        revisions = current_revisions(get_redis_connection("default"), translations)
+        key = cache_key(query, translations, revisions)
+
+        entry = _lookup(key)
+        if entry is not None:
+            return _respond(request, entry)
+
+        response = view(request, *args, **kwargs)
+        if response.status_code != 201:
+            return response
+
+        entry = _entry(response)
+        _store(key, entry)
+        return _respond(request, entry)
+
+    return wrapper
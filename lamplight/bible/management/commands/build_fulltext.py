@@ -0,0 +1,70 @@
+"""Build a translation's embedded full-text index from its Solr documents."""
+
+import json
+import os
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django_redis import get_redis_connection
+
+from bible.translations import default
+from bible.utilities.fulltext import index_path, write_index
+from bible.utilities.revision import REVISION_FIELD
+
+
+def iter_docs(path):
+    """Documents from a JSON array or JSON Lines file, or stdin for '-'."""
+    source = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+    with source:
+        first = source.read(1)
+        while first.isspace():
+            first = source.read(1)
+        if first == "[":
+            yield from json.loads(first + source.read())
+            return
+        for line in [first + source.readline(), *source]:
+            if line.strip():
+                yield json.loads(line)
+
+
+class Command(BaseCommand):
+    help = (
+        "Build the embedded full-text index for a translation from the "
+        "documents biblecsv_to_solrdoc.py emits (JSON array or JSON Lines)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("docs", help="Solr documents file, or - for stdin")
+        parser.add_argument(
+            "--translation",
+            default=None,
+            help="Translation prefix of the documents to index (default: the "
+            "default translation)",
+        )
+        parser.add_argument(
+            "--no-bump",
+            action="store_true",
+            help="Don't bump the translation's revision, so workers keep the old "
+            "index until their next reload",
+        )
+
+    def handle(self, *args, **options):
+        translation = options["translation"] or default()
+        path = index_path(translation)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        try:
+            docs = (
+                doc
+                for doc in iter_docs(options["docs"])
+                if doc["id"].startswith(f"{translation}:")
+            )
+            count = write_index(docs, path)
+        except (OSError, ValueError, KeyError) as e:
+            raise CommandError(f"Could not build the index: {e}") from e
+
+        if not options["no_bump"]:
+            # workers reopen the file once the revision moves
+            get_redis_connection("default").hincrby(translation, REVISION_FIELD, 1)
+
+        self.stdout.write(f"Indexed {count} documents into {path}")
@@ -0,0 +1,90 @@
+"""Build a translation's memory-mapped verse store from the text in Redis."""
+
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django_redis import get_redis_connection
+
+from bible.translations import default
+from bible.utilities.books import BookIndex
+from bible.utilities.revision import REVISION_FIELD, TEXT_REVISION_FIELD
+from bible.utilities.versestore import store_path, write_store
+
+
+def read_books(redis_conn, translation):
+    """
+    Every loaded chapter of a translation, read from its chapter hashes.
+
+    Returns:
+        list: ``(code, chapters)`` pairs in canonical order, as ``write_store``
+        takes them
+    """
+    pipe = redis_conn.pipeline(transaction=False)
+    pipe.lrange(f"{translation}:canon", 0, -1)
+    pipe.hgetall(f"{translation}:versification")
+    canon, counts = pipe.execute()
+
+    # books missing from the canon go last rather than being dropped
+    loaded = {field for field in counts if ":" not in field}
+    codes = [code for code in canon if code in loaded]
+    codes += sorted(loaded.difference(codes))
+
+    pipe = redis_conn.pipeline(transaction=False)
+    for code in codes:
+        for chapter in range(1, int(counts[code]) + 1):
+            pipe.hgetall(f"{translation}:{code}:{chapter}:verses")
+    replies = iter(pipe.execute())
+    return [
+        (
+            code,
+            [
+                {int(num): text for num, text in next(replies).items()}
+                for _ in range(int(counts[code]))
+            ],
+        )
+        for code in codes
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Build the memory-mapped verse store for a translation from the "
+        "verses loaded into Redis by bible_to_redis.py."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--translation",
+            default=None,
+            help="Translation prefix to build (default: the default translation)",
+        )
+
+    def handle(self, *args, **options):
+        translation = options["translation"] or default()
+        path = store_path(translation)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        redis_conn = get_redis_connection("default")
+        # read before the text: ingest bumps it after writing, so the store
+        # can only ever be stamped older than what it holds, never newer
+        revision = int(redis_conn.hget(translation, TEXT_REVISION_FIELD) or 0)
+        books = read_books(redis_conn, translation)
+        if not books:
+            raise CommandError(f"No verses loaded for {translation}")
+
+        index = BookIndex(translation)
+        index.load(redis_conn)
+        try:
+            count = write_store(books, path, revision, titles=index.titles)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Could not build the store: {e}") from e
+        # workers reopen the file once the revision moves
+        redis_conn.hincrby(translation, REVISION_FIELD, 1)
+
+        if int(redis_conn.hget(translation, TEXT_REVISION_FIELD) or 0) != revision:
+            self.stderr.write(
+                f"{translation} was reloaded while the store was built, so "
+                "workers will ignore it; run build_verse_store again"
+            )
+
+        self.stdout.write(f"Stored {count} verses of {translation} in {path}")
@@ -0,0 +1,49 @@
+"""Middleware for the Bible app."""
+
+import asyncio
+import time
+
+from django.utils.decorators import sync_and_async_middleware
+
+from .utilities import metrics
+
+
+def _finish(request, response, timings):
+    """Report a request's timings in its headers and the worker totals."""
+    total = time.perf_counter() - timings.start
+    match = getattr(request, "resolver_match", None)
+    view = match.url_name if match and match.url_name else "unmatched"
+    metrics.registry.add_request(view, response.status_code, total)
+    response["Server-Timing"] = timings.server_timing(total)
+    return response
+
+
+@sync_and_async_middleware
+def request_metrics(get_response):
+    """Time each request and the Redis, Solr, parse and serialize work in it.
+
+    Runs natively in both sync and async stacks, so it never costs the
+    async search view a thread hop.
+    """
+
+    if asyncio.iscoroutinefunction(get_response):
+
+        async def async_middleware(request):
+            timings, token = metrics.begin_request()
+            try:
+                response = await get_response(request)
+            finally:
+                metrics.end_request(token)
+            return _finish(request, response, timings)
+
+        return async_middleware
+
+    def middleware(request):
+        timings, token = metrics.begin_request()
+        try:
+            response = get_response(request)
+        finally:
+            metrics.end_request(token)
+        return _finish(request, response, timings)
+
+    return middleware
@@ -0,0 +1,74 @@
+"""Build the search path's read-only state before gunicorn forks.
+
+With ``preload_app`` gunicorn loads the application once in the master and
+forks the workers from it.  Everything built here (the URLconf and views,
+and each translation's book index, versification, typeahead trie, verse
+store mapping and, when used, embedded full-text index) is then inherited
+by every worker and shared copy-on-write instead of being rebuilt after
+fork, so workers start smaller and their first requests skip the loading.
+
+The tables follow their translation's revision as usual, so a worker still
+reloads one once new data is ingested.
+"""
+
+import gc
+import logging
+import time
+
+from django.conf import settings
+from django.urls import get_resolver
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+
+from .cache import DataRevision
+from .utilities import solr
+from .utilities.books import BookIndex
+from .utilities.fulltext import LocalFullText
+from .utilities.revision import get_index
+from .utilities.suggest import Suggestions
+from .utilities.versestore import LocalVerseStore
+from .utilities.versification import Versification
+
+logger = logging.getLogger(__name__)
+
+# tables every worker builds on its first requests
+TABLES = [DataRevision, BookIndex, Versification, Suggestions, LocalVerseStore]
+
+
+def preload():
+    """
+    Build every translation's tables and import the request path.
+
+    Redis being unreachable is logged rather than raised, and the workers
+    then build their tables on first use as without preloading.  Finally
+    the collector is told to leave everything built so far alone
+    (``gc.freeze``), so it doesn't write to the shared pages either.
+
+    Returns:
+        float: Seconds spent
+    """
+    start = time.perf_counter()
+    get_resolver().url_patterns  # pylint: disable=expression-not-assigned
+
+    tables = list(TABLES)
+    mode = solr.fulltext_config()["MODE"]
+    if mode != "local":
+        solr.TimedSolr  # pylint: disable=pointless-statement
+    if mode != "solr":
+        tables.append(LocalFullText)
+
+    redis_conn = get_redis_connection("default")
+    try:
+        for translation in settings.BIBLE_TRANSLATIONS:
+            for table in tables:
+                get_index(table, redis_conn, translation)
+    except RedisError:
+        logger.warning("Could not preload the bible indexes", exc_info=True)
+    finally:
+        # sockets must not be shared with the workers
+        redis_conn.connection_pool.disconnect()
+
+    gc.freeze()
+    seconds = time.perf_counter() - start
+    logger.info("Preloaded the bible indexes in %.0f ms", seconds * 1e3)
+    return seconds
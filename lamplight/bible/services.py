@@ -0,0 +1,742 @@
+"""Verse lookup and full-text search, shared by the search endpoints.
+
+The views deal with HTTP: reading parameters, status codes and
+serializing.  Everything between a parsed query and the verse dicts in a
+response lives here, so ``search``, ``search_async`` and ``batch`` answer
+a query the same way.
+"""
+
+import logging
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+from .cache import DataRevision, LocalLRU
+from .utilities import aio, metrics, parser, solr
+from .utilities.books import get_book_index
+from .utilities.fulltext import LocalFullText, get_local_fulltext
+from .utilities.navigation import adjacent_chapter, shift, span
+from .utilities.revision import get_index
+from .utilities.versestore import LocalVerseStore, get_verse_store
+from .utilities.versification import get_versification
+
+logger = logging.getLogger(__name__)
+
+SOLR_PARAMS = {
+    "pf": "_text_^10",  # boost exact phrase matches higher
+    "fl": "id,_text_",  # Fields to return
+    "sort": "score desc",  # Optional sorting
+    "defType": "edismax",  # query parser to use
+    "ps": 10,  # phrase slop: only exact phrases get the boost
+}
+
+# results per full-text query, Solr's default
+SOLR_ROWS = 10
+
+
+def _navigation_config():
+    return getattr(settings, "NAVIGATION", {})
+
+
+# the worker's chapter cache for navigation, and the thread that fills it
+# ahead of the reader
+_chapters = LocalLRU(
+    _navigation_config().get("CACHE_SIZE", 512),
+    _navigation_config().get("CACHE_TIMEOUT", 300),
+)
+_prefetcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+
+# a validated reference; first and last are None for a whole chapter
+Reference = namedtuple("Reference", "book chapter first last")
+
+# one query of a batch: its references, None if it is full text or they don't
+# exist, and whether its book matched exactly (so it is never full text)
+Planned = namedtuple("Planned", "refs exact")
+
+
+def locate(books, versification, citations):
+    """Check parsed references against the in-memory indexes, with no I/O.
+
+    Returns:
+        tuple: ``(references, exact)``; references is None if any of them
+        doesn't exist, exact is False if a book name only matched fuzzily
+    """
+    refs = []
+    exact = True
+    for citation in citations:
+        book = books.resolve(citation.book, fuzzy=False)
+        if book is None:
+            exact = False
+            book = books.resolve(citation.book)
+
+        # reject anything outside the versification without any I/O
+        chapter = citation.chapter
+        if not book or not 1 <= chapter <= versification.chapters(book):
+            return None, exact
+        if citation.first is None:
+            refs.append(Reference(book, chapter, None, None))
+            continue
+
+        last = min(citation.last, versification.verses(book, chapter))
+        if not 1 <= citation.first <= last:
+            return None, exact
+        refs.append(Reference(book, chapter, citation.first, last))
+    return refs, exact
+
+
+def read_references(redis_conn, refs, translations):
+    """Read references in every translation, from the verse stores if possible.
+
+    Returns:
+        list: For each reference, one list of ``(verse, text)`` pairs per
+        translation, the primary translation first
+    """
+    stores = _stores(get_verse_store(redis_conn, t) for t in translations)
+    if stores:
+        return _read_references(stores, refs)
+    pipe = redis_conn.pipeline(transaction=False)
+    converters = _queue_references(pipe, refs, translations)
+    return _convert(converters, pipe.execute(), len(translations))
+
+
+async def read_references_async(aredis, refs, translations):
+    """Async version of ``read_references``."""
+    stores = await _stores_async(translations)
+    if stores:
+        return _read_references(stores, refs)
+    async with aredis.pipeline(transaction=False) as pipe:
+        converters = _queue_references(pipe, refs, translations)
+        replies = await pipe.execute()
+    return _convert(converters, replies, len(translations))
+
+
+def read_fragments(redis_conn, refs, translation):
+    """The pre-rendered JSON of references' verses in one translation.
+
+    Read from the verse store if it is usable, otherwise from the ``:json``
+    hashes ``bible_to_redis.py`` writes next to the text.
+
+    Returns:
+        bytes: The comma-separated verse objects of a response's ``data``,
+        or None if a reference has none (it doesn't exist, or was loaded
+        before verses were pre-rendered) and ``read_references`` should
+        answer instead
+    """
+    store = get_verse_store(redis_conn, translation)
+    if store:
+        return _store_fragments(store, refs)
+    pipe = redis_conn.pipeline(transaction=False)
+    converters = _queue_fragments(pipe, refs, translation)
+    return _join_fragments(converters, pipe.execute())
+
+
+async def read_fragments_async(aredis, refs, translation):
+    """Async version of ``read_fragments``."""
+    store = (await aio.get_index(LocalVerseStore, translation)).store
+    if store:
+        return _store_fragments(store, refs)
+    async with aredis.pipeline(transaction=False) as pipe:
+        converters = _queue_fragments(pipe, refs, translation)
+        replies = await pipe.execute()
+    return _join_fragments(converters, replies)
+
+
+def reference_verses(books, refs, translations, found):
+    """The verse dicts of a reference lookup.
+
+    Args:
+        found (list): For each reference, ``(verse, text)`` pairs per
+            translation, the primary translation first
+    """
+    data = []
+    for ref, ref_found in zip(refs, found):
+        title = books.title(ref.book)
+        others = [dict(verses) for verses in ref_found]
+        for num, text in ref_found[0]:
+            verse = {
+                "book": title,
+                "chapter": ref.chapter,
+                "verse": num,
+                "text": text,
+            }
+            if len(translations) > 1:
+                verse["translations"] = {
+                    translation: texts.get(num)
+                    for translation, texts in zip(translations, others)
+                }
+            data.append(verse)
+    return data
+
+
+def hydrate(redis_conn, books, verse_ids, translations):
+    """Verse dicts for full-text results (``nasb95:luk:1:1`` ids)."""
+    stores = _stores(get_verse_store(redis_conn, t) for t in translations)
+    if stores:
+        texts = _read_hydrate(stores, verse_ids)
+    else:
+        pipe = redis_conn.pipeline(transaction=False)
+        _queue_hydrate(pipe, verse_ids, translations)
+        texts = pipe.execute()
+    return _hydrate(books, verse_ids, translations, texts)
+
+
+async def hydrate_async(aredis, books, verse_ids, translations):
+    """Async version of ``hydrate``."""
+    stores = await _stores_async(translations)
+    if stores:
+        texts = _read_hydrate(stores, verse_ids)
+    else:
+        async with aredis.pipeline(transaction=False) as pipe:
+            _queue_hydrate(pipe, verse_ids, translations)
+            texts = await pipe.execute()
+    return _hydrate(books, verse_ids, translations, texts)
+
+
+def hydrate_fragments(redis_conn, verse_ids, translation):
+    """The pre-rendered JSON of full-text results in one translation.
+
+    Returns:
+        bytes: As ``read_fragments``, None if any verse has no JSON
+    """
+    store = get_verse_store(redis_conn, translation)
+    if store:
+        return _store_hydrate_fragments(store, verse_ids)
+    pipe = redis_conn.pipeline(transaction=False)
+    _queue_hydrate(pipe, verse_ids, [translation], "json")
+    return _join_fragments([_single] * len(verse_ids), pipe.execute())
+
+
+async def hydrate_fragments_async(aredis, verse_ids, translation):
+    """Async version of ``hydrate_fragments``."""
+    store = (await aio.get_index(LocalVerseStore, translation)).store
+    if store:
+        return _store_hydrate_fragments(store, verse_ids)
+    async with aredis.pipeline(transaction=False) as pipe:
+        _queue_hydrate(pipe, verse_ids, [translation], "json")
+        replies = await pipe.execute()
+    return _join_fragments([_single] * len(verse_ids), replies)
+
+
+def full_text(redis_conn, query, translation):
+    """Full-text results from Solr or the local engine, per ``FULLTEXT["MODE"]``.
+
+    In ``fallback`` mode a Solr error or a response slower than the budget
+    counts against Solr's circuit breaker, and the local engine answers
+    while the breaker is open.
+    """
+    mode = solr.fulltext_config()["MODE"]
+    if mode == "local":
+        return _local_search(get_local_fulltext(redis_conn, translation), query)
+
+    breaker = solr.get_breaker()
+    if mode == "fallback" and not breaker.allow():
+        return _local_search(get_local_fulltext(redis_conn, translation), query)
+
+    start = time.perf_counter()
+    try:
+        results = solr.get_solr().search(query, **_solr_params(translation))
+    except solr.SolrError:
+        if mode != "fallback":
+            raise
+        logger.warning("Solr failed, answering from the local index", exc_info=True)
+        breaker.record(False)
+        return _local_search(get_local_fulltext(redis_conn, translation), query)
+    except BaseException:
+        # not Solr's fault, but a half-open trial must still be handed back
+        if mode == "fallback":
+            breaker.release()
+        raise
+
+    if mode == "fallback":
+        breaker.record(time.perf_counter() - start <= solr.budget())
+    return results
+
+
+async def full_text_async(query, translation):
+    """Async version of ``full_text``."""
+    mode = solr.fulltext_config()["MODE"]
+    if mode == "local":
+        local = await aio.get_index(LocalFullText, translation)
+        return _local_search(local.index, query)
+
+    breaker = solr.get_breaker()
+    if mode == "fallback" and not breaker.allow():
+        local = await aio.get_index(LocalFullText, translation)
+        return _local_search(local.index, query)
+
+    start = time.perf_counter()
+    try:
+        results = await aio.solr_search(query, _solr_params(translation))
+    except aio.HTTPError:
+        if mode != "fallback":
+            raise
+        logger.warning("Solr failed, answering from the local index", exc_info=True)
+        breaker.record(False)
+        local = await aio.get_index(LocalFullText, translation)
+        return _local_search(local.index, query)
+    except BaseException:
+        # including the CancelledError of a search a reference answered
+        if mode == "fallback":
+            breaker.release()
+        raise
+
+    if mode == "fallback":
+        breaker.record(time.perf_counter() - start <= solr.budget())
+    return results
+
+
+def full_text_many(redis_conn, queries, translation):
+    """Full-text results for several queries, in one Solr request.
+
+    Each query is a ``group.query`` of a single grouped select, so Solr
+    ranks them all in one round trip; the local engine just runs them one
+    after the other.  Modes and the circuit breaker work as in ``full_text``.
+
+    Returns:
+        dict: Query to its documents
+    """
+    if not queries:
+        return {}
+
+    mode = solr.fulltext_config()["MODE"]
+    if mode == "local" or (mode == "fallback" and not solr.get_breaker().allow()):
+        index = get_local_fulltext(redis_conn, translation)
+        return {query: _local_search(index, query) for query in queries}
+
+    groups = [f"{{!edismax v=$bq{i}}}" for i in range(len(queries))]
+    params = {
+        **_solr_params(translation),
+        "group": "true",
+        "group.query": groups,
+        "group.limit": SOLR_ROWS,
+        **{f"bq{i}": query for i, query in enumerate(queries)},
+    }
+    start = time.perf_counter()
+    try:
+        grouped = solr.get_solr().search("*:*", **params).grouped
+    except solr.SolrError:
+        if mode != "fallback":
+            raise
+        logger.warning("Solr failed, answering from the local index", exc_info=True)
+        solr.get_breaker().record(False)
+        index = get_local_fulltext(redis_conn, translation)
+        return {query: _local_search(index, query) for query in queries}
+    except BaseException:
+        if mode == "fallback":
+            solr.get_breaker().release()
+        raise
+
+    if mode == "fallback":
+        solr.get_breaker().record(time.perf_counter() - start <= solr.budget())
+    return {
+        query: grouped.get(group, {}).get("doclist", {}).get("docs", [])
+        for query, group in zip(queries, groups)
+    }
+
+
+def batch(redis_conn, queries, translations):
+    """Answer many queries at once, each as ``/search/`` would.
+
+    Duplicates are answered once.  References are checked in memory, every
+    full-text query goes to Solr in a single multi-query, and all the verses
+    are then read in one pipeline (or from the verse stores).  A query whose
+    book only matched fuzzily is also searched as full text, and those
+    results are used if the reference turns out not to exist.
+
+    Returns:
+        list: ``{"q", "status", "data"}`` per query, in input order, the
+        status being the one ``/search/`` would answer with
+    """
+    primary = translations[0]
+    books = get_book_index(redis_conn, primary)
+    versification = get_versification(redis_conn, primary)
+
+    plans = {}
+    for query in dict.fromkeys(queries):
+        with metrics.timed("parse"):
+            citations = parser.parse(query)
+        if not citations:
+            plans[query] = Planned(None, False)
+            continue
+        plans[query] = Planned(*locate(books, versification, citations))
+
+    texts = full_text_many(
+        redis_conn,
+        [query for query, plan in plans.items() if not plan.exact],
+        primary,
+    )
+    verse_ids = list(
+        dict.fromkeys(doc["id"] for docs in texts.values() for doc in docs)
+    )
+    refs = list(
+        dict.fromkeys(ref for plan in plans.values() for ref in plan.refs or [])
+    )
+
+    stores = _stores(get_verse_store(redis_conn, t) for t in translations)
+    if stores:
+        found = _read_references(stores, refs)
+        hydrated = _read_hydrate(stores, verse_ids)
+    else:
+        pipe = redis_conn.pipeline(transaction=False)
+        converters = _queue_references(pipe, refs, translations)
+        _queue_hydrate(pipe, verse_ids, translations)
+        replies = pipe.execute()
+        found = _convert(converters, replies[: len(converters)], len(translations))
+        hydrated = replies[len(converters) :]
+    found = dict(zip(refs, found))
+    verses = dict(zip(verse_ids, _hydrate(books, verse_ids, translations, hydrated)))
+
+    answers = {}
+    for query, plan in plans.items():
+        if plan.refs and all(found[ref][0] for ref in plan.refs):
+            data = reference_verses(
+                books, plan.refs, translations, [found[ref] for ref in plan.refs]
+            )
+            answers[query] = {"q": query, "status": 201, "data": data}
+        elif plan.exact:
+            answers[query] = {"q": query, "status": 404, "data": []}
+        else:
+            data = [verses[doc["id"]] for doc in texts[query]]
+            answers[query] = {"q": query, "status": 201, "data": data}
+    return [answers[query] for query in queries]
+
+
+def navigate(redis_conn, books, versification, ref, window, translations):
+    """Verses around a reference, and where the previous and next pages are.
+
+    A whole chapter comes back as is, between the chapters before and after
+    it.  Verses come back with ``window`` more on either side, across
+    chapters and books, between the verses just before and after them.
+    Chapters are read through the worker's chapter cache, and the chapters
+    either side are then prefetched into it in the background, so the next
+    page turn is answered from memory.
+
+    Returns:
+        dict: ``data``, the verse dicts, and ``prev`` and ``next``, the
+        locations to move to (see ``location``), None at the ends of the canon
+    """
+    if ref.first is None:
+        count = versification.verses(ref.book, ref.chapter)
+        segments = [(ref.book, ref.chapter, 1, count)]
+        before = adjacent_chapter(books, versification, ref.book, ref.chapter, -1)
+        after = adjacent_chapter(books, versification, ref.book, ref.chapter)
+    else:
+        first = (ref.book, ref.chapter, ref.first)
+        last = (ref.book, ref.chapter, ref.last)
+        segments = span(
+            books,
+            versification,
+            shift(books, versification, *first, -window),
+            shift(books, versification, *last, window),
+        )
+        before = shift(books, versification, *first, -1)
+        after = shift(books, versification, *last, 1)
+        before = None if before == first else before
+        after = None if after == last else after
+
+    chapters = list(dict.fromkeys(segment[:2] for segment in segments))
+    found = read_chapters(redis_conn, chapters, translations)
+    parts = [Reference(*segment) for segment in segments]
+    data = reference_verses(
+        books,
+        parts,
+        translations,
+        [
+            [
+                [(num, text) for num, text in verses if part.first <= num <= part.last]
+                for verses in found[part.book, part.chapter]
+            ]
+            for part in parts
+        ],
+    )
+
+    prefetch_chapters(
+        redis_conn,
+        [
+            chapter
+            for chapter in (
+                adjacent_chapter(books, versification, *chapters[0], -1),
+                adjacent_chapter(books, versification, *chapters[-1]),
+            )
+            if chapter
+        ],
+        translations,
+    )
+    return {
+        "data": data,
+        "prev": before and location(books, *before),
+        "next": after and location(books, *after),
+    }
+
+
+def location(books, book, chapter, verse=None):
+    """A place to navigate to, with the query that leads there."""
+    place = {"book": books.title(book), "chapter": chapter}
+    query = f"{place['book']} {chapter}"
+    if verse is not None:
+        place["verse"] = verse
+        query += f":{verse}"
+    place["q"] = query
+    return place
+
+
+def read_chapters(redis_conn, chapters, translations):
+    """Whole chapters in every translation, through the worker's chapter cache.
+
+    The verse stores are read directly when they are usable.  Otherwise
+    chapters come from the cache, keyed on the translations' revisions so a
+    reload is never served stale, and the rest from Redis in one pipeline.
+
+    Args:
+        chapters (list): ``(book, chapter)`` pairs
+
+    Returns:
+        dict: ``(book, chapter)`` to one list of ``(verse, text)`` pairs per
+        translation, the primary translation first
+    """
+    refs = [Reference(book, chapter, None, None) for book, chapter in chapters]
+    stores = _stores(get_verse_store(redis_conn, t) for t in translations)
+    if stores:
+        return dict(zip(chapters, _read_references(stores, refs)))
+
+    revisions = tuple(
+        get_index(DataRevision, redis_conn, t).revision for t in translations
+    )
+    found = {}
+    missing = []
+    for ref in refs:
+        verses = _chapters.get((tuple(translations), revisions, ref[:2]))
+        if verses is None:
+            missing.append(ref)
+        else:
+            found[ref[:2]] = verses
+    if missing:
+        pipe = redis_conn.pipeline(transaction=False)
+        converters = _queue_references(pipe, missing, translations)
+        read = _convert(converters, pipe.execute(), len(translations))
+        for ref, verses in zip(missing, read):
+            _chapters.set((tuple(translations), revisions, ref[:2]), verses)
+            found[ref[:2]] = verses
+    return found
+
+
+def prefetch_chapters(redis_conn, chapters, translations):
+    """Read chapters into the worker's chapter cache in the background.
+
+    Nothing is prefetched when ``NAVIGATION["PREFETCH"]`` is off or the
+    verse stores already hold every translation in memory.
+
+    Returns:
+        Future: The prefetch, or None if there is nothing to do
+    """
+    if not chapters or not _navigation_config().get("PREFETCH", True):
+        return None
+    if _stores(get_verse_store(redis_conn, t) for t in translations):
+        return None
+    return _prefetcher.submit(_prefetch, redis_conn, chapters, translations)
+
+
+def _prefetch(redis_conn, chapters, translations):
+    """Run ``read_chapters`` for its side effect, logging instead of raising."""
+    try:
+        read_chapters(redis_conn, chapters, translations)
+    except Exception:  # pylint: disable=broad-except
+        logger.warning("Could not prefetch %s", chapters, exc_info=True)
+
+
+def _local_search(index, query):
+    """Rank verses with the embedded engine, timed as full-text search."""
+    if index is None:
+        logger.error("No local full-text index; build it with build_fulltext")
+        return []
+    with metrics.timed("fulltext"):
+        return index.search(query or "", rows=SOLR_ROWS)
+
+
+def _solr_params(translation):
+    """Full-text query parameters, restricted to one translation's documents."""
+    return {**SOLR_PARAMS, "fq": f"id:{translation}\\:*"}
+
+
+def _queue_reference(pipe, ref, translations):
+    """Queue the read of a reference's verses in every translation.
+
+    Each translation costs a single command on the (sync or async) pipeline:
+    one HGETALL of the chapter hash, one HGET of a verse or one HMGET of a
+    range.
+
+    Returns:
+        list: One converter per translation, turning its reply into a list
+        of ``(verse, text)`` pairs
+    """
+    converters = []
+    for translation in translations:
+        chapter_key = f"{translation}:{ref.book}:{ref.chapter}"
+        if ref.first is None:
+            # the whole chapter, in one read of the chapter hash
+            pipe.hgetall(f"{chapter_key}:verses")
+            converters.append(
+                lambda verses: sorted((int(num), text) for num, text in verses.items())
+            )
+        elif ref.first == ref.last:
+            pipe.hget(f"{chapter_key}:{ref.first}", "data")
+            converters.append(lambda text: [(ref.first, text)] if text else [])
+        else:
+            pipe.hmget(f"{chapter_key}:verses", range(ref.first, ref.last + 1))
+            converters.append(
+                lambda texts: [
+                    (num, text) for num, text in enumerate(texts, ref.first) if text
+                ]
+            )
+    return converters
+
+
+def _queue_references(pipe, refs, translations):
+    """Queue every reference in every translation on one pipeline."""
+    converters = []
+    for ref in refs:
+        converters += _queue_reference(pipe, ref, translations)
+    return converters
+
+
+def _convert(converters, replies, count):
+    """Convert pipeline replies into ``(verse, text)`` lists, grouped per reference.
+
+    Returns:
+        list: For each reference, one list of pairs per translation
+    """
+    found = [convert(reply) for convert, reply in zip(converters, replies)]
+    return [found[i : i + count] for i in range(0, len(found), count)]
+
+
+def _stores(stores):
+    """The verse stores of every translation, or None unless all are usable."""
+    stores = list(stores)
+    return stores if all(stores) else None
+
+
+async def _stores_async(translations):
+    """Async version of ``_stores`` for a list of translations."""
+    return _stores(
+        [(await aio.get_index(LocalVerseStore, t)).store for t in translations]
+    )
+
+
+def _read_references(stores, refs):
+    """Read references from the verse stores, with no network I/O.
+
+    Returns:
+        list: The same as ``_convert``, one list of pairs per translation for
+        each reference
+    """
+    with metrics.timed("store"):
+        return [
+            [
+                store.verses(ref.book, ref.chapter, ref.first, ref.last)
+                for store in stores
+            ]
+            for ref in refs
+        ]
+
+
+def _queue_hydrate(pipe, verse_ids, translations, field="data"):
+    """Queue a field, the text by default, of every verse id (``nasb95:luk:1:1``)
+    in every translation."""
+    for verse_id in verse_ids:
+        location = verse_id.split(":", 1)[1]
+        for translation in translations:
+            pipe.hget(f"{translation}:{location}", field)
+
+
+def _read_hydrate(stores, verse_ids):
+    """The texts ``_queue_hydrate`` would fetch, read from the verse stores."""
+    texts = []
+    with metrics.timed("store"):
+        for verse_id in verse_ids:
+            _, book, chapter, verse = verse_id.split(":")
+            for store in stores:
+                texts.append(store.verse(book, int(chapter), int(verse)))
+    return texts
+
+
+def _queue_fragments(pipe, refs, translation):
+    """Queue the read of references' pre-rendered verses, as ``_queue_reference``.
+
+    Returns:
+        list: One converter per reference, turning its reply into the
+        reference's verse fragments in order
+    """
+    converters = []
+    for ref in refs:
+        chapter_key = f"{translation}:{ref.book}:{ref.chapter}"
+        if ref.first is None:
+            pipe.hgetall(f"{chapter_key}:json")
+            converters.append(
+                lambda fragments: [fragments[num] for num in sorted(fragments, key=int)]
+            )
+        elif ref.first == ref.last:
+            pipe.hget(f"{chapter_key}:{ref.first}", "json")
+            converters.append(_single)
+        else:
+            pipe.hmget(f"{chapter_key}:json", range(ref.first, ref.last + 1))
+            converters.append(lambda fragments: [f for f in fragments if f])
+    return converters
+
+
+def _single(fragment):
+    """Converter for the reply to one verse's HGET of its fragment."""
+    return [fragment] if fragment else []
+
+
+def _join_fragments(converters, replies):
+    """Join the converted replies into one body, None if any came back empty."""
+    fragments = []
+    for convert, reply in zip(converters, replies):
+        found = convert(reply)
+        if not found:
+            return None
+        fragments += found
+    return ",".join(fragments).encode("utf-8")
+
+
+def _store_fragments(store, refs):
+    """``read_fragments`` from a verse store: one slice of the file per reference."""
+    with metrics.timed("store"):
+        found = [
+            store.fragments(ref.book, ref.chapter, ref.first, ref.last) for ref in refs
+        ]
+    return b",".join(found) if all(found) else None
+
+
+def _store_hydrate_fragments(store, verse_ids):
+    """``hydrate_fragments`` from a verse store."""
+    found = []
+    with metrics.timed("store"):
+        for verse_id in verse_ids:
+            _, book, chapter, verse = verse_id.split(":")
+            number = store.number(book, int(chapter), int(verse))
+            found.append(b"" if number is None else store.fragment(number))
+    return b",".join(found) if all(found) else None
+
+
+def _hydrate(books, verse_ids, translations, texts):
+    """Turn verse ids and the texts queued by ``_queue_hydrate`` into verse dicts.
+
+    Book titles come from the worker's book index rather than Redis.
+    """
+    out = []
+    for i, verse_id in enumerate(verse_ids):
+        parts = verse_id.split(":")
+        verse_texts = texts[i * len(translations) : (i + 1) * len(translations)]
+        verse = {
+            "book": books.title(parts[1]),
+            "chapter": int(parts[2]),
+            "verse": int(parts[3]),
+            "text": verse_texts[0],
+        }
+        if len(translations) > 1:
+            verse["translations"] = dict(zip(translations, verse_texts))
+        out.append(verse)
+    return out
@@ -0,0 +1,62 @@
+import json
+import re
+from urllib.parse import urlencode
+
+from django.urls import reverse
+
+QUERIES = [
+    "Luke 1:5",
+    "priestly",
+    "Luke 1:1-3; 1 John 3:16",
+    "Luke 1:99",
+    "Luek 1:99 priestly",
+    "Luke 1:5",
+    "Do not be afraid, Zacharias",
+]
+
+
+def test_matches_search(client, settings):
+    """Each query is answered in input order, as /search/ answers it."""
+
+    settings.SEARCH_CACHE = {**settings.SEARCH_CACHE, "ENABLED": False}
+    response = client.get(f'{reverse("batch")}?{urlencode({"q": QUERIES}, True)}')
+    assert response.status_code == 201
+    results = response.json()["data"]
+    assert [result["q"] for result in results] == QUERIES
+
+    for result in results:
+        single = client.get(f'{reverse("search")}?{urlencode({"q": result["q"]})}')
+        assert result["status"] == single.status_code
+        if single.status_code == 201:
+            assert result["data"] == single.json()["data"]
+
+    # every full-text query went to Solr in one request
+    assert re.search(r'solr;dur=[\d.]+;desc="1"', response["Server-Timing"])
+
+
+def test_post_and_translations(client):
+    """Long lists can be POSTed as JSON, and ?v= compares translations."""
+
+    response = client.post(
+        f'{reverse("batch")}?v=nasb95',
+        json.dumps({"q": ["Luke 1:28", "blessed among women"]}),
+        content_type="application/json",
+    )
+    assert response.status_code == 201
+    first, second = response.json()["data"]
+    assert first["data"][0]["verse"] == 28
+    assert second["data"]
+
+
+def test_bad_requests(client):
+    url = reverse("batch")
+    assert client.get(url).status_code == 400
+    assert (
+        client.get(f"{url}?{urlencode({'q': ['Luke 1', ' ']}, True)}").status_code
+        == 400
+    )
+    assert client.get(f"{url}?{urlencode({'q': ['x'] * 201}, True)}").status_code == 400
+    assert (
+        client.post(url, "not json", content_type="application/json").status_code == 400
+    )
+    assert client.get(f"{url}?q=Luke+1&v=nope").status_code == 400
@@ -0,0 +1,67 @@
+import pytest
+
+from bible.utilities.books import BookIndex
+
+TABLE = [
+    ("genesis", "gen"),
+    ("exodus", "exo"),
+    ("song of songs", "sng"),
+    ("luke", "luk"),
+    ("john", "jhn"),
+    ("philippians", "phl"),
+    ("philemon", "phm"),
+    ("1 john", "1jo"),
+    ("2 john", "2jo"),
+    ("jude", "jde"),
+]
+
+
+@pytest.fixture(name="books")
+def fixture_books():
+    index = BookIndex("nasb95")
+    index.build(TABLE)
+    return index
+
+
+@pytest.mark.parametrize(
+    "name,code",
+    [
+        ("Luke", "luk"),
+        ("luk", "luk"),
+        ("1 John", "1jo"),
+        ("1john", "1jo"),
+        ("1JOhn", "1jo"),
+        ("song  of songs", "sng"),
+        ("songofsongs", "sng"),
+        ("gen", "gen"),
+        ("Gen.", "gen"),
+        ("exod", "exo"),
+        ("Luek", "luk"),
+        ("ulke", "luk"),
+        ("lk", "luk"),
+        ("philipians", "phl"),
+    ],
+)
+def test_resolve(books, name, code):
+    """Book names resolve to their short code without touching Redis."""
+
+    assert books.resolve(name) == code
+
+
+def test_ambiguous_prefix_falls_back_to_fuzzy(books):
+    """A prefix shared by several books is not taken as a match."""
+
+    assert books.resolve("phil") in ("phl", "phm")
+
+
+def test_title(books):
+    """Display names are title-cased book names."""
+
+    assert books.title("sng") == "Song Of Songs"
+    assert books.title("1jo") == "1 John"
+
+
+def test_empty_index():
+    """Nothing resolves before the table is loaded."""
+
+    assert BookIndex("nasb95").resolve("luke") is None
@@ -0,0 +1,88 @@
+from urllib.parse import urlencode
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.urls import reverse
+from django_redis import get_redis_connection
+
+from bible import services, views
+
+
+@pytest.fixture(autouse=True)
+def fixture_uncached(settings):
+    settings.SEARCH_CACHE = {**settings.SEARCH_CACHE, "ENABLED": False}
+    settings.VERSE_STORE = {**settings.VERSE_STORE, "ENABLED": False}
+
+
+def search(client, query):
+    return client.get(f'{reverse("search")}?{urlencode({"q": query})}')
+
+
+def test_reference_from_fragments(client):
+    """A reference is answered with the verse JSON rendered at ingest."""
+
+    redis_conn = get_redis_connection("default")
+    response = search(client, "Luke 1:5-6")
+    fragments = redis_conn.hmget("nasb95:luk:1:json", [5, 6])
+    assert response.content == f'{{"data":[{",".join(fragments)}]}}'.encode()
+    assert response.json()["data"][0] == {
+        "book": "Luke",
+        "chapter": 1,
+        "verse": 5,
+        "text": redis_conn.hget("nasb95:luk:1:5", "data"),
+    }
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "Luke 1",
+        "Luke 1:28",
+        "1 John 3:16-17",
+        "Luke 1:3; Song of Songs 1:2",
+        "priestly",
+    ],
+)
+def test_fragments_match_rendered(query, client, monkeypatch):
+    """Pre-rendered responses hold exactly what serializing the verses gives."""
+
+    fast = search(client, query)
+    monkeypatch.setattr(services, "read_fragments", lambda *args: None)
+    monkeypatch.setattr(services, "hydrate_fragments", lambda *args: None)
+    slow = search(client, query)
+    assert fast.status_code == slow.status_code == 201
+    assert fast.json() == slow.json()
+
+
+def test_async_fragments(client, async_client):
+    """The async view answers from the same fragments."""
+
+    url = f'{reverse("search_async")}?{urlencode({"q": "Luke 1:5-6"})}'
+    response = async_to_sync(async_client.get)(url)
+    assert response.status_code == 201
+    assert response.content == search(client, "Luke 1:5-6").content
+
+
+def test_legacy_data(client):
+    """Chapters loaded before verses were pre-rendered are still served."""
+
+    redis_conn = get_redis_connection("default")
+    expected = search(client, "Luke 1:5-6").json()
+    redis_conn.rename("nasb95:luk:1:json", "nasb95:luk:1:json:saved")
+    try:
+        response = search(client, "Luke 1:5-6")
+    finally:
+        redis_conn.rename("nasb95:luk:1:json:saved", "nasb95:luk:1:json")
+    assert response.status_code == 201
+    assert response.json() == expected
+
+
+def test_encoders_agree(client, monkeypatch):
+    """orjson and the stdlib fallback encode responses the same."""
+
+    url = f'{reverse("strongs_gloss")}?{urlencode({"q": "as many"})}'
+    fast = client.get(url)
+    monkeypatch.setattr(views, "orjson", None)
+    slow = client.get(url)
+    assert fast.status_code == slow.status_code == 201
+    assert fast.json() == slow.json()
@@ -0,0 +1,185 @@
+import asyncio
+import json
+from pathlib import Path
+from urllib.parse import urlencode
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.urls import reverse
+
+from bible import services
+from bible.utilities import aio, revision, solr
+from bible.utilities.breaker import CircuitBreaker
+from bible.utilities.fulltext import FullTextIndex, LocalFullText, write_index
+
+DOCS = Path(__file__).resolve().parents[2] / "lamplight/scripts/bible.json"
+
+
+def test_ranking(tmp_path):
+    """BM25 ranks rarer and denser matches higher; whole phrases get a boost."""
+
+    path = tmp_path / "t.idx"
+    write_index(
+        [
+            {"id": "t:a:1:1", "_text_": "the angel said to him"},
+            {"id": "t:a:1:2", "_text_": "the angel of the Lord appeared"},
+            {"id": "t:a:1:3", "_text_": "the Lord said the angel"},
+            {"id": "t:a:1:4", "_text_": "and the people were waiting"},
+        ],
+        path,
+    )
+    index = FullTextIndex(path)
+
+    assert [doc["id"] for doc in index.search("people")] == ["t:a:1:4"]
+    assert index.search("zebra") == []
+    assert index.search("") == []
+
+    ranked = [doc["id"] for doc in index.search("angel of the Lord")]
+    assert ranked[0] == "t:a:1:2"
+    assert set(ranked) == {"t:a:1:1", "t:a:1:2", "t:a:1:3", "t:a:1:4"}
+    assert len(index.search("the", rows=2)) == 2
+
+
+def test_circuit_breaker():
+    """The breaker opens after repeated failures and lets one trial through."""
+
+    breaker = CircuitBreaker(failures=2, reset=0)
+    breaker.record(False)
+    assert not breaker.is_open
+    breaker.record(False)
+    assert breaker.is_open
+
+    assert breaker.allow()  # the trial, reset is 0
+    assert not breaker.allow()
+    breaker.record(True)
+    assert not breaker.is_open and breaker.allow()
+
+
+@pytest.fixture(name="local_index")
+def fixture_local_index(settings, tmp_path, monkeypatch):
+    settings.FULLTEXT = {
+        **settings.FULLTEXT,
+        "PATH": str(tmp_path / "{translation}.idx"),
+    }
+    settings.SEARCH_CACHE = {**settings.SEARCH_CACHE, "ENABLED": False}
+    with open(DOCS, encoding="utf-8") as f:
+        write_index(json.load(f), tmp_path / "nasb95.idx")
+    monkeypatch.delitem(revision._indexes, (LocalFullText, "nasb95"), raising=False)
+    monkeypatch.setattr(solr, "_breaker", None)
+
+
+def test_local_engine(settings, client, local_index):
+    """In local mode full-text queries never reach Solr."""
+
+    settings.FULLTEXT = {**settings.FULLTEXT, "MODE": "local"}
+    response = client.get(f'{reverse("search")}?{urlencode({"q": "priestly"})}')
+    assert response.status_code == 201
+    assert response.json()["data"][0]["verse"] == 23
+    assert "fulltext;dur=" in response["Server-Timing"]
+    assert "solr" not in response["Server-Timing"]
+
+
+def test_local_engine_batch(settings, client, local_index):
+    """Batches answer every full-text query locally too."""
+
+    settings.FULLTEXT = {**settings.FULLTEXT, "MODE": "local"}
+    queries = {"q": ["priestly", "Luke 1:5", "Zacharias"]}
+    response = client.get(f'{reverse("batch")}?{urlencode(queries, True)}')
+    priestly, _, zacharias = response.json()["data"]
+    assert priestly["data"][0]["verse"] == 23
+    assert zacharias["data"]
+    assert "solr" not in response["Server-Timing"]
+
+
+def test_local_engine_async(settings, async_client, local_index):
+    """The async view uses the local engine the same way."""
+
+    settings.FULLTEXT = {**settings.FULLTEXT, "MODE": "local"}
+    response = async_to_sync(async_client.get)(
+        f'{reverse("search_async")}?{urlencode({"q": "Luek 1:99 priestly"})}'
+    )
+    assert response.status_code == 201
+    assert response.json()["data"][0]["verse"] == 23
+
+
+def test_fallback(settings, client, local_index, monkeypatch):
+    """Solr failures are answered locally, and trip the breaker."""
+
+    settings.FULLTEXT = {**settings.FULLTEXT, "MODE": "fallback", "FAILURES": 2}
+    calls = []
+
+    class DownSolr:
+        def search(self, query, **params):
+            calls.append(query)
+            raise solr.SolrError("Connection refused")
+
+    monkeypatch.setattr(solr, "get_solr", DownSolr)
+
+    for query in ["priestly", "Zacharias", "blessed among women"]:
+        response = client.get(f'{reverse("search")}?{urlencode({"q": query})}')
+        assert response.status_code == 201
+        assert response.json()["data"]
+    assert calls == ["priestly", "Zacharias"]
+
+
+@pytest.fixture(name="trial")
+def fixture_trial(settings, local_index):
+    """An open breaker whose next call is the half-open trial."""
+
+    settings.FULLTEXT = {**settings.FULLTEXT, "MODE": "fallback", "RESET": 0}
+    breaker = solr.get_breaker()
+    breaker.failures = 1
+    breaker.record(False)
+    assert breaker.is_open
+    return breaker
+
+
+def cancel_search():
+    """Start a full-text search and cancel it before Solr answers."""
+
+    async def cancel():
+        task = asyncio.ensure_future(services.full_text_async("priestly", "nasb95"))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel())
+
+
+def test_cancelled_searches(settings, local_index, monkeypatch):
+    """Cancelled searches say nothing about Solr, but free a half-open trial."""
+
+    async def slow_search(query, params):
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(aio, "solr_search", slow_search)
+    settings.FULLTEXT = {**settings.FULLTEXT, "MODE": "fallback", "RESET": 0}
+    breaker = solr.get_breaker()
+    for _ in range(breaker.failures * 2):
+        cancel_search()
+    assert not breaker.is_open
+
+    breaker.failures = 1
+    breaker.record(False)
+    cancel_search()  # the trial
+    assert breaker.is_open
+    assert breaker.allow()  # a new trial, not open for good
+
+
+def test_trial_unexpected_error(trial, monkeypatch):
+    """A trial ending in any other error also hands the trial back."""
+
+    class BrokenSolr:
+        def search(self, query, **params):
+            raise ValueError("malformed response")
+
+    monkeypatch.setattr(solr, "get_solr", BrokenSolr)
+    for call in [
+        lambda: services.full_text(None, "priestly", "nasb95"),
+        lambda: services.full_text_many(None, ["priestly"], "nasb95"),
+    ]:
+        with pytest.raises(ValueError):
+            call()
+        assert trial.allow()
+        trial.record(False)
@@ -0,0 +1,212 @@
+import importlib
+import json
+import threading
+from pathlib import Path
+
+import fakeredis
+import pytest
+
+from benchmarks.stub_solr import StubSolr
+
+SCRIPTS = Path(__file__).resolve().parents[2] / "lamplight/scripts"
+
+
+@pytest.fixture(name="scripts")
+def fixture_scripts(monkeypatch):
+    monkeypatch.syspath_prepend(str(SCRIPTS))
+    return importlib.import_module("bible_to_redis"), importlib.import_module(
+        "doc_to_solr"
+    )
+
+
+def write_csv(path, rows):
+    path.write_text("".join(f"luk,1,{verse},{text}\n" for verse, text in rows))
+    return str(path)
+
+
+def dump(r):
+    """Every key in a Redis database with its value."""
+    readers = {
+        "hash": r.hgetall,
+        "list": lambda key: r.lrange(key, 0, -1),
+        "zset": lambda key: r.zrange(key, 0, -1, withscores=True),
+    }
+    return {key: readers[r.type(key)](key) for key in r.keys()}
+
+
+def test_pipelined_load(scripts, tmp_path):
+    """Batches spread over several connections load what one connection does."""
+
+    bible_to_redis, _ = scripts
+    csv_file = write_csv(
+        tmp_path / "t.csv",
+        [
+            (verse, f"<G{verse % 3}>as many</G{verse % 3}> {verse}")
+            for verse in range(1, 51)
+        ],
+    )
+    serial = fakeredis.FakeRedis(decode_responses=True)
+    bible_to_redis.csv_to_redis_hash(csv_file, "t", batch_size=50, r=serial)
+    pipelined = fakeredis.FakeRedis(decode_responses=True)
+    bible_to_redis.csv_to_redis_hash(
+        csv_file, "t", batch_size=3, connections=4, r=pipelined
+    )
+    assert dump(pipelined) == dump(serial)
+    assert pipelined.hlen("t:luk:1:verses") == 50
+    assert pipelined.hget("t:versification", "luk:1") == "50"
+
+
+def test_staged_load(scripts, tmp_path):
+    """A staged load replaces the whole translation in one step."""
+
+    bible_to_redis, _ = scripts
+    r = fakeredis.FakeRedis(decode_responses=True)
+    r.hset("t:books", "luke", "luk")
+    r.rpush("t:canon", "luk")
+    r.hset("t:manifest:solr", "luk:1:1", "x")
+    rows = [(1, "<G1>as many</G1> have"), (2, "<G2>seemed</G2>"), (3, "so that")]
+    bible_to_redis.csv_to_redis_hash(write_csv(tmp_path / "a.csv", rows), "t", r=r)
+
+    rows = [(1, "<G1>as many</G1> had"), (2, "it seemed")]
+    bible_to_redis.csv_to_redis_hash(
+        write_csv(tmp_path / "b.csv", rows), "t", staging=True, r=r
+    )
+    assert not r.keys("staging:*")
+    assert r.hmget("t", ["revision", "text_revision"]) == ["2", "2"]
+    assert r.hget("t:luk:1:1", "json") == (
+        '{"book":"Luke","chapter":1,"verse":1,"text":"<G1>as many</G1> had"}'
+    )
+    assert not r.exists("t:luk:1:3")
+    assert not r.exists("t:strongs:G2")
+    assert not r.exists("t:gloss:seemed")
+    assert sorted(r.hkeys("t:luk:1:verses")) == ["1", "2"]
+    assert sorted(r.hkeys("t:manifest:redis")) == ["luk:1:1", "luk:1:2"]
+    assert r.zrange("t:phrases", 0, -1, withscores=True) == [("as many", 1)]
+    assert r.hgetall("t:versification") == {"luk": "1", "luk:1": "2"}
+    assert r.hgetall("t:books") == {"luke": "luk"}
+    assert r.lrange("t:canon", 0, -1) == ["luk"]
+    assert r.hgetall("t:manifest:solr") == {"luk:1:1": "x"}
+
+
+def test_incremental_redis(scripts, tmp_path):
+    """Only changed verses are rewritten, and an unchanged file writes nothing."""
+
+    bible_to_redis, _ = scripts
+    r = fakeredis.FakeRedis(decode_responses=True)
+    csv_file = tmp_path / "t.csv"
+    rows = [(1, "<G1>as many</G1> have"), (2, "it seemed"), (3, "so that")]
+    bible_to_redis.csv_to_redis_hash(write_csv(csv_file, rows), "t", r=r)
+    assert r.hget("t", "revision") == "1"
+    assert r.hlen("t:manifest:redis") == 3
+
+    bible_to_redis.csv_to_redis_hash(str(csv_file), "t", incremental=True, r=r)
+    assert r.hget("t", "revision") == "1"
+
+    rows = [(1, "<G2>many</G2> have"), (2, "it seemed"), (4, "now")]
+    bible_to_redis.csv_to_redis_hash(
+        write_csv(csv_file, rows), "t", incremental=True, r=r
+    )
+    assert r.hget("t", "revision") == "2"
+    assert r.hget("t:luk:1:1", "data") == "<G2>many</G2> have"
+    assert not r.exists("t:luk:1:3")
+    assert sorted(r.hkeys("t:luk:1:verses")) == ["1", "2", "4"]
+    assert sorted(r.hkeys("t:luk:1:json")) == ["1", "2", "4"]
+    assert (
+        r.hget("t:luk:1:json", "1")
+        == r.hget("t:luk:1:1", "json")
+        == ('{"book":"luk","chapter":1,"verse":1,"text":"<G2>many</G2> have"}')
+    )
+    assert r.zrange("t:strongs:G1", 0, -1) == []
+    assert r.zrange("t:strongs:G2", 0, -1) == ["luk:1:1"]
+    assert not r.exists("t:gloss:as many")
+    assert r.zscore("t:phrases", "many") == 1
+    assert sorted(r.hkeys("t:manifest:redis")) == ["luk:1:1", "luk:1:2", "luk:1:4"]
+    assert r.hget("t:versification", "luk:1") == "4"
+
+    bible_to_redis.csv_to_redis_hash(
+        write_csv(csv_file, rows[:2]), "t", incremental=True, r=r
+    )
+    assert r.hget("t:versification", "luk:1") == "2"
+
+
+def test_concordance_in_parts(scripts, tmp_path):
+    """Loading a translation in overlapping parts counts glosses as loading it whole."""
+
+    bible_to_redis, _ = scripts
+    rows = [
+        (1, "<G1>as many</G1> have"),
+        (2, "<G1>as many</G1> <G2>seemed</G2>"),
+        (3, "<G2>seemed</G2> so"),
+    ]
+    whole = fakeredis.FakeRedis(decode_responses=True)
+    bible_to_redis.csv_to_redis_hash(write_csv(tmp_path / "a.csv", rows), "t", r=whole)
+
+    parts = fakeredis.FakeRedis(decode_responses=True)
+    for part in [[(3, "<G1>as many</G1>")], rows[:2], rows[1:], rows[:1]]:
+        bible_to_redis.csv_to_redis_hash(
+            write_csv(tmp_path / "b.csv", part), "t", batch_size=1, r=parts
+        )
+
+    for key in ["t:strongs:G1", "t:gloss:as many", "t:gloss:seemed", "t:phrases"]:
+        assert parts.zrange(key, 0, -1, withscores=True) == whole.zrange(
+            key, 0, -1, withscores=True
+        )
+    assert whole.zscore("t:phrases", "as many") == 2
+    assert parts.zrange("t:strongs:G1", 0, -1) == ["luk:1:1", "luk:1:2"]
+
+
+def test_incremental_solr(scripts):
+    """Only changed documents are posted; gone ones in covered chapters deleted."""
+
+    _, doc_to_solr = scripts
+    docs = [
+        {"id": "t:luk:1:1", "_text_": "as many have"},
+        {"id": "t:luk:1:2", "_text_": "it seemed"},
+        {"id": "t:luk:2:1", "_text_": "now"},
+    ]
+    first = doc_to_solr.Changes({})
+    assert list(first.filter(docs)) == docs
+
+    changes = doc_to_solr.Changes(first.hashes)
+    edited = [{"id": "t:luk:1:1", "_text_": "many have"}]
+    assert list(changes.filter(edited)) == edited
+    assert changes.deleted() == ["t:luk:1:2"]
+
+    pruned = doc_to_solr.Changes(first.hashes, prune=True)
+    list(pruned.filter(edited))
+    assert sorted(pruned.deleted()) == ["t:luk:1:2", "t:luk:2:1"]
+
+
+def test_post_documents(scripts):
+    """Batches go out concurrently and only the one that failed is re-posted."""
+
+    _, doc_to_solr = scripts
+
+    class FlakySolr(StubSolr):
+        failed = False
+        lock = threading.Lock()
+
+        def update(self, body, params):
+            error = super().update(body, params)
+            with self.lock:
+                if json.loads(body)[0]["id"] == "t:luk:1:5" and not self.failed:
+                    self.failed = True
+                    return "Service Unavailable"
+            return error
+
+    docs = [{"id": f"t:luk:1:{verse}", "_text_": str(verse)} for verse in range(1, 11)]
+    solr = FlakySolr(docs=[]).start()
+    try:
+        assert doc_to_solr.post_documents(
+            docs, solr.url, "verses", batch_size=2, workers=3, commit_within=1000
+        )
+    finally:
+        solr.stop()
+
+    batches = [[doc["id"] for doc in payload] for payload, _ in solr.posted]
+    assert len(batches) == 6
+    assert batches.count(["t:luk:1:5", "t:luk:1:6"]) == 2
+    assert sorted({doc_id for batch in batches for doc_id in batch}) == sorted(
+        doc["id"] for doc in docs
+    )
+    assert all(params == {"commitWithin": ["1000"]} for _, params in solr.posted)
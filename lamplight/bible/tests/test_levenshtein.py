@@ -0,0 +1,67 @@
+import random
+
+import pytest
+
+from bible.utilities import levenshtein
+
+
+def matrix_distance(str1, str2):
+    """Textbook dynamic-programming distance used as the reference."""
+
+    prev = list(range(len(str2) + 1))
+    for i, char1 in enumerate(str1, 1):
+        cur = [i]
+        for j, char2 in enumerate(str2, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (char1 != char2)))
+        prev = cur
+    return prev[-1]
+
+
+@pytest.mark.parametrize(
+    "str1,str2,expected",
+    [
+        ("", "", 0),
+        ("", "luke", 4),
+        ("luke", "", 4),
+        ("luke", "luke", 0),
+        ("luek", "luke", 2),
+        ("lk", "luk", 1),
+        ("kitten", "sitting", 3),
+        ("1john", "songofsongs", 9),
+    ],
+)
+def test_distance(str1, str2, expected):
+    """Known distances."""
+
+    assert levenshtein.distance(str1, str2) == expected
+
+
+def test_distance_matches_reference():
+    """The bit-parallel kernel agrees with the full matrix."""
+
+    rng = random.Random(7)
+    for _ in range(2000):
+        str1 = "".join(rng.choice("abcd ") for _ in range(rng.randint(0, 80)))
+        str2 = "".join(rng.choice("abcd ") for _ in range(rng.randint(0, 80)))
+        assert levenshtein.distance(str1, str2) == matrix_distance(str1, str2)
+
+
+def test_max_distance():
+    """Distances beyond the cutoff are reported as cutoff + 1."""
+
+    assert levenshtein.distance("genesis", "revelation", max_distance=2) == 3
+    assert levenshtein.distance("luek", "luke", max_distance=2) == 2
+    assert levenshtein.distance_many("luek", ["luke", "genesis"], max_distance=2) == [
+        2,
+        3,
+    ]
+
+
+def test_closest():
+    """The first of the closest candidates wins."""
+
+    candidates = ["genesis", "luke", "luk", "jude"]
+    assert levenshtein.closest("luek", candidates) == (2, 1)
+    assert levenshtein.closest("jdue", candidates) == (3, 2)
+    assert levenshtein.closest("zzzzzzzz", candidates, max_distance=2) == (None, None)
+    assert levenshtein.closest("luke", []) == (None, None)
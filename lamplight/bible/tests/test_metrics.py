@@ -0,0 +1,43 @@
+from urllib.parse import urlencode
+
+from django.urls import reverse
+
+from bible.utilities import metrics
+
+
+def test_server_timing(client, settings):
+    """Responses break their time down by phase."""
+
+    settings.SEARCH_CACHE = {**settings.SEARCH_CACHE, "ENABLED": False}
+    response = client.get(f'{reverse("search")}?{urlencode({"q": "Luke 1:28"})}')
+    timing = response["Server-Timing"]
+    assert "parse;dur=" in timing
+    assert "redis;dur=" in timing
+    assert "solr" not in timing
+    assert timing.split(", ")[-1].startswith("total;dur=")
+
+    response = client.get(f'{reverse("search")}?{urlencode({"q": "priestly"})}')
+    assert "solr;dur=" in response["Server-Timing"]
+    assert "serialize;dur=" in response["Server-Timing"]
+
+
+def test_prometheus_export(client):
+    """The worker's totals are exported in the Prometheus text format."""
+
+    metrics.registry.clear()
+    client.get(f'{reverse("search")}?{urlencode({"q": "Luke 1:5-6"})}')
+    client.get(f'{reverse("search")}?{urlencode({"q": "Luke 1:99"})}')
+
+    response = client.get(reverse("metrics"))
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/plain")
+
+    body = response.content.decode()
+    assert 'lamplight_requests_total{view="search",status="201"} 1' in body
+    assert 'lamplight_requests_total{view="search",status="404"} 1' in body
+    assert 'lamplight_request_duration_seconds_count{view="search"} 2' in body
+    assert (
+        'lamplight_request_duration_seconds_bucket{view="search",le="+Inf"} 2' in body
+    )
+    assert 'lamplight_phase_calls_total{phase="parse"} 2' in body
+    assert 'lamplight_phase_seconds_total{phase="redis"}' in body
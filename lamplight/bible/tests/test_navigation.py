@@ -0,0 +1,113 @@
+from types import SimpleNamespace
+from urllib.parse import urlencode
+
+import pytest
+from django.urls import reverse
+
+from bible import services
+from bible.utilities.navigation import adjacent_chapter, shift, span
+from bible.utilities.versification import Versification
+
+
+@pytest.fixture(name="canon")
+def fixture_canon():
+    versification = Versification("t")
+    versification.counts = {
+        "gen": 2,
+        "gen:1": 3,
+        "gen:2": 2,
+        "lev": 1,
+        "lev:1": 4,
+    }
+    return SimpleNamespace(codes=["gen", "exo", "lev"]), versification
+
+
+def test_canonical_order(canon):
+    """Moves cross chapters and books, skipping what isn't loaded."""
+
+    books, versification = canon
+    assert adjacent_chapter(books, versification, "gen", 2) == ("lev", 1)
+    assert adjacent_chapter(books, versification, "lev", 1, -1) == ("gen", 2)
+    assert adjacent_chapter(books, versification, "lev", 1) is None
+    assert shift(books, versification, "gen", 2, 2, 2) == ("lev", 1, 2)
+    assert shift(books, versification, "gen", 1, 2, -5) == ("gen", 1, 1)
+    assert span(books, versification, ("gen", 1, 3), ("lev", 1, 1)) == [
+        ("gen", 1, 3, 3),
+        ("gen", 2, 1, 2),
+        ("lev", 1, 1, 1),
+    ]
+
+
+@pytest.fixture(name="navigate")
+def fixture_navigate(client, settings):
+    settings.VERSE_STORE = {**settings.VERSE_STORE, "ENABLED": False}
+    services._chapters.clear()
+
+    def navigate(**params):
+        return client.get(f'{reverse("navigate")}?{urlencode(params)}')
+
+    return navigate
+
+
+def test_verse_window(navigate):
+    """Verses come with context either side and the verses around them."""
+
+    response = navigate(q="Luke 1:2", window=1)
+    assert response.status_code == 201
+    page = response.json()
+    assert [verse["verse"] for verse in page["data"]] == [1, 2, 3]
+    assert page["prev"] == {"book": "Luke", "chapter": 1, "verse": 1, "q": "Luke 1:1"}
+    assert page["next"]["q"] == "Luke 1:3"
+
+    # the window runs back into the previous book
+    page = navigate(q="Luke 1:1", window=2).json()
+    assert [(verse["book"], verse["verse"]) for verse in page["data"]] == [
+        ("Song Of Songs", 17),
+        ("Luke", 1),
+        ("Luke", 2),
+        ("Luke", 3),
+    ]
+    assert page["prev"]["q"] == "Song Of Songs 1:17"
+
+    assert navigate(q="1 John 3:17").json()["next"] is None
+
+
+def test_chapter_pages(navigate):
+    """A chapter comes with the chapters either side."""
+
+    page = navigate(q="Luke 1").json()
+    assert len(page["data"]) == 80
+    assert page["prev"] == {
+        "book": "Song Of Songs",
+        "chapter": 1,
+        "q": "Song Of Songs 1",
+    }
+    assert page["next"] == {"book": "1 John", "chapter": 3, "q": "1 John 3"}
+
+
+def test_prefetch(navigate):
+    """The next page turn is answered from the worker's memory."""
+
+    navigate(q="Luke 1:5")
+    services._prefetcher.submit(lambda: None).result()  # wait for the prefetch
+
+    response = navigate(q="1 John 3")
+    assert response.status_code == 201
+    assert [verse["verse"] for verse in response.json()["data"]] == [16, 17]
+    assert "redis" not in response["Server-Timing"]
+
+
+@pytest.mark.parametrize(
+    "params,status",
+    [
+        ({}, 400),
+        ({"q": "inasmuch"}, 400),
+        ({"q": "Luke 1:1; Luke 1:3"}, 400),
+        ({"q": "Luke 1:1", "window": "x"}, 400),
+        ({"q": "Luke 99"}, 404),
+    ],
+)
+def test_bad_navigation(params, status, navigate):
+    """Navigation needs exactly one existing reference."""
+
+    assert navigate(**params).status_code == status
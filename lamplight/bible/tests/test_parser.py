@@ -0,0 +1,52 @@
+import pytest
+
+from bible.utilities.parser import Citation, parse
+
+
+@pytest.mark.parametrize(
+    "query,citations",
+    [
+        ("Luke 1:28", [Citation("Luke", 1, 28, 28)]),
+        ("Luke 1", [Citation("Luke", 1, None, None)]),
+        ("luk1", [Citation("luk", 1, None, None)]),
+        ("luk      1", [Citation("luk", 1, None, None)]),
+        ("1JOhn 3:16", [Citation("1JOhn", 3, 16, 16)]),
+        ("1 Jn. 3.16", [Citation("1 john", 3, 16, 16)]),
+        ("1Jn 3:16", [Citation("1 john", 3, 16, 16)]),
+        ("Lk. 1:1", [Citation("luke", 1, 1, 1)]),
+        ("2 Kgs 1", [Citation("2 kings", 1, None, None)]),
+        ("song of songs 1:2-4", [Citation("song of songs", 1, 2, 4)]),
+        ("Luke 1:12 - 5", [Citation("Luke", 1, 12, 5)]),
+        ("Luke -1:28", [Citation("Luke", -1, 28, 28)]),
+        ("Luke 100:28", [Citation("Luke", 100, 28, 28)]),
+        (
+            "Luke 1:1; John 3:16",
+            [Citation("Luke", 1, 1, 1), Citation("John", 3, 16, 16)],
+        ),
+        (
+            "Mk 1:1-3; 2:4;",
+            [Citation("mark", 1, 1, 3), Citation("mark", 2, 4, 4)],
+        ),
+    ],
+)
+def test_references(query, citations):
+    """References, ranges, lists and abbreviations parse into citations."""
+    assert parse(query) == citations
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "",
+        "priestly",
+        "Do not be afraid, Zacharias",
+        "(Luke 1:1)",
+        "Luke 1:1; the rest",
+        "3:16",
+        "in the 15th year",
+        "in the beginning " * 1000 + "was 1 word",
+    ],
+)
+def test_not_references(query):
+    """Phrases and malformed lists are left for full-text search."""
+    assert parse(query) is None
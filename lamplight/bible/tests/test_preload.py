@@ -0,0 +1,42 @@
+import gc
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from bible import preload
+from bible.utilities import revision
+from bible.utilities.books import BookIndex
+from bible.utilities.suggest import Suggestions
+from bible.utilities.versification import Versification
+
+
+@pytest.fixture(autouse=True)
+def fixture_unfreeze():
+    yield
+    gc.unfreeze()
+
+
+def test_preload():
+    """Every translation's tables are built before any request."""
+
+    for table in (BookIndex, Versification, Suggestions):
+        revision._indexes.pop((table, "nasb95"), None)
+    preload.preload()
+
+    for table in (BookIndex, Versification, Suggestions):
+        assert revision._indexes[(table, "nasb95")].is_fresh()
+    assert revision._indexes[(BookIndex, "nasb95")].resolve("luke") == "luk"
+    assert gc.get_freeze_count()
+
+
+def test_preload_without_redis(monkeypatch, caplog):
+    """Workers fall back to loading on first use when Redis is down."""
+
+    def unreachable(*args):
+        raise RedisConnectionError("Connection refused")
+
+    revision._indexes.pop((BookIndex, "nasb95"), None)
+    monkeypatch.setattr(preload, "get_index", unreachable)
+    preload.preload()
+    assert (BookIndex, "nasb95") not in revision._indexes
+    assert "Could not preload" in caplog.text
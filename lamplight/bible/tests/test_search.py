@@ -2,8 +2,10 @@ import json
 from urllib.parse import urlencode
 
 import pytest
+from asgiref.sync import async_to_sync
 from django.test import Client, TestCase
 from django.urls import reverse
+from django_redis import get_redis_connection
 
 
 @pytest.mark.parametrize(
@@ -16,7 +18,7 @@ from django.urls import reverse
         ("luk1", "Luke", 1),
         ("luk      1", "Luke", 1),
         ("1 John 3:16", "1 John", 3, 16),
-        ("song of songs 1:22", "Song Of Songs", 1, 22),
+        ("song of songs 1:2", "Song Of Songs", 1, 2),
         ("1JOhn 3:16", "1 John", 3, 16),
         ("inasmuch", "Luke", 1, 1),
         ("priestly", "Luke", 1, 23),
@@ -67,6 +69,8 @@ def test_misspelled_verse(text_input, client):
         "Luke -1:28",
         "Luke 1:-1",
         "Luke 1:110",
+        "Luke 1:12-5",
+        "song of songs 1:22",
     ],
 )
 def test_bad_verse_numbers(text_input, client):
@@ -74,3 +78,127 @@ def test_bad_verse_numbers(text_input, client):
 
     response = client.post(f'{reverse("search")}?{urlencode({"q": text_input})}')
     assert response.status_code == 404
+
+
+@pytest.mark.parametrize(
+    "text_input",
+    [
+        ("Luke 1", "Luke", 1, list(range(1, 81))),
+        ("Luke 1:5-12", "Luke", 1, list(range(5, 13))),
+        ("luk 1:79-85", "Luke", 1, [79, 80]),
+    ],
+)
+def test_chapter_and_range(text_input, client):
+    """Test whole-chapter and verse-range queries."""
+
+    response = client.post(f'{reverse("search")}?{urlencode({"q": text_input[0]})}')
+    assert response.status_code == 201
+
+    out = response.json()
+    assert [verse["verse"] for verse in out["data"]] == text_input[3]
+    for verse in out["data"]:
+        assert verse["book"] == text_input[1]
+        assert verse["chapter"] == text_input[2]
+        assert verse["text"]
+
+
+def test_cached_response(client):
+    """Repeated queries are served from the response cache with an ETag."""
+
+    url = f'{reverse("search")}?{urlencode({"q": "Luke 1:28"})}'
+    first = client.get(url)
+    assert first.status_code == 201
+    assert first["ETag"]
+    assert "max-age" in first["Cache-Control"]
+
+    second = client.get(f'{reverse("search")}?{urlencode({"q": "  luke 1:28 "})}')
+    assert second.status_code == 201
+    assert second["ETag"] == first["ETag"]
+    assert second.json() == first.json()
+
+    assert client.get(url, HTTP_IF_NONE_MATCH=first["ETag"]).status_code == 304
+
+
+def test_reload_invalidates_cache(client, settings):
+    """A reload retires cached responses at once, not after the refresh interval."""
+
+    settings.BIBLE_INDEX_REFRESH_SECONDS = 3600
+    settings.VERSE_STORE = {**settings.VERSE_STORE, "ENABLED": False}
+    redis_conn = get_redis_connection("default")
+    url = f'{reverse("search")}?{urlencode({"q": "Luke 1:28"})}'
+    original = client.get(url).json()
+    verse = original["data"][0]
+
+    saved = redis_conn.hget("nasb95:luk:1:28", "json")
+    edited = json.dumps({**verse, "text": "Greetings"}, separators=(",", ":"))
+    redis_conn.hset("nasb95:luk:1:28", "json", edited)
+    redis_conn.hincrby("nasb95", "revision", 1)
+    try:
+        assert client.get(url).json()["data"][0]["text"] == "Greetings"
+    finally:
+        redis_conn.hset("nasb95:luk:1:28", "json", saved)
+        redis_conn.hincrby("nasb95", "revision", 1)
+    assert client.get(url).json() == original
+
+
+@pytest.mark.parametrize(
+    "text_input",
+    [
+        ("Luke 1:28", "Luke", 1, 28),
+        ("Luek 1:28", "Luke", 1, 28),
+        ("Luke 1", "Luke", 1, 1),
+        ("priestly", "Luke", 1, 23),
+    ],
+)
+def test_async_search(text_input, async_client):
+    """The async view answers like the sync one."""
+
+    response = async_to_sync(async_client.get)(
+        f'{reverse("search_async")}?{urlencode({"q": text_input[0]})}'
+    )
+    assert response.status_code == 201
+
+    out = response.json()
+    assert out["data"][0]["book"] == text_input[1]
+    assert out["data"][0]["chapter"] == text_input[2]
+    assert out["data"][0]["verse"] == text_input[3]
+    assert out["data"][0]["text"]
+
+
+def test_translation_selection(client, settings):
+    """``?v=`` picks translations; several return each verse in all of them."""
+
+    url = reverse("search")
+    response = client.get(f'{url}?{urlencode({"q": "Luke 1:28", "v": "NASB95"})}')
+    assert response.status_code == 201
+    assert "translations" not in response.json()["data"][0]
+
+    assert (
+        client.get(f'{url}?{urlencode({"q": "Luke 1:28", "v": "xyz"})}').status_code
+        == 400
+    )
+
+    settings.BIBLE_TRANSLATIONS = ["nasb95", "other"]
+    response = client.get(
+        f'{url}?{urlencode({"q": "Luke 1:5-6", "v": "nasb95,other"})}'
+    )
+    assert response.status_code == 201
+    for verse in response.json()["data"]:
+        assert verse["translations"]["nasb95"] == verse["text"]
+        assert "other" in verse["translations"]
+
+
+def test_reference_list(client):
+    """A list of references returns every verse, in query order."""
+
+    query = "Luke 1:5-6; 1 Jn 3:16; Luke 1:80"
+    response = client.get(f'{reverse("search")}?{urlencode({"q": query})}')
+    assert response.status_code == 201
+    assert [
+        (verse["book"], verse["chapter"], verse["verse"])
+        for verse in response.json()["data"]
+    ] == [("Luke", 1, 5), ("Luke", 1, 6), ("1 John", 3, 16), ("Luke", 1, 80)]
+
+    query = "Luke 1:5; Luke 1:99"
+    response = client.get(f'{reverse("search")}?{urlencode({"q": query})}')
+    assert response.status_code == 404
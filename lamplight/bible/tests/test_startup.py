@@ -0,0 +1,32 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT = Path(__file__).resolve().parents[2]
+
+WORKER = """
+import json, sys
+from benchmarks import bench_startup
+bench_startup.start_worker("benchmarks.settings_api")
+print(json.dumps(sorted(
+    name for name in sys.modules
+    if name.split(".")[0] in ("pysolr", "requests", "httpx")
+    or name.startswith(("django.contrib.admin", "django.contrib.sessions"))
+)))
+"""
+
+
+def test_api_profile():
+    """The API-only profile answers searches without the admin or Solr clients."""
+
+    worker = subprocess.run(
+        [sys.executable, "-c", WORKER],
+        cwd=PROJECT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    started, loaded = worker.stdout.strip().splitlines()[-2:]
+    assert json.loads(started)["status"] == 201
+    assert json.loads(loaded) == []
@@ -0,0 +1,43 @@
+from urllib.parse import urlencode
+
+from django.urls import reverse
+
+
+def test_verses_by_number(client):
+    """A Strong's number lists its verses in order, with the words it tags."""
+
+    response = client.get(reverse("strongs", args=["g4183"]))
+    assert response.status_code == 201
+
+    out = response.json()
+    assert out["count"] == len(out["data"]) == 3
+    assert [(verse["book"], verse["chapter"]) for verse in out["data"]] == [
+        ("Luke", 1)
+    ] * 3
+    verses = [verse["verse"] for verse in out["data"]]
+    assert verses == sorted(verses)
+    assert out["data"][0]["verse"] == 1
+    assert out["data"][0]["words"] == ["as many"]
+    assert "<G4183>" in out["data"][0]["text"]
+
+    paged = client.get(f'{reverse("strongs", args=["G4183"])}?start=1&rows=1')
+    assert paged.json()["count"] == 3
+    assert [verse["verse"] for verse in paged.json()["data"]] == verses[1:2]
+
+
+def test_unknown_number(client):
+    """Malformed numbers are rejected and unused ones aren't found."""
+
+    assert client.get(reverse("strongs", args=["luke"])).status_code == 400
+    assert client.get(reverse("strongs", args=["G99999"])).status_code == 404
+
+
+def test_words_to_numbers(client):
+    """An English phrase maps to the Strong's numbers behind it."""
+
+    response = client.get(f'{reverse("strongs_gloss")}?{urlencode({"q": "As many,"})}')
+    assert response.status_code == 201
+    assert response.json()["data"] == [{"strongs": "G4183", "count": 1}]
+
+    response = client.get(f'{reverse("strongs_gloss")}?{urlencode({"q": "zzz"})}')
+    assert response.json()["data"] == []
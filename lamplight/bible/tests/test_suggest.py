@@ -0,0 +1,52 @@
+from urllib.parse import urlencode
+
+import pytest
+from django.urls import reverse
+
+
+def suggest(client, query, **params):
+    response = client.get(f'{reverse("suggest")}?{urlencode({"q": query, **params})}')
+    assert response.status_code == 201
+    return [suggestion["text"] for suggestion in response.json()["data"]]
+
+
+@pytest.mark.parametrize(
+    "query, first",
+    [
+        ("lu", "Luke"),
+        ("1 jo", "1 John"),
+        ("1jn", "1 John"),
+        ("2 sm", "2 Samuel"),
+        ("song of s", "Song Of Songs"),
+        ("luek", "Luke"),
+        ("genisis", "Genesis"),
+    ],
+)
+def test_books(client, query, first):
+    """Book names, codes and abbreviations complete, misspelled ones too."""
+
+    assert suggest(client, query)[0] == first
+
+
+def test_references(client):
+    """Once a reference has a number its chapters and verses complete."""
+
+    assert suggest(client, "Luke 1") == ["Luke 1"]
+    assert suggest(client, "lk 1:", rows=3) == ["Luke 1:1", "Luke 1:2", "Luke 1:3"]
+    assert suggest(client, "luke 1:2", rows=3) == ["Luke 1:2", "Luke 1:20", "Luke 1:21"]
+    assert suggest(client, "Luke 1:99") == []
+
+
+def test_phrases(client):
+    """Phrases complete after the books, most frequent first."""
+
+    found = suggest(client, "as")
+    assert "as many" in found
+    assert suggest(client, "as many") == ["as many"]
+    assert suggest(client, "zzz") == []
+    assert len(suggest(client, "a", rows=2)) == 2
+
+
+def test_bad_request(client):
+    response = client.get(f'{reverse("suggest")}?{urlencode({"q": "lu", "rows": "x"})}')
+    assert response.status_code == 400
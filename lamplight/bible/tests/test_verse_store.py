@@ -0,0 +1,137 @@
+import io
+from urllib.parse import urlencode
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.urls import reverse
+from django_redis import get_redis_connection
+
+from bible.management.commands import build_verse_store
+from bible.utilities import revision
+from bible.utilities.versestore import LocalVerseStore, VerseStore, write_store
+
+
+def test_lookup(tmp_path):
+    """Verses are addressed by canonical number; gaps and overruns are None."""
+
+    path = tmp_path / "t.vs"
+    count = write_store(
+        [
+            ("gen", [{1: "In the beginning", 2: "The earth"}, {2: "Thus"}]),
+            ("exo", [{1: "Now these"}]),
+        ],
+        path,
+        revision=7,
+        titles={"gen": "Genesis"},
+    )
+    store = VerseStore(path)
+
+    assert count == store.verse_count == 5
+    assert store.revision == 7
+    assert [store.number("gen", 1, 1), store.number("exo", 1, 1)] == [0, 4]
+    assert store.verse("gen", 1, 2) == "The earth"
+    assert store.verse("gen", 2, 1) is None
+    assert store.verse("gen", 3, 1) is None
+    assert store.verse("lev", 1, 1) is None
+    assert store.verses("gen", 1) == [(1, "In the beginning"), (2, "The earth")]
+    assert store.verses("gen", 1, 2, 9) == [(2, "The earth")]
+    assert store.fragment(0) == (
+        b'{"book":"Genesis","chapter":1,"verse":1,"text":"In the beginning"}'
+    )
+    assert store.fragments("gen", 2) == (
+        b'{"book":"Genesis","chapter":2,"verse":2,"text":"Thus"}'
+    )
+    assert store.fragments("exo", 1, 1, 1).startswith(b'{"book":"exo"')
+    assert store.fragments("gen", 2, 1, 1) == b""
+
+
+@pytest.fixture(name="verse_store")
+def fixture_verse_store(settings, tmp_path):
+    settings.VERSE_STORE = {
+        **settings.VERSE_STORE,
+        "PATH": str(tmp_path / "{translation}.vs"),
+    }
+    settings.SEARCH_CACHE = {**settings.SEARCH_CACHE, "ENABLED": False}
+    call_command("build_verse_store", stdout=io.StringIO())
+    revision._indexes.pop((LocalVerseStore, "nasb95"), None)
+    yield VerseStore(tmp_path / "nasb95.vs")
+    revision._indexes.pop((LocalVerseStore, "nasb95"), None)
+
+
+def test_store_matches_redis(verse_store):
+    """The store holds every loaded verse, books in canonical order."""
+
+    redis_conn = get_redis_connection("default")
+    for book, chapter in [("luk", 1), ("1jo", 3), ("sng", 1)]:
+        verses = redis_conn.hgetall(f"nasb95:{book}:{chapter}:verses")
+        assert verse_store.verses(book, chapter) == sorted(
+            (int(num), text) for num, text in verses.items()
+        )
+    assert verse_store.number("luk", 1, 1) < verse_store.number("1jo", 3, 16)
+    assert verse_store.verse("sng", 1, 3) is None
+
+    # the same verse JSON bible_to_redis.py renders
+    fragments = redis_conn.hmget("nasb95:luk:1:json", range(1, 5))
+    assert verse_store.fragments("luk", 1, 1, 4) == ",".join(fragments).encode()
+
+
+def test_search_reads_store(client, settings, verse_store):
+    """Searches read verses from the store while it matches the revision."""
+
+    url = f'{reverse("search")}?{urlencode({"q": "Luke 1:5-6"})}'
+    client.get(url)  # loads the store
+    response = client.get(url)
+    assert [verse["verse"] for verse in response.json()["data"]] == [5, 6]
+    assert response.content.startswith(b'{"data":[{"book":"Luke"')
+    assert "store;dur=" in response["Server-Timing"]
+    assert "redis" not in response["Server-Timing"]
+
+    response = client.get(f'{reverse("search")}?{urlencode({"q": "priestly"})}')
+    assert response.json()["data"][0]["text"] == verse_store.verse("luk", 1, 23)
+
+    # rebuilding another index leaves it in use
+    redis_conn = get_redis_connection("default")
+    redis_conn.hincrby("nasb95", "revision", 1)
+    settings.BIBLE_INDEX_REFRESH_SECONDS = 0
+    assert "store;dur=" in client.get(url)["Server-Timing"]
+
+    # reloading the translation's text makes the store stale
+    redis_conn.hincrby("nasb95", "text_revision", 1)
+    redis_conn.hincrby("nasb95", "revision", 1)
+    response = client.get(url)
+    assert [verse["verse"] for verse in response.json()["data"]] == [5, 6]
+    assert "store" not in response["Server-Timing"]
+    assert "redis;dur=" in response["Server-Timing"]
+
+
+def test_search_async_reads_store(async_client, verse_store):
+    """The async view reads the store the same way."""
+
+    url = f'{reverse("search_async")}?{urlencode({"q": "Luke 1"})}'
+    response = async_to_sync(async_client.get)(url)
+    assert response.status_code == 201
+    assert len(response.json()["data"]) == len(verse_store.verses("luk", 1))
+    assert "store;dur=" in response["Server-Timing"]
+
+
+def test_reload_during_build(settings, tmp_path, monkeypatch):
+    """A store built while the text was reloaded is stamped with the old text."""
+
+    settings.VERSE_STORE = {
+        **settings.VERSE_STORE,
+        "PATH": str(tmp_path / "{translation}.vs"),
+    }
+    redis_conn = get_redis_connection("default")
+    before = int(redis_conn.hget("nasb95", "text_revision") or 0)
+    read_books = build_verse_store.read_books
+
+    def reloading(redis_conn, translation):
+        redis_conn.hincrby(translation, "text_revision", 1)
+        return read_books(redis_conn, translation)
+
+    monkeypatch.setattr(build_verse_store, "read_books", reloading)
+    stderr = io.StringIO()
+    call_command("build_verse_store", stdout=io.StringIO(), stderr=stderr)
+    assert VerseStore(tmp_path / "nasb95.vs").revision == before
+    assert "run build_verse_store again" in stderr.getvalue()
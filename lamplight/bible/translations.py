@@ -0,0 +1,34 @@
+"""Translation selection for the search endpoints.
+
+Translations share book codes and verse numbering, and each one lives under
+its own key prefix (``{translation}:{book}:{chapter}:{verse}``), the
+``hash_prefix`` the ingest scripts load it with.
+"""
+
+from django.conf import settings
+
+
+def default():
+    """The translation used when a request doesn't pick one."""
+    return settings.BIBLE_DEFAULT_TRANSLATION
+
+
+def requested(request):
+    """Translations picked with ``?v=``, e.g. ``?v=nasb95`` or ``?v=nasb95,kjv``.
+
+    The first one is the primary translation: references are validated and
+    full-text queries are run against it, the others are compared alongside.
+
+    Returns:
+        list: Translation prefixes without duplicates, or None if any of them
+        isn't one of ``settings.BIBLE_TRANSLATIONS``
+    """
+    value = request.GET.get("v") or default()
+    translations = list(
+        dict.fromkeys(name.strip().lower() for name in value.split(",") if name.strip())
+    )
+    if not translations or any(
+        name not in settings.BIBLE_TRANSLATIONS for name in translations
+    ):
+        return None
+    return translations
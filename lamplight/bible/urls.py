@@ -1,7 +1,21 @@
 """Urls handled by the Bible App"""
 
+from django.conf import settings
 from django.urls import path
 
 from . import views
 
-urlpatterns = [path("search/", views.search, name="search")]
+urlpatterns = [
+    path(
+        "search/",
+        views.search_async if settings.ASYNC_VIEWS else views.search,
+        name="search",
+    ),
+    path("search/async/", views.search_async, name="search_async"),
+    path("batch/", views.batch, name="batch"),
+    path("suggest/", views.suggest, name="suggest"),
+    path("navigate/", views.navigate, name="navigate"),
+    path("metrics", views.metrics_view, name="metrics"),
+    path("strongs/", views.strongs, name="strongs_gloss"),
+    path("strongs/<str:number>/", views.strongs, name="strongs"),
+]
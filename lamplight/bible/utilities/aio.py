@@ -0,0 +1,87 @@
+"""Async Redis and Solr clients for the ASGI search view.
+
+Both clients are bound to an event loop, so one is kept per running loop
+(in practice one per ASGI worker).  httpx is only imported once the Solr
+client is first needed, so WSGI workers never load it.
+"""
+
+import asyncio
+import weakref
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django_redis import get_redis_connection
+
+from .metrics import InstrumentedAsyncRedis, timed
+from .revision import index_instance
+from .solr import timeout
+
+_redis_clients = weakref.WeakKeyDictionary()
+_solr_clients = weakref.WeakKeyDictionary()
+
+
+def __getattr__(name):
+    # HTTPError, what the Solr client raises, without importing httpx upfront
+    if name == "HTTPError":
+        import httpx  # pylint: disable=import-outside-toplevel
+
+        return httpx.HTTPError
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def get_redis():
+    """Return the running loop's async Redis client for the default cache."""
+    loop = asyncio.get_running_loop()
+    client = _redis_clients.get(loop)
+    if client is None:
+        config = settings.CACHES["default"]
+        client = InstrumentedAsyncRedis.from_url(
+            config["LOCATION"],
+            password=config.get("OPTIONS", {}).get("PASSWORD"),
+            decode_responses=True,
+        )
+        _redis_clients[loop] = client
+    return client
+
+
+def get_solr():
+    """Return the running loop's pooled async HTTP client for Solr."""
+    loop = asyncio.get_running_loop()
+    client = _solr_clients.get(loop)
+    if client is None:
+        import httpx  # pylint: disable=import-outside-toplevel
+
+        config = settings.SOLR
+        pool_size = config.get("POOL_SIZE", 10)
+        client = httpx.AsyncClient(
+            base_url=config["URL"],
+            timeout=timeout(),
+            limits=httpx.Limits(
+                max_connections=pool_size, max_keepalive_connections=pool_size
+            ),
+            auth=(config["USER"], config["PASSWORD"]) if config.get("USER") else None,
+        )
+        _solr_clients[loop] = client
+    return client
+
+
+async def solr_search(query, params):
+    """Run a select query against Solr and return the matching documents."""
+    with timed("solr"):
+        response = await get_solr().get(
+            "select", params={"q": query, "wt": "json", **params}
+        )
+    response.raise_for_status()
+    return response.json()["response"]["docs"]
+
+
+async def get_index(index_class, prefix):
+    """Async variant of ``revision.get_index``.
+
+    Only hops to a thread (for the sync Redis check) when the in-memory
+    table is due for a revision check.
+    """
+    index = index_instance(index_class, prefix)
+    if not index.is_fresh():
+        await sync_to_async(index.ensure_fresh)(get_redis_connection("default"))
+    return index
@@ -0,0 +1,114 @@
+"""In-memory resolver from user-typed book names to translation book codes.
+
+The book/code table written by ``version_to_redis.py`` is loaded once per
+worker, so resolving a book name during a search needs no Redis calls.
+"""
+
+from . import levenshtein
+from .revision import RevisionedIndex, get_index
+
+
+def normalize(name):
+    """Lowercase a book name and collapse any runs of whitespace."""
+    return " ".join(name.lower().replace(".", " ").split())
+
+
+def display_name(name):
+    """Display form of a lowercase book name, e.g. ``1 john`` -> ``1 John``."""
+    return " ".join(word.capitalize() for word in name.split(" "))
+
+
+class BookIndex(RevisionedIndex):
+    """Exact-name, short-code, no-space, prefix and fuzzy book lookups."""
+
+    def __init__(self, prefix):
+        super().__init__(prefix)
+        self.build([])
+
+    def build(self, table):
+        """Index a list of ``(name, code)`` pairs given in canonical order."""
+        self.codes = [code for _, code in table]
+        self.names = {name: code for name, code in table}
+        self.titles = {code: display_name(name) for name, code in table}
+
+        compact = {}
+        for name, code in table:
+            compact.setdefault(name.replace(" ", ""), code)
+        for code in self.codes:
+            compact.setdefault(code, code)
+        self._compact = compact
+
+        # candidates for the fuzzy fallback, names first so they win ties
+        self._fuzzy_keys = [name.replace(" ", "") for name, _ in table] + self.codes
+        self._fuzzy_codes = self.codes + self.codes
+
+    def load(self, redis_conn):
+        pipe = redis_conn.pipeline(transaction=False)
+        pipe.hgetall(f"{self.prefix}:books")
+        pipe.lrange(f"{self.prefix}:canon", 0, -1)
+        books, canon = pipe.execute()
+
+        if not books:
+            # data loaded before the aggregate hash existed
+            keys = list(redis_conn.scan_iter(match=f"{self.prefix}:books:*"))
+            pipe = redis_conn.pipeline(transaction=False)
+            for key in keys:
+                pipe.hget(key, "code")
+            books = {
+                key[len(f"{self.prefix}:books:") :]: code
+                for key, code in zip(keys, pipe.execute())
+                if code
+            }
+
+        order = {code: i for i, code in enumerate(canon)}
+        table = sorted(books.items(), key=lambda item: order.get(item[1], len(order)))
+        self.build(table)
+
+    def resolve(self, name, fuzzy=True, max_distance=None):
+        """Find the book code for a (possibly misspelled) book name.
+
+        Args:
+            name (str): Book name as typed, e.g. ``"1JOhn"`` or ``"Luek"``
+            fuzzy (bool): Fall back to the closest book by edit distance
+            max_distance (int, optional): Furthest edit distance the fuzzy
+                fallback accepts
+
+        Returns:
+            str: The book code, or None if nothing matched
+        """
+        name = normalize(name)
+        if not name:
+            return None
+
+        code = self.names.get(name)
+        if code:
+            return code
+
+        compact = name.replace(" ", "")
+        code = self._compact.get(compact)
+        if code:
+            return code
+
+        if len(compact) > 1:
+            matches = {
+                self._fuzzy_codes[i]
+                for i, key in enumerate(self._fuzzy_keys)
+                if key.startswith(compact)
+            }
+            if len(matches) == 1:
+                return matches.pop()
+
+        if not fuzzy:
+            return None
+
+        best, _ = levenshtein.closest(compact, self._fuzzy_keys, max_distance)
+        return None if best is None else self._fuzzy_codes[best]
+
+    def title(self, code):
+        """Display name for a book code."""
+        return self.titles.get(code, code)
+
+
+def get_book_index(redis_conn, prefix="nasb95"):
+    """Return this worker's book index for a translation, loading it if needed."""
+    return get_index(BookIndex, redis_conn, prefix)
@@ -0,0 +1,64 @@
+"""Circuit breaker for calls to a remote service such as Solr.
+
+After ``failures`` consecutive failed or over-budget calls the breaker
+opens and callers skip the service for ``reset`` seconds.  Then a single
+trial call is let through: if it succeeds the breaker closes again,
+otherwise it stays open for another ``reset`` seconds.
+"""
+
+import threading
+import time
+
+
+class CircuitBreaker:
+    """Thread-safe closed / open / half-open breaker."""
+
+    def __init__(self, failures=5, reset=30.0):
+        self.failures = failures
+        self.reset = reset
+        self._lock = threading.Lock()
+        self._failed = 0
+        self._opened_at = None
+        self._trial = False
+
+    @property
+    def is_open(self):
+        """True while calls are being skipped."""
+        with self._lock:
+            return self._opened_at is not None
+
+    def allow(self):
+        """Whether a call may go to the service now.
+
+        While open, one caller per ``reset`` period is allowed through as a
+        trial and must report back with ``record``.
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if not self._trial and time.monotonic() - self._opened_at >= self.reset:
+                self._trial = True
+                return True
+            return False
+
+    def record(self, success):
+        """Report the outcome of a call that ``allow`` let through."""
+        with self._lock:
+            if success:
+                self._failed = 0
+                self._opened_at = None
+            else:
+                self._failed += 1
+                if self._trial or self._failed >= self.failures:
+                    self._opened_at = time.monotonic()
+            self._trial = False
+
+    def release(self):
+        """Hand back a call ``allow`` let through without judging Solr by it.
+
+        For calls that ended for reasons of their own, such as a search
+        cancelled once a reference answered: a half-open trial is freed for
+        the next caller and nothing counts as a failure.
+        """
+        with self._lock:
+            self._trial = False
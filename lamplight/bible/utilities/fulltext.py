@@ -0,0 +1,313 @@
+"""Embedded full-text engine for the verses collection.
+
+An inverted index over the same documents ``biblecsv_to_solrdoc.py`` feeds
+to Solr, written to one file per translation and memory-mapped, so every
+worker shares the postings through the page cache.  Scoring follows the
+edismax setup in ``SOLR_PARAMS``: BM25 over the terms of the query, plus a
+boosted score for verses that contain the whole query as a (sloppy)
+phrase.
+
+File layout (native byte order, sections 4-byte aligned)::
+
+    header     magic, version, doc count, term count, average doc length,
+               offsets of the sections below and the length of terms
+    doc_lens   u16 per document: number of terms
+    id_offs    u32 per document + 1: offsets into id_blob
+    id_blob    utf-8 document ids
+    terms      newline-separated utf-8 terms, sorted
+    term_offs  u32 per term + 1: offsets of each term's postings
+    postings   per term: n, then u32 doc[n], u32 pos_start[n + 1],
+               u16 positions[pos_start[n]]
+"""
+
+import math
+import mmap
+import os
+import re
+import struct
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.conf import settings
+
+from .revision import RevisionedIndex, get_index
+
+MAGIC = b"LLFT"
+VERSION = 1
+HEADER = struct.Struct("<4sIIId6Q")
+
+TOKEN_RE = re.compile(r"\w+")
+
+# BM25 parameters, as Solr's defaults
+K1 = 1.2
+B = 0.75
+# the pf boost and ps slop of SOLR_PARAMS
+PHRASE_BOOST = 10.0
+PHRASE_SLOP = 10
+# candidates re-scored for the phrase boost, per row asked for
+PHRASE_CANDIDATES = 5
+
+
+def tokenize(text):
+    """Lowercased word tokens, as the collection's _text_ field is analyzed."""
+    return TOKEN_RE.findall(text.lower())
+
+
+def _align(out):
+    out.write(b"\0" * (-out.tell() % 4))
+
+
+def write_index(docs, path):
+    """
+    Build an index file from Solr documents.
+
+    The file is written next to ``path`` and renamed over it, so workers
+    with the old file mapped keep reading it until they reopen.
+
+    Args:
+        docs (iterable): Documents with ``id`` and ``_text_`` fields
+        path (str): Where to write the index
+
+    Returns:
+        int: Number of documents indexed
+    """
+    ids = []
+    lengths = []
+    postings = defaultdict(lambda: defaultdict(list))
+    for doc in docs:
+        number = len(ids)
+        ids.append(doc["id"])
+        tokens = tokenize(doc.get("_text_", ""))
+        lengths.append(min(len(tokens), 0xFFFF))
+        for position, token in enumerate(tokens[:0xFFFF]):
+            postings[token][number].append(position)
+
+    terms = sorted(postings)
+    avgdl = sum(lengths) / len(lengths) if lengths else 0.0
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as out:
+        out.write(b"\0" * HEADER.size)
+        _align(out)
+
+        doc_lens_at = out.tell()
+        array("H", lengths).tofile(out)
+        _align(out)
+
+        id_blob = [doc_id.encode("utf-8") for doc_id in ids]
+        id_offs = array("I", [0])
+        for encoded in id_blob:
+            id_offs.append(id_offs[-1] + len(encoded))
+        id_offs_at = out.tell()
+        id_offs.tofile(out)
+        id_blob_at = out.tell()
+        out.write(b"".join(id_blob))
+        _align(out)
+
+        terms_at = out.tell()
+        terms_len = out.write("\n".join(terms).encode("utf-8"))
+        _align(out)
+
+        # postings go after the offsets table, which is filled in at the end
+        term_offs_at = out.tell()
+        out.write(b"\0" * 4 * (len(terms) + 1))
+        term_offs = array("I")
+        for term in terms:
+            term_offs.append(out.tell())
+            by_doc = postings[term]
+            doc_numbers = sorted(by_doc)
+            starts = array("I", [0])
+            positions = array("H")
+            for number in doc_numbers:
+                positions.extend(by_doc[number])
+                starts.append(len(positions))
+            array("I", [len(doc_numbers)]).tofile(out)
+            array("I", doc_numbers).tofile(out)
+            starts.tofile(out)
+            positions.tofile(out)
+            _align(out)
+        term_offs.append(out.tell())
+
+        out.seek(term_offs_at)
+        term_offs.tofile(out)
+        out.seek(0)
+        out.write(
+            HEADER.pack(
+                MAGIC,
+                VERSION,
+                len(ids),
+                len(terms),
+                avgdl,
+                doc_lens_at,
+                id_offs_at,
+                id_blob_at,
+                terms_at,
+                terms_len,
+                term_offs_at,
+            )
+        )
+    os.replace(tmp_path, path)
+    return len(ids)
+
+
+class FullTextIndex:
+    """Read-only, memory-mapped index written by ``write_index``."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+
+        (
+            magic,
+            version,
+            self.doc_count,
+            term_count,
+            self.avgdl,
+            doc_lens_at,
+            id_offs_at,
+            id_blob_at,
+            terms_at,
+            terms_len,
+            term_offs_at,
+        ) = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} full-text index")
+
+        count = self.doc_count
+        self._doc_lens = view[doc_lens_at : doc_lens_at + 2 * count].cast("H")
+        self._id_offs = view[id_offs_at : id_offs_at + 4 * (count + 1)].cast("I")
+        self._id_blob_at = id_blob_at
+        self._term_offs = view[term_offs_at : term_offs_at + 4 * (term_count + 1)].cast(
+            "I"
+        )
+        # the term dictionary is small; everything else stays in the mapping
+        terms = bytes(view[terms_at : terms_at + terms_len]).decode("utf-8")
+        self._terms = {term: i for i, term in enumerate(terms.split("\n")) if term}
+
+    def doc_id(self, number):
+        """The id of a document, e.g. ``nasb95:luk:1:1``."""
+        start = self._id_blob_at + self._id_offs[number]
+        end = self._id_blob_at + self._id_offs[number + 1]
+        return self._mmap[start:end].decode("utf-8")
+
+    def _postings(self, term):
+        """Doc numbers, position starts and positions for a term, or None."""
+        index = self._terms.get(term)
+        if index is None:
+            return None
+        at = self._term_offs[index]
+        view = memoryview(self._mmap)
+        (count,) = struct.unpack_from("I", self._mmap, at)
+        at += 4
+        docs = view[at : at + 4 * count].cast("I")
+        at += 4 * count
+        starts = view[at : at + 4 * (count + 1)].cast("I")
+        at += 4 * (count + 1)
+        positions = view[at : at + 2 * starts[count]].cast("H")
+        return docs, starts, positions
+
+    def _idf(self, doc_freq):
+        return math.log(1 + (self.doc_count - doc_freq + 0.5) / (doc_freq + 0.5))
+
+    def _bm25(self, freq, length, idf):
+        norm = K1 * (1 - B + B * length / self.avgdl) if self.avgdl else K1
+        return idf * freq * (K1 + 1) / (freq + norm)
+
+    def search(self, query, rows=10):
+        """
+        Rank documents against a query.
+
+        Args:
+            query (str): Free text
+            rows (int): Number of documents to return
+
+        Returns:
+            list: ``{"id", "score"}`` dicts, best first, like Solr's docs
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        postings = {}
+        for term in terms:
+            found = self._postings(term)
+            if found is not None:
+                postings[term] = found
+        if not postings:
+            return []
+
+        scores = defaultdict(float)
+        idfs = {}
+        for term, (docs, starts, _) in postings.items():
+            idf = idfs[term] = self._idf(len(docs))
+            for i, number in enumerate(docs):
+                scores[number] += self._bm25(
+                    starts[i + 1] - starts[i], self._doc_lens[number], idf
+                )
+
+        if len(terms) > 1 and len(postings) == len(terms):
+            phrase_idf = sum(idfs.values())
+            candidates = sorted(scores, key=scores.get, reverse=True)
+            for number in candidates[: rows * PHRASE_CANDIDATES]:
+                freq = self._phrase_freq(number, terms, postings)
+                if freq:
+                    scores[number] += PHRASE_BOOST * self._bm25(
+                        freq, self._doc_lens[number], phrase_idf
+                    )
+
+        # ties go to the shorter verse, then to the earlier one
+        best = sorted(
+            scores, key=lambda number: (-scores[number], self._doc_lens[number], number)
+        )
+        return [
+            {"id": self.doc_id(number), "score": scores[number]}
+            for number in best[:rows]
+        ]
+
+    def _phrase_freq(self, number, terms, postings):
+        """How often the terms occur in order within ``PHRASE_SLOP`` extra positions."""
+        per_term = []
+        for term in terms:
+            docs, starts, positions = postings[term]
+            i = bisect_left(docs, number)
+            if i == len(docs) or docs[i] != number:
+                return 0
+            per_term.append(positions[starts[i] : starts[i + 1]])
+
+        freq = 0
+        for first in per_term[0]:
+            previous = first
+            for positions in per_term[1:]:
+                later = [p for p in positions if p > previous]
+                if not later:
+                    break
+                previous = later[0]
+            else:
+                if previous - first - (len(terms) - 1) <= PHRASE_SLOP:
+                    freq += 1
+        return freq
+
+
+def index_path(translation):
+    """Where a translation's index lives, from ``settings.FULLTEXT['PATH']``."""
+    return str(settings.FULLTEXT["PATH"]).format(translation=translation)
+
+
+class LocalFullText(RevisionedIndex):
+    """This worker's mapping of a translation's index file.
+
+    Reopened when the translation's revision moves, which the build command
+    bumps after replacing the file.
+    """
+
+    def __init__(self, prefix):
+        super().__init__(prefix)
+        self.index = None
+
+    def load(self, redis_conn):
+        path = index_path(self.prefix)
+        self.index = FullTextIndex(path) if os.path.exists(path) else None
+
+
+def get_local_fulltext(redis_conn, prefix="nasb95"):
+    """Return this worker's full-text index for a translation, or None if unbuilt."""
+    return get_index(LocalFullText, redis_conn, prefix).index
@@ -1,4 +1,63 @@
-def distance(str1, str2):
+"""Levenshtein edit distance.
+
+Distances are computed with Myers' bit-parallel algorithm (in Hyyrö's
+formulation for edit distance): one machine-word-style integer per string
+instead of an (m+1)x(n+1) matrix.  The bit masks for a query are built
+once, so scoring it against many candidates only costs one pass over each
+candidate.
+"""
+
+
+def _pattern_masks(pattern):
+    """Map each character of the pattern to a bit mask of its positions."""
+    masks = {}
+    for i, char in enumerate(pattern):
+        masks[char] = masks.get(char, 0) | (1 << i)
+    return masks
+
+
+def _bit_parallel(masks, length, text, max_distance=None):
+    """Edit distance between a pattern (given as its masks) and a text.
+
+    Returns ``max_distance + 1`` as soon as the distance is known to exceed
+    ``max_distance``.
+    """
+    if not length:
+        return len(text)
+
+    full = (1 << length) - 1
+    last = 1 << (length - 1)
+    vp = full
+    vn = 0
+    score = length
+    remaining = len(text)
+
+    for char in text:
+        eq = masks.get(char, 0)
+        xv = eq | vn
+        xh = (((eq & vp) + vp) ^ vp) | eq
+        hp = vn | (~(xh | vp) & full)
+        hn = vp & xh
+
+        if hp & last:
+            score += 1
+        elif hn & last:
+            score -= 1
+
+        # every remaining character can lower the score by at most one
+        remaining -= 1
+        if max_distance is not None and score - remaining > max_distance:
+            return max_distance + 1
+
+        hp = ((hp << 1) | 1) & full
+        hn = (hn << 1) & full
+        vp = hn | (~(xv | hp) & full)
+        vn = hp & xv
+
+    return score
+
+
+def distance(str1, str2, max_distance=None):
     """
     Calculate the Levenshtein distance between two strings.
 
@@ -9,40 +68,79 @@ def distance(str1, str2):
     Args:
         str1 (str): First string
         str2 (str): Second string
+        max_distance (int, optional): Stop early once the distance is known to
+            be larger than this
 
     Returns:
-        int: The Levenshtein distance between the two strings
+        int: The Levenshtein distance between the two strings, or
+        ``max_distance + 1`` if it exceeds ``max_distance``
     """
-    # Create a matrix of size (len(str1)+1) x (len(str2)+1)
-    rows = len(str1) + 1
-    cols = len(str2) + 1
-
-    # Initialize the matrix with default values
-    matrix = [[0 for _ in range(cols)] for _ in range(rows)]
-
-    # Initialize the first row and column with incremental values
-    for i in range(rows):
-        matrix[i][0] = i
-
-    for j in range(cols):
-        matrix[0][j] = j
-
-    # Fill in the rest of the matrix
-    for i in range(1, rows):
-        for j in range(1, cols):
-            if str1[i - 1] == str2[j - 1]:
-                # Characters match, no additional cost
-                cost = 0
-            else:
-                # Characters don't match, add substitution cost
-                cost = 1
-
-            # Calculate the minimum edit distance
-            matrix[i][j] = min(
-                matrix[i - 1][j] + 1,  # Deletion
-                matrix[i][j - 1] + 1,  # Insertion
-                matrix[i - 1][j - 1] + cost,  # Substitution
-            )
-
-    # The bottom-right cell contains the final distance
-    return matrix[rows - 1][cols - 1]
+    if len(str1) > len(str2):
+        str1, str2 = str2, str1
+
+    if max_distance is not None and len(str2) - len(str1) > max_distance:
+        return max_distance + 1
+
+    return _bit_parallel(_pattern_masks(str1), len(str1), str2, max_distance)
+
+
+def distance_many(query, candidates, max_distance=None):
+    """
+    Calculate the Levenshtein distance from one query to many candidates.
+
+    Args:
+        query (str): String to compare
+        candidates (iterable of str): Strings to compare the query against
+        max_distance (int, optional): Cutoff applied to every candidate
+
+    Returns:
+        list of int: One distance per candidate, in order; distances larger
+        than ``max_distance`` are reported as ``max_distance + 1``
+    """
+    masks = _pattern_masks(query)
+    length = len(query)
+    out = []
+    for candidate in candidates:
+        if max_distance is not None and abs(len(candidate) - length) > max_distance:
+            out.append(max_distance + 1)
+        else:
+            out.append(_bit_parallel(masks, length, candidate, max_distance))
+    return out
+
+
+def closest(query, candidates, max_distance=None):
+    """
+    Find the candidate closest to the query.
+
+    The best distance found so far is used as the cutoff for the remaining
+    candidates, so most of them are abandoned after a few characters.
+
+    Args:
+        query (str): String to compare
+        candidates (sequence of str): Strings to compare the query against
+        max_distance (int, optional): Ignore candidates further away than this
+
+    Returns:
+        tuple: ``(index, distance)`` of the first closest candidate, or
+        ``(None, None)`` if no candidate is within ``max_distance``
+    """
+    masks = _pattern_masks(query)
+    length = len(query)
+    best_index = None
+    best_distance = None
+    cutoff = max_distance
+
+    for i, candidate in enumerate(candidates):
+        if cutoff is not None and abs(len(candidate) - length) > cutoff:
+            continue
+
+        dist = _bit_parallel(masks, length, candidate, cutoff)
+        if cutoff is None or dist <= cutoff:
+            best_index = i
+            best_distance = dist
+            if dist == 0:
+                break
+            # only a strictly better candidate may replace the current best
+            cutoff = dist - 1
+
+    return best_index, best_distance
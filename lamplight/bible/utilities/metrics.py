@@ -0,0 +1,198 @@
+"""Where request time goes: per-request timings and per-worker totals.
+
+Code on the hot path wraps its work in ``timed(phase)``; Redis clients
+built from ``InstrumentedRedis`` / ``InstrumentedAsyncRedis`` and the Solr
+clients do so by themselves.  Each phase's call count and time are added
+both to the current request (a context variable, so this works for sync
+views, async views and ``sync_to_async`` threads alike), which the
+middleware reports in a ``Server-Timing`` header, and to the worker's
+totals, which ``render`` exports in the Prometheus text format.
+
+Totals are per worker process, like the default prometheus_client
+registry, so each worker should be scraped on its own port or the series
+summed across workers.
+"""
+
+import contextlib
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+import redis
+import redis.asyncio
+
+# upper bounds (seconds) of the request duration histogram buckets
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_current = contextvars.ContextVar("request_timings", default=None)
+
+
+class RequestTimings:
+    """Call counts and seconds per phase for one request."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases = defaultdict(lambda: [0, 0.0])
+
+    def add(self, phase, seconds, calls=1):
+        entry = self.phases[phase]
+        entry[0] += calls
+        entry[1] += seconds
+
+    def server_timing(self, total):
+        """The value of a ``Server-Timing`` header, durations in milliseconds."""
+        parts = [
+            f'{phase};dur={seconds * 1e3:.3f};desc="{calls}"'
+            for phase, (calls, seconds) in sorted(self.phases.items())
+        ]
+        parts.append(f"total;dur={total * 1e3:.3f}")
+        return ", ".join(parts)
+
+
+class Registry:
+    """Worker-wide totals, safe to update from any thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self.phases = defaultdict(lambda: [0, 0.0])
+        self.requests = defaultdict(int)
+        self.durations = defaultdict(lambda: [[0] * (len(BUCKETS) + 1), 0.0])
+
+    def add_phase(self, phase, seconds, calls=1):
+        with self._lock:
+            entry = self.phases[phase]
+            entry[0] += calls
+            entry[1] += seconds
+
+    def add_request(self, view, status, seconds):
+        with self._lock:
+            self.requests[(view, status)] += 1
+            buckets, _ = entry = self.durations[view]
+            buckets[bisect_left(BUCKETS, seconds)] += 1
+            entry[1] += seconds
+
+    def render(self):
+        """All totals in the Prometheus text exposition format."""
+        with self._lock:
+            lines = [
+                "# HELP lamplight_requests_total Requests served, by view and status.",
+                "# TYPE lamplight_requests_total counter",
+            ]
+            for (view, status), count in sorted(self.requests.items()):
+                lines.append(
+                    f'lamplight_requests_total{{view="{view}",status="{status}"}} {count}'
+                )
+
+            lines += [
+                "# HELP lamplight_request_duration_seconds Time to serve a request.",
+                "# TYPE lamplight_request_duration_seconds histogram",
+            ]
+            for view, (buckets, total) in sorted(self.durations.items()):
+                cumulative = 0
+                for bound, count in zip(BUCKETS + ("+Inf",), buckets):
+                    cumulative += count
+                    lines.append(
+                        f"lamplight_request_duration_seconds_bucket"
+                        f'{{view="{view}",le="{bound}"}} {cumulative}'
+                    )
+                lines.append(
+                    f'lamplight_request_duration_seconds_sum{{view="{view}"}} {total}'
+                )
+                lines.append(
+                    f'lamplight_request_duration_seconds_count{{view="{view}"}} {cumulative}'
+                )
+
+            lines += [
+                "# HELP lamplight_phase_calls_total Calls made in each phase of a request.",
+                "# TYPE lamplight_phase_calls_total counter",
+            ]
+            for phase, (calls, _) in sorted(self.phases.items()):
+                lines.append(f'lamplight_phase_calls_total{{phase="{phase}"}} {calls}')
+            lines += [
+                "# HELP lamplight_phase_seconds_total Time spent in each phase of a request.",
+                "# TYPE lamplight_phase_seconds_total counter",
+            ]
+            for phase, (_, seconds) in sorted(self.phases.items()):
+                lines.append(
+                    f'lamplight_phase_seconds_total{{phase="{phase}"}} {seconds}'
+                )
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+def begin_request():
+    """Start collecting timings for the request being handled."""
+    timings = RequestTimings()
+    return timings, _current.set(timings)
+
+
+def end_request(token):
+    """Stop collecting timings for the request started with ``begin_request``."""
+    _current.reset(token)
+
+
+def record(phase, seconds, calls=1):
+    """Add time spent in a phase to the current request and the worker totals."""
+    timings = _current.get()
+    if timings is not None:
+        timings.add(phase, seconds, calls)
+    registry.add_phase(phase, seconds, calls)
+
+
+@contextlib.contextmanager
+def timed(phase, calls=1):
+    """Time the enclosed block as part of a phase."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(phase, time.perf_counter() - start, calls)
+
+
+class InstrumentedPipeline(redis.client.Pipeline):
+    """Pipeline that records its commands and round trip as Redis time."""
+
+    def execute(self, raise_on_error=True):
+        with timed("redis", len(self.command_stack)):
+            return super().execute(raise_on_error)
+
+
+class InstrumentedRedis(redis.Redis):
+    """Redis client that records every command, for ``REDIS_CLIENT_CLASS``."""
+
+    def execute_command(self, *args, **options):
+        with timed("redis"):
+            return super().execute_command(*args, **options)
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        return InstrumentedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
+
+class InstrumentedAsyncPipeline(redis.asyncio.client.Pipeline):
+    """Async pipeline that records its commands and round trip as Redis time."""
+
+    async def execute(self, raise_on_error=True):
+        with timed("redis", len(self.command_stack)):
+            return await super().execute(raise_on_error)
+
+
+class InstrumentedAsyncRedis(redis.asyncio.Redis):
+    """Async Redis client that records every command."""
+
+    async def execute_command(self, *args, **options):
+        with timed("redis"):
+            return await super().execute_command(*args, **options)
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        return InstrumentedAsyncPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
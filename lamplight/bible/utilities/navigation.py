@@ -0,0 +1,82 @@
+"""Moving through a translation in canonical order, with no I/O.
+
+Books follow the canon ``version_to_redis.py`` loads (``BookIndex.codes``)
+and chapters and verses the counts in the worker's versification, so the
+verse after ``Luke 24:53`` is ``John 1:1``.  Books and chapters without any
+loaded verses are skipped.
+"""
+
+
+def adjacent_chapter(books, versification, book, chapter, step=1):
+    """
+    The nearest loaded chapter after (or, with ``step=-1``, before) a chapter.
+
+    Args:
+        books (BookIndex): Book codes in canonical order
+        versification (Versification): Chapter and verse counts
+        book (str): Book code
+        chapter (int): Chapter number
+        step (int): 1 for the next chapter, -1 for the previous one
+
+    Returns:
+        tuple: ``(book, chapter)``, or None past either end of the canon
+    """
+    codes = books.codes
+    if book not in codes:
+        return None
+    index = codes.index(book)
+    while True:
+        chapter += step
+        if not 1 <= chapter <= versification.chapters(codes[index]):
+            index += step
+            if not 0 <= index < len(codes):
+                return None
+            chapter = 1 if step > 0 else versification.chapters(codes[index])
+        if versification.verses(codes[index], chapter):
+            return codes[index], chapter
+
+
+def shift(books, versification, book, chapter, verse, offset):
+    """
+    Move a number of verses along the canon, stopping at either end.
+
+    Returns:
+        tuple: ``(book, chapter, verse)`` ``offset`` verses away, or as far
+        as the canon goes
+    """
+    step = 1 if offset > 0 else -1
+    for _ in range(abs(offset)):
+        if 1 <= verse + step <= versification.verses(book, chapter):
+            verse += step
+            continue
+        adjacent = adjacent_chapter(books, versification, book, chapter, step)
+        if adjacent is None:
+            break
+        book, chapter = adjacent
+        verse = 1 if step > 0 else versification.verses(book, chapter)
+    return book, chapter, verse
+
+
+def span(books, versification, start, end):
+    """
+    Every verse from one location to another, split at chapter boundaries.
+
+    Args:
+        start (tuple): ``(book, chapter, verse)`` of the first verse
+        end (tuple): ``(book, chapter, verse)`` of the last verse, not
+            before start
+
+    Returns:
+        list: ``(book, chapter, first, last)`` per chapter, in order
+    """
+    book, chapter, first = start
+    segments = []
+    while (book, chapter) != end[:2]:
+        segments.append((book, chapter, first, versification.verses(book, chapter)))
+        adjacent = adjacent_chapter(books, versification, book, chapter)
+        if adjacent is None:
+            return segments
+        book, chapter = adjacent
+        first = 1
+    segments.append((book, chapter, first, end[2]))
+    return segments
@@ -0,0 +1,140 @@
+"""Parser for scripture reference queries.
+
+Turns ``Luke 1:5-12``, ``1 Jn 3.16`` or ``Luke 1:1; John 3:16; 4:1`` into
+citations, without consulting the book table: resolving the book name and
+checking the numbers against the versification is left to the indexes.
+
+Every search request goes through here, so the common case is kept cheap.
+A query can only be a reference if it contains a digit and starts with a
+letter or digit, which rules out most full-text phrases without running a
+regex at all.  The patterns are anchored and the book-name part can't
+backtrack into the numbers, so long free-text queries fail in linear time.
+"""
+
+import re
+from collections import namedtuple
+
+# unresolved parts of one reference: the book name as typed (or spelled out
+# if it was a known abbreviation), chapter and, for verses, the first and
+# last verse (None for a whole chapter)
+Citation = namedtuple("Citation", "book chapter first last")
+
+# references in a list are separated by semicolons
+LIST_SEPARATOR = ";"
+
+# words of a book name, e.g. "song of songs" or "1jn."; the name may not end
+# in a digit, so "Luke 100" isn't read as "Luke 10" + "0"
+_BOOK = (
+    r"(?P<book>(?:(?P<ordinal>[1-3])\s*)?(?P<name>[^\W\d_]+(?:[\s.]+[^\W\d_]+)*))\.?"
+)
+_NUMBERS = (
+    r"\s*(?P<chapter>-?\d+)"
+    r"(?:\s*[:.]\s*(?P<first>-?\d+)(?:\s*[-–]\s*(?P<last>-?\d+))?)?\s*"
+)
+
+REFERENCE_RE = re.compile(_BOOK + _NUMBERS)
+# a follow-on reference in a list, e.g. the "4:1" in "John 3:16; 4:1"
+CONTINUATION_RE = re.compile(_NUMBERS)
+
+# common abbreviations that aren't a unique prefix or the code of a book
+ABBREVIATIONS = {
+    "gn": "genesis",
+    "lv": "leviticus",
+    "nm": "numbers",
+    "dt": "deuteronomy",
+    "jsh": "joshua",
+    "jg": "judges",
+    "jdgs": "judges",
+    "rt": "ruth",
+    "sm": "samuel",
+    "kgs": "kings",
+    "prv": "proverbs",
+    "qoh": "ecclesiastes",
+    "sos": "song of songs",
+    "cant": "song of songs",
+    "ezk": "ezekiel",
+    "dn": "daniel",
+    "jl": "joel",
+    "jnh": "jonah",
+    "hb": "habakkuk",
+    "zp": "zephaniah",
+    "hg": "haggai",
+    "zc": "zechariah",
+    "ml": "malachi",
+    "mt": "matthew",
+    "mk": "mark",
+    "mrk": "mark",
+    "lk": "luke",
+    "jn": "john",
+    "rm": "romans",
+    "php": "philippians",
+    "tm": "timothy",
+    "phlm": "philemon",
+    "jm": "james",
+    "pt": "peter",
+    "rv": "revelation",
+}
+_DIGIT_RE = re.compile(r"\d")
+
+
+def might_be_reference(query):
+    """Cheap check for queries that can't be a reference.
+
+    References start with a book name or its number and contain a chapter,
+    so anything else can go straight to full-text search.
+    """
+    return query[:1].isalnum() and _DIGIT_RE.search(query) is not None
+
+
+def _book(match):
+    """The book name of a reference, spelling out a known abbreviation.
+
+    ``1 Jn.`` becomes ``1 john``; any other name is returned as typed.
+    """
+    full = ABBREVIATIONS.get(match.group("name").lower())
+    if full is None:
+        return match.group("book")
+    ordinal = match.group("ordinal")
+    return f"{ordinal} {full}" if ordinal else full
+
+
+def _citation(match, book):
+    chapter, first, last = match.group("chapter", "first", "last")
+    first = int(first) if first else None
+    return Citation(book, int(chapter), first, int(last) if last else first)
+
+
+def parse(query):
+    """Parse a query into a list of citations.
+
+    A reference in a list may leave out the book to reuse the previous one,
+    as in ``John 3:16; 4:1``.
+
+    Returns:
+        list: Citations in query order, or None if the query (or any part of
+        a list) isn't a reference
+    """
+    query = query.strip()
+    if not might_be_reference(query):
+        return None
+    if LIST_SEPARATOR not in query:
+        match = REFERENCE_RE.fullmatch(query)
+        if not match:
+            return None
+        return [_citation(match, _book(match))]
+
+    citations = []
+    book = None
+    for part in query.split(LIST_SEPARATOR):
+        part = part.strip()
+        if not part:
+            continue
+        match = REFERENCE_RE.fullmatch(part)
+        if match:
+            book = _book(match)
+        elif book is not None:
+            match = CONTINUATION_RE.fullmatch(part)
+        if not match:
+            return None
+        citations.append(_citation(match, book))
+    return citations or None
@@ -0,0 +1,100 @@
+"""Worker-local tables that follow the revision of a translation's data.
+
+Ingest scripts bump the ``revision`` field of the translation root hash
+(e.g. ``nasb95``) whenever they load new data.  Tables derived from that
+data are held in memory by each worker and only reloaded once the revision
+changes, which is checked at most every ``BIBLE_INDEX_REFRESH_SECONDS``.
+
+Loading verse text (``bible_to_redis.py``) or book names
+(``version_to_redis.py``) also bumps ``text_revision``, in the same
+transaction and not by anything else, so files built from the text alone,
+like the verse store, outlive index rebuilds such as ``build_fulltext``.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+
+REVISION_FIELD = "revision"
+TEXT_REVISION_FIELD = "text_revision"
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def refresh_seconds():
+    """How long a worker trusts its in-memory tables before re-checking."""
+    return getattr(settings, "BIBLE_INDEX_REFRESH_SECONDS", 30)
+
+
+class RevisionedIndex:
+    """Base class for read-only tables loaded once per worker from Redis.
+
+    Subclasses implement ``load`` which (re)builds the table from Redis.
+    """
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self.revision = None
+        self._loaded = False
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def load(self, redis_conn):
+        """Rebuild the table from Redis."""
+        raise NotImplementedError
+
+    def is_fresh(self):
+        """True if the table can be used without checking Redis."""
+        return self._loaded and time.monotonic() - self._checked_at < refresh_seconds()
+
+    def expire(self):
+        """Have the next use check the revision in Redis again."""
+        self._checked_at = float("-inf")
+
+    def ensure_fresh(self, redis_conn):
+        """Load the table on first use and reload it once the revision moves.
+
+        Returns:
+            RevisionedIndex: self, so calls can be chained
+        """
+        if self.is_fresh():
+            return self
+
+        with self._lock:
+            if self.is_fresh():
+                return self
+
+            revision = redis_conn.hget(self.prefix, REVISION_FIELD)
+            if not self._loaded or revision != self.revision:
+                self.load(redis_conn)
+                self.revision = revision
+                self._loaded = True
+            self._checked_at = time.monotonic()
+
+        return self
+
+
+def index_instance(index_class, prefix):
+    """Return this worker's instance of an index, without loading it."""
+    index = _indexes.get((index_class, prefix))
+    if index is None:
+        with _indexes_lock:
+            index = _indexes.setdefault((index_class, prefix), index_class(prefix))
+    return index
+
+
+def expire(prefix):
+    """Have every table of a translation in this worker recheck its revision."""
+    for (_, index_prefix), index in list(_indexes.items()):
+        if index_prefix == prefix:
+            index.expire()
+
+
+def get_index(index_class, redis_conn, prefix):
+    """Return this worker's instance of an index for a translation.
+
+    The index is created on first use and kept fresh with ``ensure_fresh``.
+    """
+    return index_instance(index_class, prefix).ensure_fresh(redis_conn)
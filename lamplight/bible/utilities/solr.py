@@ -0,0 +1,132 @@
+"""Shared, connection-pooled Solr client for the verses collection.
+
+One client is built lazily per worker process and reused by every request
+and thread, so searches ride on kept-alive HTTP connections instead of
+opening a new TCP connection to Solr each time.
+
+With ``FULLTEXT["MODE"]`` set to ``fallback`` Solr is also given a latency
+budget: requests time out at the budget, and failures or slow responses
+trip a per-worker circuit breaker so the embedded engine answers instead.
+
+pysolr and requests take longer to import than the rest of the search path
+together and most requests never reach Solr, so they are only imported
+when the first client is built (or ``SolrError`` is looked up).
+"""
+
+import functools
+import threading
+
+from django.conf import settings
+
+from . import metrics
+from .breaker import CircuitBreaker
+
+_client = None
+_client_lock = threading.Lock()
+_breaker = None
+
+
+def __getattr__(name):
+    # SolrError, raised by the client for HTTP errors, timeouts and refused
+    # connections, and TimedSolr are only created once asked for
+    if name == "SolrError":
+        import pysolr  # pylint: disable=import-outside-toplevel
+
+        return pysolr.SolrError
+    if name == "TimedSolr":
+        return _timed_solr()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@functools.lru_cache(maxsize=None)
+def _timed_solr():
+    import pysolr  # pylint: disable=import-outside-toplevel
+
+    class TimedSolr(pysolr.Solr):
+        """pysolr client that records each HTTP request as Solr time."""
+
+        def _send_request(self, method, path="", body=None, headers=None, files=None):
+            with metrics.timed("solr"):
+                return super()._send_request(method, path, body, headers, files)
+
+    return TimedSolr
+
+
+def build_solr(url, timeout=10, pool_size=10, auth=None):
+    """
+    Create a Solr client backed by a pooled requests session.
+
+    Args:
+        url (str): Collection URL, e.g. 'http://localhost:8983/solr/verses/'
+        timeout (float): Seconds to wait for Solr before giving up
+        pool_size (int): Connections kept alive per Solr host; should cover the
+            number of threads per worker
+        auth (tuple, optional): (user, password) for basic auth
+
+    Returns:
+        TimedSolr: The client
+    """
+    # pylint: disable=import-outside-toplevel
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.stream = False
+
+    return _timed_solr()(url, timeout=timeout, auth=auth, session=session)
+
+
+def get_solr():
+    """Return this worker's shared Solr client, configured by ``settings.SOLR``."""
+    global _client  # pylint: disable=global-statement
+
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                config = settings.SOLR
+                _client = build_solr(
+                    config["URL"],
+                    timeout=timeout(),
+                    pool_size=config.get("POOL_SIZE", 10),
+                    auth=(config.get("USER"), config.get("PASSWORD")),
+                )
+    return _client
+
+
+def fulltext_config():
+    """``settings.FULLTEXT``, with the defaults filled in."""
+    return {
+        "MODE": "solr",
+        "BUDGET": 0.5,
+        "FAILURES": 5,
+        "RESET": 30,
+        **getattr(settings, "FULLTEXT", {}),
+    }
+
+
+def budget():
+    """Seconds a Solr response may take before it counts against the breaker."""
+    return fulltext_config()["BUDGET"]
+
+
+def timeout():
+    """Seconds to wait for Solr; no longer than the budget with a fallback."""
+    seconds = settings.SOLR.get("TIMEOUT", 10)
+    if fulltext_config()["MODE"] == "fallback":
+        seconds = min(seconds, budget())
+    return seconds
+
+
+def get_breaker():
+    """Return this worker's circuit breaker for Solr."""
+    global _breaker  # pylint: disable=global-statement
+
+    if _breaker is None:
+        with _client_lock:
+            if _breaker is None:
+                config = fulltext_config()
+                _breaker = CircuitBreaker(config["FAILURES"], config["RESET"])
+    return _breaker
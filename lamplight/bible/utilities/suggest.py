@@ -0,0 +1,179 @@
+"""Typeahead completions for the search box.
+
+A prefix trie over a translation's book names, codes and the common
+abbreviations the parser accepts, plus the most frequent English phrases of
+its Strong's glosses (``{prefix}:phrases``, written by ``bible_to_redis.py``).
+Every node keeps its best completions, so a lookup only walks the typed
+prefix.  Once a reference has a chapter number, the chapters or verses of
+the book are completed from the versification instead.
+"""
+
+import re
+from collections import defaultdict
+
+from .books import display_name, get_book_index, normalize
+from .parser import ABBREVIATIONS
+from .revision import RevisionedIndex, get_index
+
+# completions kept per trie node, the most a request can ask for
+MAX_SUGGESTIONS = 25
+# phrases loaded into the trie, most frequent first
+PHRASES = 5000
+# furthest a misspelled book name may be from the real one, and the shortest
+# name allowed that far; shorter ones may only be one edit away
+MAX_DISTANCE = 2
+MAX_DISTANCE_LENGTH = 5
+
+# a reference being typed, on a normalized query: "1 john 3", "luke 1:", "lk 1:2"
+REFERENCE_RE = re.compile(
+    r"(?P<book>(?:[1-3] ?)?[^\W\d_][^\d:]*?) ?(?P<chapter>\d+)(?: ?: ?(?P<verse>\d*))?"
+)
+# a numbered book name, e.g. "1 samuel"
+ORDINAL_RE = re.compile(r"(?P<ordinal>[1-3]) (?P<stem>.+)")
+
+
+def _max_distance(name):
+    """How many edits a book name as typed may be from the real one."""
+    return MAX_DISTANCE if len(name) >= MAX_DISTANCE_LENGTH else 1
+
+
+def _numbers(typed, count, limit):
+    """The numbers up to ``count`` starting with the digits typed, smallest first."""
+    if not typed:
+        return list(range(1, min(count, limit) + 1))
+    return [num for num in range(1, count + 1) if str(num).startswith(typed)][:limit]
+
+
+class Suggestions(RevisionedIndex):
+    """Prefix trie of books and phrases, ranked books first then by frequency."""
+
+    def __init__(self, prefix):
+        super().__init__(prefix)
+        self.books = None
+        self.build([], [])
+
+    def build(self, books, phrases):
+        """
+        Build the trie.
+
+        Args:
+            books (list): ``(name, code)`` pairs in canonical order
+            phrases (list): Phrases, most frequent first
+        """
+        abbreviations = defaultdict(list)
+        for abbreviation, name in ABBREVIATIONS.items():
+            abbreviations[name].append(abbreviation)
+
+        # entries are numbered in rank order, so each node's completions are
+        # the first MAX_SUGGESTIONS entries inserted below it
+        self._entries = []
+        self._book_entries = {}
+        self._root = ({}, [])
+        for name, code in books:
+            keys = {name, name.replace(" ", ""), code}
+            match = ORDINAL_RE.fullmatch(name)
+            for abbreviation in abbreviations[match["stem"] if match else name]:
+                if match:
+                    keys.add(f"{match['ordinal']} {abbreviation}")
+                    keys.add(f"{match['ordinal']}{abbreviation}")
+                else:
+                    keys.add(abbreviation)
+            self._book_entries[code] = len(self._entries)
+            self._insert(
+                keys, {"text": display_name(name), "type": "book", "book": code}
+            )
+        for phrase in phrases:
+            self._insert([phrase], {"text": phrase, "type": "phrase"})
+
+    def _insert(self, keys, suggestion):
+        entry = len(self._entries)
+        self._entries.append(suggestion)
+        for key in keys:
+            node = self._root
+            for char in key:
+                node = node[0].setdefault(char, ({}, []))
+                top = node[1]
+                if len(top) < MAX_SUGGESTIONS and (not top or top[-1] != entry):
+                    top.append(entry)
+
+    def load(self, redis_conn):
+        self.books = get_book_index(redis_conn, self.prefix)
+        phrases = redis_conn.zrevrange(f"{self.prefix}:phrases", 0, PHRASES - 1)
+        self.build(list(self.books.names.items()), phrases)
+
+    def complete(self, prefix, limit=10):
+        """The best book and phrase completions of a normalized prefix."""
+        node = self._root
+        for char in prefix:
+            node = node[0].get(char)
+            if node is None:
+                return []
+        return [self._entries[entry] for entry in node[1][:limit]]
+
+    def suggest(self, query, versification, limit=10):
+        """
+        Completions of a query as typed.
+
+        Args:
+            query (str): What has been typed so far
+            versification (Versification): Chapter and verse counts of the
+                translation, for completing references
+            limit (int): Most completions to return
+
+        Returns:
+            list: Suggestion dicts, best first
+        """
+        query = normalize(query)
+        if not query:
+            return []
+
+        match = REFERENCE_RE.fullmatch(query)
+        if match:
+            return self._references(match, versification, limit)
+
+        found = self.complete(query, limit)
+        if not found and len(query) > 2:
+            code = self.books.resolve(query, max_distance=_max_distance(query))
+            if code:
+                found = [self._entries[self._book_entries[code]]]
+        return found
+
+    def _references(self, match, versification, limit):
+        """Chapters, or verses once a colon is typed, of the book being typed."""
+        book = match["book"]
+        code = self.books.resolve(book, max_distance=_max_distance(book))
+        if code is None:
+            return []
+        title = self.books.title(code)
+
+        if match["verse"] is None:
+            return [
+                {
+                    "text": f"{title} {chapter}",
+                    "type": "reference",
+                    "book": code,
+                    "chapter": chapter,
+                }
+                for chapter in _numbers(
+                    match["chapter"], versification.chapters(code), limit
+                )
+            ]
+
+        chapter = int(match["chapter"])
+        return [
+            {
+                "text": f"{title} {chapter}:{verse}",
+                "type": "reference",
+                "book": code,
+                "chapter": chapter,
+                "verse": verse,
+            }
+            for verse in _numbers(
+                match["verse"], versification.verses(code, chapter), limit
+            )
+        ]
+
+
+def get_suggestions(redis_conn, prefix="nasb95"):
+    """Return this worker's typeahead trie for a translation."""
+    return get_index(Suggestions, redis_conn, prefix)
@@ -0,0 +1,339 @@
+"""Read-only verse store: a translation's text in one memory-mapped file.
+
+Every verse has a slot addressed by its canonical verse number, the
+position of the verse counting from the first verse of the first book, so
+a lookup is a few array reads with no network I/O.  The file is shared by
+all workers through the page cache, and unused verses are never faulted
+in, so a worker pays next to nothing for it.
+
+The store records the translation's text revision it was built for and is
+only used while Redis is still at that revision: reloading a translation's
+text makes the workers fall back to Redis until the store is rebuilt, while
+bumps that leave the text alone, e.g. by ``build_fulltext``, don't.
+
+Next to the text, every verse has its response JSON pre-rendered (see
+``verse_json``), each followed by a comma, so the verses of a chapter or
+range are one contiguous slice that goes into a response as is.
+
+File layout (native byte order, sections 4-byte aligned)::
+
+    header       magic, version, book count, chapter count, verse count,
+                 revision, offsets of the sections below and the length
+                 of books
+    books        newline-separated book codes, in canonical order
+    book_chaps   u32 per book + 1: index of the book's first chapter
+    chap_verses  u32 per chapter + 1: number of the chapter's first verse
+    text_offs    u32 per verse + 1: offsets into text (equal if missing)
+    text         utf-8 verse text
+    json_offs    u32 per verse + 1: offsets into json (equal if missing)
+    json         utf-8 verse JSON, each followed by a comma
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+from array import array
+
+from django.conf import settings
+
+from .revision import TEXT_REVISION_FIELD, RevisionedIndex, get_index
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"LLVS"
+VERSION = 2
+HEADER = struct.Struct("<4sIIIIq8Q")
+
+
+def verse_json(title, chapter, verse, text):
+    """
+    A verse as it appears in a response, rendered once at ingest.
+
+    ``bible_to_redis.py`` renders the same bytes into Redis, so the two
+    stay interchangeable.
+
+    Returns:
+        str: Compact JSON object with the book's display name
+    """
+    return json.dumps(
+        {"book": title, "chapter": chapter, "verse": verse, "text": text},
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+
+
+def _align(out):
+    out.write(b"\0" * (-out.tell() % 4))
+
+
+def write_store(books, path, revision, titles=None):
+    """
+    Write a verse store file.
+
+    The file is written next to ``path`` and renamed over it, so workers
+    with the old file mapped keep reading it until they reopen.
+
+    Args:
+        books (list): ``(code, chapters)`` pairs in canonical order, where
+            chapters is a list holding a ``{verse: text}`` dict per chapter
+        path (str): Where to write the store
+        revision (int): Translation text revision the store is valid for
+        titles (dict, optional): Book code to display name for the verse
+            JSON, the code itself where missing
+
+    Returns:
+        int: Number of verse slots written
+    """
+    book_chaps = array("I", [0])
+    chap_verses = array("I", [0])
+    text_offs = array("I", [0])
+    text = bytearray()
+    json_offs = array("I", [0])
+    fragments = bytearray()
+    titles = titles or {}
+    for code, chapters in books:
+        title = titles.get(code, code)
+        for chapter, verses in enumerate(chapters, 1):
+            for num in range(1, max(verses, default=0) + 1):
+                verse = verses.get(num)
+                if verse:
+                    text += verse.encode("utf-8")
+                    fragments += verse_json(title, chapter, num, verse).encode("utf-8")
+                    fragments += b","
+                text_offs.append(len(text))
+                json_offs.append(len(fragments))
+            chap_verses.append(len(text_offs) - 1)
+        book_chaps.append(len(chap_verses) - 1)
+
+    codes = "\n".join(code for code, _ in books).encode("utf-8")
+    verse_count = len(text_offs) - 1
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as out:
+        out.write(b"\0" * HEADER.size)
+        _align(out)
+
+        books_at = out.tell()
+        out.write(codes)
+        _align(out)
+
+        book_chaps_at = out.tell()
+        book_chaps.tofile(out)
+        chap_verses_at = out.tell()
+        chap_verses.tofile(out)
+        text_offs_at = out.tell()
+        text_offs.tofile(out)
+        text_at = out.tell()
+        out.write(text)
+        _align(out)
+
+        json_offs_at = out.tell()
+        json_offs.tofile(out)
+        json_at = out.tell()
+        out.write(fragments)
+
+        out.seek(0)
+        out.write(
+            HEADER.pack(
+                MAGIC,
+                VERSION,
+                len(books),
+                len(chap_verses) - 1,
+                verse_count,
+                revision,
+                books_at,
+                len(codes),
+                book_chaps_at,
+                chap_verses_at,
+                text_offs_at,
+                text_at,
+                json_offs_at,
+                json_at,
+            )
+        )
+    os.replace(tmp_path, path)
+    return verse_count
+
+
+class VerseStore:
+    """Read-only, memory-mapped store written by ``write_store``."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+
+        (
+            magic,
+            version,
+            book_count,
+            chapter_count,
+            self.verse_count,
+            self.revision,
+            books_at,
+            books_len,
+            book_chaps_at,
+            chap_verses_at,
+            text_offs_at,
+            self._text_at,
+            json_offs_at,
+            self._json_at,
+        ) = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} verse store")
+
+        codes = bytes(view[books_at : books_at + books_len]).decode("utf-8")
+        self._books = {code: i for i, code in enumerate(codes.split("\n")) if code}
+        self._book_chaps = view[
+            book_chaps_at : book_chaps_at + 4 * (book_count + 1)
+        ].cast("I")
+        self._chap_verses = view[
+            chap_verses_at : chap_verses_at + 4 * (chapter_count + 1)
+        ].cast("I")
+        self._text_offs = view[
+            text_offs_at : text_offs_at + 4 * (self.verse_count + 1)
+        ].cast("I")
+        self._json_offs = view[
+            json_offs_at : json_offs_at + 4 * (self.verse_count + 1)
+        ].cast("I")
+
+    def _chapter(self, book, chapter):
+        """Index of a chapter in ``chap_verses``, or None if it isn't stored."""
+        index = self._books.get(book)
+        if index is None or chapter < 1:
+            return None
+        first = self._book_chaps[index]
+        if chapter > self._book_chaps[index + 1] - first:
+            return None
+        return first + chapter - 1
+
+    def number(self, book, chapter, verse):
+        """
+        Canonical number of a verse.
+
+        Returns:
+            int: The verse's slot, or None if it is outside the store
+        """
+        index = self._chapter(book, chapter)
+        if index is None or verse < 1:
+            return None
+        first = self._chap_verses[index]
+        if verse > self._chap_verses[index + 1] - first:
+            return None
+        return first + verse - 1
+
+    def text(self, number):
+        """The text of a verse by canonical number, None if it is missing."""
+        start = self._text_offs[number]
+        end = self._text_offs[number + 1]
+        if start == end:
+            return None
+        return self._mmap[self._text_at + start : self._text_at + end].decode("utf-8")
+
+    def fragment(self, number):
+        """The JSON of a verse by canonical number, b"" if it is missing."""
+        start = self._json_at + self._json_offs[number]
+        end = self._json_at + self._json_offs[number + 1]
+        return self._mmap[start : end - 1] if end > start else b""
+
+    def fragments(self, book, chapter, first=None, last=None):
+        """
+        The JSON of the verses of a chapter, or of a range within it.
+
+        Takes the same arguments as ``verses``.
+
+        Returns:
+            bytes: Comma-separated verse objects, b"" if none exist
+        """
+        index = self._chapter(book, chapter)
+        if index is None:
+            return b""
+        start = self._chap_verses[index]
+        count = self._chap_verses[index + 1] - start
+        if first is None:
+            first, last = 1, count
+        first, last = max(first, 1), min(last, count)
+        if first > last:
+            return b""
+        begin = self._json_at + self._json_offs[start + first - 1]
+        end = self._json_at + self._json_offs[start + last]
+        return self._mmap[begin : end - 1] if end > begin else b""
+
+    def verse(self, book, chapter, verse):
+        """The text of a verse, None if it isn't stored."""
+        number = self.number(book, chapter, verse)
+        return None if number is None else self.text(number)
+
+    def verses(self, book, chapter, first=None, last=None):
+        """
+        The verses of a chapter, or of a range within it.
+
+        Args:
+            book (str): Book code
+            chapter (int): Chapter number
+            first (int): First verse, None for the whole chapter
+            last (int): Last verse, inclusive
+
+        Returns:
+            list: ``(verse, text)`` pairs for the verses that exist
+        """
+        index = self._chapter(book, chapter)
+        if index is None:
+            return []
+        start = self._chap_verses[index]
+        count = self._chap_verses[index + 1] - start
+        if first is None:
+            first, last = 1, count
+        found = []
+        for num in range(max(first, 1), min(last, count) + 1):
+            text = self.text(start + num - 1)
+            if text is not None:
+                found.append((num, text))
+        return found
+
+
+def store_path(translation):
+    """Where a translation's store lives, from ``settings.VERSE_STORE['PATH']``."""
+    return str(settings.VERSE_STORE["PATH"]).format(translation=translation)
+
+
+class LocalVerseStore(RevisionedIndex):
+    """This worker's mapping of a translation's verse store.
+
+    Reopened when the translation's revision moves; ``store`` is None when
+    there is no store or it was built for another text revision.
+    """
+
+    def __init__(self, prefix):
+        super().__init__(prefix)
+        self.store = None
+
+    def load(self, redis_conn):
+        self.store = None
+        path = store_path(self.prefix)
+        if not settings.VERSE_STORE["ENABLED"] or not os.path.exists(path):
+            return
+        try:
+            store = VerseStore(path)
+        except ValueError:
+            logger.warning("Ignoring %s; rebuild it with build_verse_store", path)
+            return
+        current = int(redis_conn.hget(self.prefix, TEXT_REVISION_FIELD) or 0)
+        if store.revision == current:
+            self.store = store
+        else:
+            logger.warning(
+                "Ignoring %s, built for text revision %s of %s, now at %s; "
+                "rebuild it with build_verse_store",
+                path,
+                store.revision,
+                self.prefix,
+                current,
+            )
+
+
+def get_verse_store(redis_conn, prefix="nasb95"):
+    """Return this worker's verse store for a translation, or None if unusable."""
+    return get_index(LocalVerseStore, redis_conn, prefix).store
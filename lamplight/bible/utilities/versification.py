@@ -0,0 +1,33 @@
+"""In-memory versification: chapters per book and verses per chapter.
+
+``bible_to_redis.py`` writes the counts to the ``{prefix}:versification``
+hash at ingest; each worker keeps a copy so out-of-range references are
+rejected without any I/O.
+"""
+
+from .revision import RevisionedIndex, get_index
+
+
+class Versification(RevisionedIndex):
+    """Chapter and verse counts for every loaded book."""
+
+    def __init__(self, prefix):
+        super().__init__(prefix)
+        self.counts = {}
+
+    def load(self, redis_conn):
+        counts = redis_conn.hgetall(f"{self.prefix}:versification")
+        self.counts = {field: int(count) for field, count in counts.items()}
+
+    def chapters(self, book):
+        """Number of chapters in a book, 0 if the book isn't loaded."""
+        return self.counts.get(book, 0)
+
+    def verses(self, book, chapter):
+        """Number of verses in a chapter, 0 if the chapter isn't loaded."""
+        return self.counts.get(f"{book}:{chapter}", 0)
+
+
+def get_versification(redis_conn, prefix="nasb95"):
+    """Return this worker's versification for a translation."""
+    return get_index(Versification, redis_conn, prefix)
@@ -1,119 +1,357 @@
 """Implementations of various Bible handlers."""
 
-import logging
-import os
+import asyncio
+import json
 import re
 
-import pysolr
 from django.http import HttpResponse, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
 from django_redis import get_redis_connection
 
-from .utilities import levenshtein
+from . import services
+from .cache import cache_response
+from .translations import requested as requested_translations
+from .utilities import aio, metrics, parser
+from .utilities.books import BookIndex, get_book_index
+from .utilities.suggest import MAX_SUGGESTIONS, get_suggestions
+from .utilities.versification import Versification, get_versification
 
-logger = logging.getLogger(__name__)
+try:
+    import orjson
+except ImportError:  # JsonResponse's stdlib encoder is used instead
+    orjson = None
 
+STRONGS_RE = re.compile(r"[GH]\d+")
+# most verses returned by one concordance request
+STRONGS_MAX_ROWS = 100
 
+# completions returned by /suggest/ unless ?rows= asks for more
+SUGGEST_ROWS = 10
+
+# most queries one /batch/ request may hold
+BATCH_MAX_QUERIES = 200
+
+# most verses /navigate/ adds on either side of a reference
+NAVIGATE_MAX_WINDOW = 50
+
+
+@cache_response
 def search(request):
     """Search for bible verses given a wide variety of
-    input strings that are interpretted on-the-fly."""
+    input strings that are interpretted on-the-fly.
+
+    ``?v=`` picks the translation; several comma-separated translations
+    return each verse in all of them, read in the same Redis round trip.
+    A list of references (``Luke 1:1; John 3:16``) returns all of them.
+    Verse text is read from the memory-mapped verse store when every
+    requested translation has an up-to-date one, from Redis otherwise.
+    With a single translation the verses are already rendered as JSON at
+    ingest, and the response is just those bytes joined together."""
+
+    translations = requested_translations(request)
+    if not translations:
+        return HttpResponse(status=400)
+    primary = translations[0]
 
     redis_conn = get_redis_connection("default")
     query = request.GET.get("q")
     if query:
         # check if the query is a specific bible resource
-        verse_matches = re.findall(
-            r"(\d*)[ ]*([\w\s]+)[ ]*(-?\d+)\:?(-?\d*)", query.strip()
-        )
-        if verse_matches and (len(verse_matches[0]) == 4):
-            verse_matches = verse_matches[0]
-
-            # normalize the string to avoid spelling/spacing/case inconsistencies
-            book = (verse_matches[0] + verse_matches[1]).strip().lower()
-
-            # find the short code
-            if not redis_conn.exists(f"nasb95:{book}:1"):
-                book = (verse_matches[0] + " " + verse_matches[1]).strip().lower()
-                short_code = redis_conn.hget(f"nasb95:books:{book}", "code")
-                if short_code and short_code == "luk":
-                    book = short_code
-                else:
-                    best_key = None
-                    best_distance = 100
-                    # levenshtein the closest book name
-                    for key in redis_conn.scan_iter(match="nasb95:books:*"):
-                        check_book = key[len("nasb95:books:") :]
-                        dist = levenshtein.distance(check_book, book)
-                        if dist < best_distance:
-                            best_distance = dist
-                            best_key = check_book
-
-                    if best_key:
-                        book = redis_conn.hget(f"nasb95:books:{best_key}", "code")
-                        if book != "luk":
-                            book = best_key
-
-            chapter = verse_matches[2] if verse_matches[2] else "1"
-            if int(chapter) < 1:
-                return HttpResponse(status=404)
-            if int(chapter) > 40:  # todo: check against max chapters
-                return HttpResponse(status=404)
+        with metrics.timed("parse"):
+            citations = parser.parse(query)
+        if citations:
+            books = get_book_index(redis_conn, primary)
+            versification = get_versification(redis_conn, primary)
+            refs, exact = services.locate(books, versification, citations)
 
-            # todo: return a list of verses if asking for the whole chapter
-            verse = verse_matches[3] if verse_matches[3] else "1"
-            if int(verse) < 1:
-                return HttpResponse(status=404)
-            if int(verse) > 100:  # todo: check against max verses in this chapter
+            if refs:
+                if len(translations) == 1:
+                    body = services.read_fragments(redis_conn, refs, primary)
+                    if body:
+                        return _fragments_json(body)
+                found = services.read_references(redis_conn, refs, translations)
+                if all(verses[0] for verses in found):
+                    return _json(
+                        {
+                            "data": services.reference_verses(
+                                books, refs, translations, found
+                            )
+                        }
+                    )
+            if exact:
                 return HttpResponse(status=404)
+            # the book was only a fuzzy match, so this may not be a reference
+
+    results = services.full_text(redis_conn, query, primary)
+    verse_ids = [result["id"] for result in results]
+    if not verse_ids:
+        return _json({"data": []})
+    if len(translations) == 1:
+        body = services.hydrate_fragments(redis_conn, verse_ids, primary)
+        if body:
+            return _fragments_json(body)
+
+    books = get_book_index(redis_conn, primary)
+    return _json({"data": services.hydrate(redis_conn, books, verse_ids, translations)})
 
-            text = redis_conn.hget(f"nasb95:{book}:{chapter}:{verse}", "data")
-            if not text:
-                text = "todo"
 
-            return JsonResponse(
-                {
-                    "data": [
+@cache_response
+async def search_async(request):
+    """Async version of ``search`` for ASGI deployments.
+
+    When the book in a reference is only a fuzzy match the reference lookup
+    and the full-text query run concurrently, and the full-text results are
+    used if the reference turns out not to exist.
+    """
+
+    translations = requested_translations(request)
+    if not translations:
+        return HttpResponse(status=400)
+    primary = translations[0]
+
+    aredis = aio.get_redis()
+    query = request.GET.get("q")
+    full_text = None
+    if query:
+        # check if the query is a specific bible resource
+        with metrics.timed("parse"):
+            citations = parser.parse(query)
+        if citations:
+            books = await aio.get_index(BookIndex, primary)
+            versification = await aio.get_index(Versification, primary)
+            refs, exact = services.locate(books, versification, citations)
+            if not exact:
+                full_text = asyncio.ensure_future(
+                    services.full_text_async(query, primary)
+                )
+
+            if refs:
+                body = None
+                if len(translations) == 1:
+                    body = await services.read_fragments_async(aredis, refs, primary)
+                if body:
+                    if full_text:
+                        full_text.cancel()
+                    return _fragments_json(body)
+                found = await services.read_references_async(aredis, refs, translations)
+                if all(verses[0] for verses in found):
+                    if full_text:
+                        full_text.cancel()
+                    return _json(
                         {
-                            "book": (
-                                redis_conn.hget(f"nasb95:{book}", "data")
-                                if book == "luk"
-                                else " ".join(
-                                    word.capitalize() for word in book.split(" ")
-                                )
-                            ),
-                            "chapter": int(chapter),
-                            "verse": int(verse),
-                            "text": text,
+                            "data": services.reference_verses(
+                                books, refs, translations, found
+                            )
                         }
-                    ]
-                },
-                status=201,
-            )
-
-    solr = pysolr.Solr(
-        "http://localhost:8983/solr/verses/",
-        timeout=10,
-        auth=(os.getenv("SOLR_USER"), os.getenv("SOLR_PASS")),
-    )
-    results = solr.search(
-        query,
-        **{
-            "pf": "_text_^10",  # boost exact phrase matches higher
-            "fl": "id,_text_",  # Fields to return
-            "sort": "score desc",  # Optional sorting
-            "defType": "edismax",  # query parser to use
-            "ps": 10,  # phrase slop: only exact phrases get the boost
-        },
+                    )
+            if exact:
+                return HttpResponse(status=404)
+
+    results = await (full_text or services.full_text_async(query, primary))
+    verse_ids = [result["id"] for result in results]
+    if not verse_ids:
+        return _json({"data": []})
+    if len(translations) == 1:
+        body = await services.hydrate_fragments_async(aredis, verse_ids, primary)
+        if body:
+            return _fragments_json(body)
+
+    books = await aio.get_index(BookIndex, primary)
+    return _json(
+        {"data": await services.hydrate_async(aredis, books, verse_ids, translations)}
     )
-    out = []
-    for result in results:
-        parts = result["id"].split(":")
-        out.append(
+
+
+@csrf_exempt
+def batch(request):
+    """Answer many searches in one request.
+
+    Queries come as repeated ``?q=`` parameters or, for long lists, as a
+    POSTed JSON body ``{"q": [...]}``; ``?v=`` works as for ``search``.
+    Every query is answered as ``search`` would answer it, in input order,
+    with all verses read in one Redis pipeline and all full-text queries
+    sent to Solr together.
+    """
+
+    translations = requested_translations(request)
+    if not translations:
+        return HttpResponse(status=400)
+
+    if request.method == "POST":
+        try:
+            queries = json.loads(request.body or b"{}").get("q")
+        except (ValueError, AttributeError):
+            return HttpResponse(status=400)
+    else:
+        queries = request.GET.getlist("q")
+    if (
+        not isinstance(queries, list)
+        or not 0 < len(queries) <= BATCH_MAX_QUERIES
+        or not all(isinstance(query, str) and query.strip() for query in queries)
+    ):
+        return HttpResponse(status=400)
+
+    redis_conn = get_redis_connection("default")
+    return _json({"data": services.batch(redis_conn, queries, translations)})
+
+
+def strongs(request, number=None):
+    """Strong's concordance, answered from the index built at ingest.
+
+    ``/strongs/G1895/`` lists the verses using a Strong's number (paged with
+    ``?start=`` and ``?rows=``) along with the words it tags in each, and
+    ``/strongs/?q=as many`` the Strong's numbers an English phrase translates.
+    """
+
+    translations = requested_translations(request)
+    if not translations:
+        return HttpResponse(status=400)
+    primary = translations[0]
+    redis_conn = get_redis_connection("default")
+
+    if number is None:
+        words = normalize_gloss(request.GET.get("q", ""))
+        if not words:
+            return HttpResponse(status=400)
+        numbers = redis_conn.zrevrange(
+            f"{primary}:gloss:{words}", 0, -1, withscores=True
+        )
+        return _json(
+            {"data": [{"strongs": num, "count": int(count)} for num, count in numbers]}
+        )
+
+    number = number.upper()
+    if not STRONGS_RE.fullmatch(number):
+        return HttpResponse(status=400)
+    try:
+        start = max(int(request.GET.get("start", 0)), 0)
+        rows = min(max(int(request.GET.get("rows", 20)), 1), STRONGS_MAX_ROWS)
+    except ValueError:
+        return HttpResponse(status=400)
+
+    pipe = redis_conn.pipeline(transaction=False)
+    pipe.zcard(f"{primary}:strongs:{number}")
+    pipe.zrange(f"{primary}:strongs:{number}", start, start + rows - 1)
+    total, locations = pipe.execute()
+    if not total:
+        return HttpResponse(status=404)
+
+    pipe = redis_conn.pipeline(transaction=False)
+    for location in locations:
+        pipe.hmget(f"{primary}:{location}", ["data", "strongs"])
+    verses = pipe.execute()
+
+    books = get_book_index(redis_conn, primary)
+    data = []
+    for location, (text, spans) in zip(locations, verses):
+        book, chapter, verse = location.split(":")
+        data.append(
             {
-                "book": redis_conn.hget(f"nasb95:{parts[1]}", "data"),
-                "chapter": int(parts[2]),
-                "verse": int(parts[3]),
-                "text": redis_conn.hget(result["id"], "data"),
+                "book": books.title(book),
+                "chapter": int(chapter),
+                "verse": int(verse),
+                "text": text,
+                "words": [
+                    words for num, words in json.loads(spans or "[]") if num == number
+                ],
             }
         )
+    return _json({"count": total, "data": data})
+
+
+def suggest(request):
+    """Typeahead completions for what has been typed into the search box.
+
+    ``?q=`` is the text so far; books, then frequent phrases, complete it,
+    or the chapters and verses of the book once a reference has a number.
+    Answered from in-memory indexes, so keystrokes never reach Solr.
+    """
+
+    translations = requested_translations(request)
+    if not translations:
+        return HttpResponse(status=400)
+    primary = translations[0]
+    try:
+        rows = min(max(int(request.GET.get("rows", SUGGEST_ROWS)), 1), MAX_SUGGESTIONS)
+    except ValueError:
+        return HttpResponse(status=400)
+
+    redis_conn = get_redis_connection("default")
+    suggestions = get_suggestions(redis_conn, primary)
+    versification = get_versification(redis_conn, primary)
+    with metrics.timed("suggest"):
+        data = suggestions.suggest(request.GET.get("q", ""), versification, rows)
+    return _json({"data": data})
+
+
+def navigate(request):
+    """Page through a translation from a reference.
+
+    ``?q=`` is one reference: a chapter comes back with the previous and
+    next chapters to turn to, verses with the verses just before and after
+    them, plus ``?window=`` more verses of context either side.  Moves cross
+    chapter and book boundaries in canonical order, and the chapters either
+    side are prefetched into the worker's memory for the next request.
+    """
 
-    return JsonResponse({"data": out}, status=201)
+    translations = requested_translations(request)
+    if not translations:
+        return HttpResponse(status=400)
+    primary = translations[0]
+    try:
+        window = min(max(int(request.GET.get("window", 0)), 0), NAVIGATE_MAX_WINDOW)
+    except ValueError:
+        return HttpResponse(status=400)
+
+    with metrics.timed("parse"):
+        citations = parser.parse(request.GET.get("q", ""))
+    if not citations or len(citations) != 1:
+        return HttpResponse(status=400)
+
+    redis_conn = get_redis_connection("default")
+    books = get_book_index(redis_conn, primary)
+    versification = get_versification(redis_conn, primary)
+    refs, _ = services.locate(books, versification, citations)
+    if not refs:
+        return HttpResponse(status=404)
+
+    page = services.navigate(
+        redis_conn, books, versification, refs[0], window, translations
+    )
+    if not page["data"]:
+        return HttpResponse(status=404)
+    return _json(page)
+
+
+def normalize_gloss(words):
+    """Canonical form of an English phrase, as the ingest script indexes it."""
+    return " ".join(re.sub(r"[^\w\s']+", "", words).lower().split())
+
+
+def metrics_view(request):
+    """This worker's request and hot-path totals, for Prometheus to scrape."""
+    return HttpResponse(
+        metrics.registry.render(), content_type="text/plain; version=0.0.4"
+    )
+
+
+def _json(payload):
+    """A successful JSON response, timed as serialization.
+
+    Encoded with orjson when it is installed, which is several times faster
+    than the stdlib encoder behind JsonResponse.
+    """
+    with metrics.timed("serialize"):
+        if orjson is None:
+            return JsonResponse(payload, status=201)
+        return HttpResponse(
+            orjson.dumps(payload), content_type="application/json", status=201
+        )
+
+
+def _fragments_json(body):
+    """A successful ``{"data": [...]}`` response around pre-rendered verses."""
+    with metrics.timed("serialize"):
+        return HttpResponse(
+            b'{"data":[' + body + b"]}", content_type="application/json", status=201
+        )
@@ -0,0 +1,14 @@
+"""Gunicorn settings, read from the directory gunicorn is started in.
+
+The application is loaded once in the master, indexes included (see
+``bible.preload``), and the workers are forked from it so they share that
+state copy-on-write.  A restart (``sudo systemctl restart gunicorn``)
+reloads everything; ``kill -HUP`` only replaces the workers and keeps the
+master's old code and indexes, so use a restart to deploy.
+"""
+
+import os
+
+os.environ.setdefault("LAMPLIGHT_PRELOAD", "1")
+
+preload_app = True
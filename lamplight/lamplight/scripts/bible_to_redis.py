@@ -1,31 +1,511 @@
 import argparse
 import csv
+import json
 import os.path
+import re
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
 import redis
 from dotenv import load_dotenv
+from manifest import REDIS, SOLR, content_hash, deleted_verses, manifest_key
 
+# Set up a custom dialect that preserves escaped characters (otherwise we will lose all commas)
+csv.register_dialect(
+    "escaped", escapechar="\\", doublequote=False, quoting=csv.QUOTE_MINIMAL
+)
 
-def csv_to_redis_hash(csv_file, hash_prefix="nasb95"):
+# a Strong's tagged span, e.g. <G1895>Inasmuch</G1895>
+STRONGS_RE = re.compile(r"<([GH]\d+)>(.*?)</\1>")
+# brackets, punctuation and the like, dropped from glosses
+GLOSS_STRIP_RE = re.compile(r"[^\w\s']+")
+
+
+def strongs_spans(text):
+    """
+    The Strong's numbers in a verse, each with the English words it tags.
+
+    Returns:
+        list: (number, words) pairs in verse order
+    """
+    return [(number, words.strip()) for number, words in STRONGS_RE.findall(text)]
+
+
+def normalize_gloss(words):
+    """Lowercase the words of a gloss and drop their punctuation."""
+    return " ".join(GLOSS_STRIP_RE.sub("", words).lower().split())
+
+
+def display_name(name):
+    """Display form of a lowercase book name, e.g. ``1 john`` -> ``1 John``."""
+    return " ".join(word.capitalize() for word in name.split(" "))
+
+
+def book_titles(r, hash_prefix):
+    """Map each book code to its display name, from the table version_to_redis loads."""
+    return {
+        code: display_name(name)
+        for name, code in r.hgetall(f"{hash_prefix}:books").items()
+    }
+
+
+def verse_json(title, chapter, verse, text):
+    """
+    A verse exactly as the search API returns it.
+
+    Rendered once at ingest, so the API answers by joining these fragments
+    instead of serializing.  Must render the same bytes as
+    ``bible.utilities.versestore.verse_json``.
+
+    Args:
+        title (str): Display name of the book
+        chapter (str|int): Chapter number
+        verse (str|int): Verse number
+        text (str): Verse text
+
+    Returns:
+        str: Compact JSON object
+    """
+    return json.dumps(
+        {"book": title, "chapter": int(chapter), "verse": int(verse), "text": text},
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+
+
+def update_versification(r, hash_prefix, counts):
+    """
+    Merge chapter/verse counts into the versification index.
+
+    The index is one hash: ``{book}`` holds the number of chapters in a book
+    and ``{book}:{chapter}`` the number of verses in that chapter.  Counts
+    only ever grow, so loading a single chapter keeps the rest of the book.
+
+    Args:
+        r (redis.Redis): Redis connection
+        hash_prefix (str): Prefix for Redis hash keys
+        counts (dict): Field name to the highest number seen in the CSV
+    """
+    if not counts:
+        return
+
+    fields = list(counts)
+    current = r.hmget(f"{hash_prefix}:versification", fields)
+    r.hset(
+        f"{hash_prefix}:versification",
+        mapping={
+            field: max(counts[field], int(old or 0))
+            for field, old in zip(fields, current)
+        },
+    )
+
+
+def load_batch(r, batch, previous=()):
+    """
+    Write a batch of hashes in one non-transactional pipeline round trip.
+
+    Args:
+        r (redis.Redis): Redis connection
+        batch (list): (key, mapping) pairs to hset
+        previous (list): Verse keys whose ``strongs`` field is read and
+            cleared in the same round trip, before the batch is written
+
+    Returns:
+        list: The ``strongs`` fields of ``previous`` as they were
+    """
+    pipe = r.pipeline(transaction=False)
+    for key in previous:
+        pipe.hget(key, "strongs")
+        pipe.hdel(key, "strongs")
+    for key, mapping in batch:
+        pipe.hset(key, mapping=mapping)
+    return pipe.execute()[: 2 * len(previous) : 2]
+
+
+def write_concordance(
+    r, hash_prefix, concordance, glosses, batch_size=1000, removed=None
+):
+    """
+    Write the Strong's concordance built while reading the CSV.
+
+    ``{prefix}:strongs:{number}`` is a sorted set of the verses using a
+    Strong's number (``luk:1:1``) scored by canonical position, and
+    ``{prefix}:gloss:{words}`` a sorted set of the Strong's numbers behind an
+    English phrase scored by how often they translate to it, and
+    ``{prefix}:phrases`` every phrase scored by how often it occurs, for
+    typeahead.  Gloss and phrase counts move by the difference the load
+    makes (ZINCRBY), so a CSV holding part of a translation, or reloading
+    one, leaves the counts of the rest as they were.
+
+    Args:
+        r (redis.Redis): Redis connection
+        hash_prefix (str): Prefix for Redis keys
+        concordance (dict): Strong's number to {verse: score} to add
+        glosses (dict): Normalized phrase to Counter of the change in each
+            Strong's number's count, negative for the verses' old spans
+        batch_size (int): Commands per pipeline round trip
+        removed (dict, optional): Strong's number to the verses no longer
+            using it
+    """
+    commands = [
+        ("zadd", [f"{hash_prefix}:strongs:{number}", verses], {})
+        for number, verses in concordance.items()
+    ]
+    commands += [
+        ("zrem", [f"{hash_prefix}:strongs:{number}", *verses], {})
+        for number, verses in (removed or {}).items()
+        if verses
+    ]
+    phrases = Counter()
+    for words, numbers in glosses.items():
+        for number, delta in numbers.items():
+            if delta:
+                phrases[words] += delta
+                commands.append(
+                    ("zincrby", [f"{hash_prefix}:gloss:{words}", delta, number], {})
+                )
+        if any(delta < 0 for delta in numbers.values()):
+            commands.append(
+                ("zremrangebyscore", [f"{hash_prefix}:gloss:{words}", "-inf", 0], {})
+            )
+    commands += [
+        ("zincrby", [f"{hash_prefix}:phrases", delta, words], {})
+        for words, delta in phrases.items()
+        if delta
+    ]
+    if any(delta < 0 for delta in phrases.values()):
+        commands.append(("zremrangebyscore", [f"{hash_prefix}:phrases", "-inf", 0], {}))
+    run_commands(r, commands, batch_size)
+
+
+def submit_batch(pool, r, write_prefix, batch, verses):
+    """
+    Hand a batch of rows to a loader thread.
+
+    Returns:
+        tuple: The batch's verses (``luk:1:1``) and the future of the
+        ``strongs`` fields they had before
+    """
+    previous = [f"{write_prefix}:{verse}" for verse in verses]
+    return verses, pool.submit(load_batch, r, batch, previous)
+
+
+def canon_positions(r, hash_prefix):
+    """Map each book code to its position in the canon loaded by version_to_redis."""
+    return {code: i for i, code in enumerate(r.lrange(f"{hash_prefix}:canon", 0, -1))}
+
+
+def run_commands(r, commands, batch_size=1000):
+    """
+    Run commands through non-transactional pipelines, batch_size at a time.
+
+    Args:
+        r (redis.Redis): Redis connection
+        commands (list): (method, args, kwargs) triples of pipeline calls
+        batch_size (int): Commands per pipeline round trip
+    """
+    for i in range(0, len(commands), batch_size):
+        pipe = r.pipeline(transaction=False)
+        for method, args, kwargs in commands[i : i + batch_size]:
+            getattr(pipe, method)(*args, **kwargs)
+        pipe.execute()
+
+
+def read_verses(csv_file):
+    """
+    Read a CSV file into a dict of verse key (``luk:1:1``) to tagged text.
+
+    Rows without all four columns are reported and skipped.
+    """
+    verses = {}
+    with open(csv_file, "r", newline="", encoding="utf-8") as file:
+        for line, row in enumerate(csv.reader(file, dialect="escaped"), 1):
+            if not row:
+                continue
+            if len(row) < 4:
+                print(f"Error processing row {line}: {row}")
+                continue
+            verses[f"{row[0]}:{row[1]}:{row[2]}"] = row[3]
+    return verses
+
+
+def incremental_load(r, csv_file, hash_prefix, batch_size=1000, prune=False):
+    """
+    Write only the verses added, changed or deleted since the last load.
+
+    The CSV is compared against the content hashes in the translation's
+    manifest, taken over each verse's rendered JSON so a renamed book or a
+    translation loaded before the JSON existed counts as changed too.  Verse
+    hashes, chapter hashes, the concordance and the
+    gloss counts are only touched for verses that differ, so a correction
+    to a few verses costs a few dozen commands and re-running the same file
+    writes nothing.  Verses are deleted when they disappear from a chapter
+    the CSV covers, or from anywhere with ``prune``.
+
+    Args:
+        r (redis.Redis): Redis connection
+        csv_file (str): Path to the CSV file
+        hash_prefix (str): Prefix for Redis hash keys
+        batch_size (int): Commands per pipeline round trip
+        prune (bool): The CSV holds the whole translation
+
+    Returns:
+        tuple: Numbers of verses written and deleted
+    """
+    key = manifest_key(hash_prefix, REDIS)
+    manifest = r.hgetall(key)
+    verses = read_verses(csv_file)
+    titles = book_titles(r, hash_prefix)
+    fragments = {}
+    for verse, text in verses.items():
+        book, chapter, num = verse.split(":")
+        fragments[verse] = verse_json(titles.get(book, book), chapter, num, text)
+    hashes = {verse: content_hash(fragment) for verse, fragment in fragments.items()}
+    changed = [
+        verse for verse, digest in hashes.items() if manifest.get(verse) != digest
+    ]
+    deleted = deleted_verses(manifest, verses, prune)
+    if not changed and not deleted:
+        return 0, 0
+
+    # the text being replaced, to take its Strong's entries back out
+    touched = changed + deleted
+    pipe = r.pipeline(transaction=False)
+    for verse in touched:
+        pipe.hget(f"{hash_prefix}:{verse}", "data")
+    old_texts = dict(zip(touched, pipe.execute()))
+
+    canon = canon_positions(r, hash_prefix)
+    commands = []
+    counts = {}
+    glosses = defaultdict(Counter)
+    for verse in touched:
+        book, chapter, num = verse.split(":")
+        text = verses.get(verse)
+        old_spans = strongs_spans(old_texts[verse] or "")
+        spans = strongs_spans(text) if text is not None else []
+
+        if text is None:
+            commands.append(("delete", [f"{hash_prefix}:{verse}"], {}))
+            commands.append(
+                ("hdel", [f"{hash_prefix}:{book}:{chapter}:verses", num], {})
+            )
+            commands.append(("hdel", [f"{hash_prefix}:{book}:{chapter}:json", num], {}))
+        else:
+            mapping = {
+                "name": f"{book} {chapter}:{num}",
+                "data": text,
+                "json": fragments[verse],
+            }
+            if spans:
+                mapping["strongs"] = json.dumps(spans, ensure_ascii=False)
+            commands.append(("hset", [f"{hash_prefix}:{verse}"], {"mapping": mapping}))
+            if not spans:
+                commands.append(("hdel", [f"{hash_prefix}:{verse}", "strongs"], {}))
+            commands.append(
+                (
+                    "hset",
+                    [f"{hash_prefix}:{book}:{chapter}:verses"],
+                    {"mapping": {num: text}},
+                )
+            )
+            commands.append(
+                (
+                    "hset",
+                    [f"{hash_prefix}:{book}:{chapter}:json"],
+                    {"mapping": {num: fragments[verse]}},
+                )
+            )
+            counts[book] = max(counts.get(book, 0), int(chapter))
+            counts[f"{book}:{chapter}"] = max(
+                counts.get(f"{book}:{chapter}", 0), int(num)
+            )
+
+        numbers = {number for number, _ in spans}
+        position = (
+            canon.get(book, len(canon)) * 1_000_000 + int(chapter) * 1000 + int(num)
+        )
+        for number in numbers:
+            commands.append(
+                ("zadd", [f"{hash_prefix}:strongs:{number}", {verse: position}], {})
+            )
+        for number in {number for number, _ in old_spans} - numbers:
+            commands.append(("zrem", [f"{hash_prefix}:strongs:{number}", verse], {}))
+
+        for number, words in old_spans:
+            glosses[normalize_gloss(words)][number] -= 1
+        for number, words in spans:
+            glosses[normalize_gloss(words)][number] += 1
+
+    # gloss counts move by the difference, dropping what is no longer used
+    phrases = Counter()
+    for words, numbers in glosses.items():
+        if not words:
+            continue
+        for number, delta in numbers.items():
+            if delta:
+                phrases[words] += delta
+                commands.append(
+                    ("zincrby", [f"{hash_prefix}:gloss:{words}", delta, number], {})
+                )
+        commands.append(
+            ("zremrangebyscore", [f"{hash_prefix}:gloss:{words}", "-inf", 0], {})
+        )
+    for words, delta in phrases.items():
+        if delta:
+            commands.append(("zincrby", [f"{hash_prefix}:phrases", delta, words], {}))
+    if phrases:
+        commands.append(("zremrangebyscore", [f"{hash_prefix}:phrases", "-inf", 0], {}))
+
+    # the manifest goes last, so an interrupted run is simply redone
+    if changed:
+        commands.append(
+            ("hset", [key], {"mapping": {verse: hashes[verse] for verse in changed}})
+        )
+    if deleted:
+        commands.append(("hdel", [key, *deleted], {}))
+    run_commands(r, commands, batch_size)
+
+    update_versification(r, hash_prefix, counts)
+    recount_chapters(r, hash_prefix, {verse.rsplit(":", 1)[0] for verse in deleted})
+    return len(changed), len(deleted)
+
+
+def recount_chapters(r, hash_prefix, chapters):
+    """
+    Set the exact verse counts of chapters that lost verses.
+
+    Args:
+        r (redis.Redis): Redis connection
+        hash_prefix (str): Prefix for Redis hash keys
+        chapters (iterable): Chapters (``luk:1``) to recount
+    """
+    chapters = list(chapters)
+    if not chapters:
+        return
+
+    pipe = r.pipeline(transaction=False)
+    for chapter in chapters:
+        pipe.hkeys(f"{hash_prefix}:{chapter}:verses")
+    replies = pipe.execute()
+
+    pipe = r.pipeline(transaction=False)
+    for chapter, nums in zip(chapters, replies):
+        if nums:
+            pipe.hset(
+                f"{hash_prefix}:versification",
+                chapter,
+                max(int(num) for num in nums),
+            )
+        else:
+            pipe.hdel(f"{hash_prefix}:versification", chapter)
+    pipe.execute()
+
+
+def bump_revisions(pipe, hash_prefix):
+    """
+    Queue the bumps that tell workers a translation's text changed.
+
+    ``revision`` makes them reload their in-memory indexes, and
+    ``text_revision``, which nothing but a text load bumps, retires a verse
+    store built from the old text.  Queued on a MULTI/EXEC pipeline, so
+    a worker never sees one without the other.
+
+    Args:
+        pipe (redis.client.Pipeline): Transaction to add the bumps to
+        hash_prefix (str): Prefix for Redis hash keys
+    """
+    pipe.hincrby(hash_prefix, "text_revision", 1)
+    pipe.hincrby(hash_prefix, "revision", 1)
+
+
+def swap_staging(r, staging_prefix, hash_prefix):
+    """
+    Atomically replace the live translation with the staged one.
+
+    The staged load is the whole translation, versification included, so
+    every staged key is RENAMEd over its live counterpart and every live key
+    it doesn't have is deleted, except the book table version_to_redis
+    loads and the Solr manifest.  The renames, the deletes and the revision
+    bumps run in a single MULTI/EXEC, so readers see either the old
+    translation or the new one, never a mix.
+
+    Returns:
+        tuple: Numbers of keys swapped in and deleted
+    """
+    staged = list(r.scan_iter(match=f"{staging_prefix}:*", count=1000))
+    live = {hash_prefix + key[len(staging_prefix) :] for key in staged}
+    kept = {
+        f"{hash_prefix}:books",
+        f"{hash_prefix}:canon",
+        manifest_key(hash_prefix, SOLR),
+    }
+    stale = [
+        key
+        for key in r.scan_iter(match=f"{hash_prefix}:*", count=1000)
+        if key not in live
+        and key not in kept
+        and not key.startswith(f"{hash_prefix}:books:")
+    ]
+    pipe = r.pipeline(transaction=True)
+    for key in staged:
+        pipe.rename(key, hash_prefix + key[len(staging_prefix) :])
+    for i in range(0, len(stale), 1000):
+        pipe.delete(*stale[i : i + 1000])
+    # let the workers know their in-memory indexes are stale
+    bump_revisions(pipe, hash_prefix)
+    pipe.execute()
+    return len(staged), len(stale)
+
+
+def csv_to_redis_hash(
+    csv_file,
+    hash_prefix="nasb95",
+    batch_size=1000,
+    connections=1,
+    staging=False,
+    incremental=False,
+    prune=False,
+    r=None,
+):
     """
     Read data from a CSV file and insert each row as a Redis hash.
 
+    Rows are written through pipelines flushed every ``batch_size`` rows,
+    optionally spread over several connections.
+
     Args:
         csv_file (str): Path to the CSV file
         hash_prefix (str): Prefix for Redis hash keys
+        batch_size (int): Rows per pipeline round trip
+        connections (int): Pipelines in flight at once, each on its own connection
+        staging (bool): The CSV is the whole translation: load it under a
+            staging prefix, then swap it in atomically, deleting whatever
+            it doesn't hold, so live traffic never sees a half-loaded one
+        incremental (bool): Only write the verses that changed since the
+            last load, per the content-hash manifest
+        prune (bool): With incremental, delete verses missing from the CSV
+            anywhere in the translation, not just in the chapters it covers
+        r (redis.Redis, optional): Connection to load into instead of the
+            local Redis server
     """
     # Validate the CSV file exists
     if not os.path.isfile(csv_file):
         raise FileNotFoundError(f"CSV file not found: {csv_file}")
+    if staging and incremental:
+        raise ValueError("An incremental load can't be staged")
 
     # Connect to Redis
-    r = redis.Redis(
-        host="localhost",
-        port=6379,
-        db=0,
-        password=os.getenv("REDIS_PASS"),
-        decode_responses=True,  # Automatically decode responses to strings
-    )
+    if r is None:
+        r = redis.Redis(
+            host="localhost",
+            port=6379,
+            db=0,
+            password=os.getenv("REDIS_PASS"),
+            decode_responses=True,  # Automatically decode responses to strings
+            max_connections=connections + 1,
+        )
 
     # Check connection
     try:
@@ -35,51 +515,200 @@ def csv_to_redis_hash(csv_file, hash_prefix="nasb95"):
         print(f"Failed to connect to Redis: {e}")
         return
 
-    r.hset(f"{hash_prefix}:luk", mapping={"name": "luk", "data": "Luke"})
-    r.hset(f"{hash_prefix}:luk:1", mapping={"name": "luk 1", "data": "Luke Chapter 1"})
+    if incremental:
+        start = time.perf_counter()
+        written, deleted = incremental_load(
+            r, csv_file, hash_prefix, batch_size=batch_size, prune=prune
+        )
+        if written or deleted:
+            # let the workers know their in-memory indexes are stale
+            pipe = r.pipeline(transaction=True)
+            bump_revisions(pipe, hash_prefix)
+            pipe.execute()
+        print(
+            f"Incremental import complete. Wrote {written} and deleted {deleted} "
+            f"verses in {time.perf_counter() - start:.1f}s."
+        )
+        return
 
-    # Set up a custom dialect that preserves escaped characters (otherwise we will lose all commas)
-    csv.register_dialect(
-        "escaped", escapechar="\\", doublequote=False, quoting=csv.QUOTE_MINIMAL
-    )
+    write_prefix = hash_prefix
+    if staging:
+        write_prefix = f"staging:{hash_prefix}"
+        # clear out whatever an earlier, interrupted load left behind
+        for key in r.scan_iter(match=f"{write_prefix}:*", count=1000):
+            r.delete(key)
+
+    r.hset(f"{write_prefix}:luk", mapping={"name": "luk", "data": "Luke"})
+    r.hset(f"{write_prefix}:luk:1", mapping={"name": "luk 1", "data": "Luke Chapter 1"})
+
+    # canonical order of the books, so concordance entries sort as in the bible
+    canon = canon_positions(r, hash_prefix)
+    titles = book_titles(r, hash_prefix)
+
+    start = time.perf_counter()
 
     # Open and process the CSV file
-    with open(csv_file, "r", newline="", encoding="utf-8") as file:
+    with open(csv_file, "r", newline="", encoding="utf-8") as file, ThreadPoolExecutor(
+        max_workers=connections
+    ) as pool:
         reader = csv.reader(file, dialect="escaped")
 
         # Process data rows
         row_count = 0
+        counts = {}
+        concordance = defaultdict(dict)
+        glosses = defaultdict(Counter)
+        batch = []
+        batch_verses = []
+        loaded = []
+        pending = []
         for row in reader:
             if not row:  # Skip empty rows
                 continue
 
             try:
-                # Insert the hash into Redis
-                r.hset(
-                    f"{hash_prefix}:{row[0]}:{row[1]}:{row[2]}",
-                    mapping={"name": f"{row[0]} {row[1]}:{row[2]}", "data": row[3]},
+                spans = strongs_spans(row[3])
+                fragment = verse_json(
+                    titles.get(row[0], row[0]), row[1], row[2], row[3]
+                )
+                verse = {
+                    "name": f"{row[0]} {row[1]}:{row[2]}",
+                    "data": row[3],
+                    "json": fragment,
+                }
+                if spans:
+                    verse["strongs"] = json.dumps(spans, ensure_ascii=False)
+                batch.append((f"{write_prefix}:{row[0]}:{row[1]}:{row[2]}", verse))
+                if not staging:  # a staged load starts from nothing
+                    batch_verses.append(f"{row[0]}:{row[1]}:{row[2]}")
+                # the whole chapter in one hash, so it can be read in one go
+                batch.append(
+                    (f"{write_prefix}:{row[0]}:{row[1]}:verses", {row[2]: row[3]})
+                )
+                # and pre-rendered, so the API can answer without serializing
+                batch.append(
+                    (f"{write_prefix}:{row[0]}:{row[1]}:json", {row[2]: fragment})
                 )
+                # so later incremental loads can tell what changed
+                batch.append(
+                    (
+                        manifest_key(write_prefix, REDIS),
+                        {f"{row[0]}:{row[1]}:{row[2]}": content_hash(fragment)},
+                    )
+                )
+                counts[row[0]] = max(counts.get(row[0], 0), int(row[1]))
+                counts[f"{row[0]}:{row[1]}"] = max(
+                    counts.get(f"{row[0]}:{row[1]}", 0), int(row[2])
+                )
+                position = (
+                    canon.get(row[0], len(canon)) * 1_000_000
+                    + int(row[1]) * 1000
+                    + int(row[2])
+                )
+                for number, words in spans:
+                    concordance[number][f"{row[0]}:{row[1]}:{row[2]}"] = position
+                    gloss = normalize_gloss(words)
+                    if gloss:
+                        glosses[gloss][number] += 1
                 row_count += 1
 
-                if row_count % 1000 == 0:
-                    print(f"Processed {row_count} rows...")
-
             except Exception as e:
                 print(f"Error processing row {row_count+1}: {e}")
                 print(f"Row data: {row}")
+                continue
+
+            if row_count % batch_size == 0:
+                loaded.append(submit_batch(pool, r, write_prefix, batch, batch_verses))
+                pending.append(loaded[-1][1])
+                batch = []
+                batch_verses = []
+                # don't let the reader run too far ahead of Redis
+                if len(pending) > connections * 2:
+                    pending.pop(0).result()
+
+            if row_count % 1000 == 0:
+                print(f"Processed {row_count} rows...")
+
+        if batch:
+            loaded.append(submit_batch(pool, r, write_prefix, batch, batch_verses))
+
+    # take the replaced verses' Strong's entries back out
+    removed = defaultdict(set)
+    for verses, future in loaded:
+        for verse, old in zip(verses, future.result()):
+            for number, words in json.loads(old) if old else []:
+                if verse not in concordance.get(number, {}):
+                    removed[number].add(verse)
+                gloss = normalize_gloss(words)
+                if gloss:
+                    glosses[gloss][number] -= 1
 
-        print(f"Import complete. Processed {row_count} rows.")
+    write_concordance(r, write_prefix, concordance, glosses, batch_size, removed)
+
+    update_versification(r, write_prefix, counts)
+    if staging:
+        swapped, deleted = swap_staging(r, write_prefix, hash_prefix)
+        print(
+            f"Swapped {swapped} staged keys into {hash_prefix} "
+            f"and deleted {deleted} it no longer has"
+        )
+    else:
+        # let the workers know their in-memory indexes are stale
+        pipe = r.pipeline(transaction=True)
+        bump_revisions(pipe, hash_prefix)
+        pipe.execute()
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"Import complete. Processed {row_count} rows "
+        f"in {elapsed:.1f}s ({row_count / elapsed if elapsed else 0:.0f} rows/sec)."
+    )
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Import CSV data to Redis hashes")
     parser.add_argument("csv_file", help="Path to the CSV file to import")
     parser.add_argument("--prefix", default="nasb95", help="Prefix for Redis hash keys")
+    parser.add_argument(
+        "-b", "--batch-size", type=int, default=1000, help="Rows per pipeline"
+    )
+    parser.add_argument(
+        "-c",
+        "--connections",
+        type=int,
+        default=1,
+        help="Pipelines in flight at once, each on its own connection",
+    )
+    parser.add_argument(
+        "--staging",
+        action="store_true",
+        help="The CSV is the whole translation: load it under a staging prefix "
+        "and swap it in atomically when done, deleting every verse missing from it",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only write verses added, changed or deleted since the last load",
+    )
+    parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="With --incremental, the CSV is the whole translation: delete every "
+        "verse missing from it",
+    )
 
     args = parser.parse_args()
     load_dotenv()
 
     try:
-        csv_to_redis_hash(args.csv_file, hash_prefix=args.prefix)
+        csv_to_redis_hash(
+            args.csv_file,
+            hash_prefix=args.prefix,
+            batch_size=args.batch_size,
+            connections=args.connections,
+            staging=args.staging,
+            incremental=args.incremental,
+            prune=args.prune,
+        )
     except Exception as e:
         print(f"Error: {e}")
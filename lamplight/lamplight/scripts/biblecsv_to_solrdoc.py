@@ -4,23 +4,78 @@ import csv
 import json
 import re
 import sys
+import textwrap
+
+# compiled once rather than on every row
+TAG_RE = re.compile(r"<[^>]+>")
+NOTE_RE = re.compile(r"\[[^\]]*\]")
 
 
 def remove_markup_tags(text):
     # This pattern matches any tag structure like <...>
-    clean_text = re.sub(r"<[^>]+>", "", text)
-    clean_text = re.sub(r"\[[^\]]*\]", "", clean_text)
+    clean_text = TAG_RE.sub("", text)
+    clean_text = NOTE_RE.sub("", clean_text)
     return clean_text
 
 
-def csv_to_json(csv_file_path, json_file_path=None, encoding="utf-8"):
+def iter_docs(csv_file, prefix="nasb95"):
+    """
+    Yield one Solr document per CSV row without holding the file in memory
+
+    Args:
+        csv_file (file): Open CSV file
+        prefix (str): Translation prefix for the document ids
+    """
+    for col in csv.reader(csv_file, escapechar="\\"):
+        if not col:
+            continue
+        yield {
+            "id": f"{prefix}:{col[0]}:{col[1]}:{col[2]}",
+            "_text_": remove_markup_tags(col[3]),
+        }
+
+
+def write_docs(docs, out, lines=False):
+    """
+    Stream documents to a file as JSON Lines or as an indented JSON array
+
+    Returns:
+        int: Number of documents written
+    """
+    count = 0
+    if lines:
+        for doc in docs:
+            out.write(json.dumps(doc, ensure_ascii=False))
+            out.write("\n")
+            count += 1
+        return count
+
+    out.write("[")
+    for doc in docs:
+        out.write(",\n" if count else "\n")
+        out.write(
+            textwrap.indent(json.dumps(doc, ensure_ascii=False, indent=4), "    ")
+        )
+        count += 1
+    out.write("\n]" if count else "]")
+    return count
+
+
+def csv_to_json(
+    csv_file_path, json_file_path=None, encoding="utf-8", lines=False, prefix="nasb95"
+):
     """
     Convert a CSV file to JSON format
 
+    Rows are converted and written one at a time, so memory use stays flat
+    whatever the size of the input.
+
     Args:
         csv_file_path (str): Path to the input CSV file
         json_file_path (str, optional): Path for the output JSON file. If None, prints to stdout.
         encoding (str, optional): File encoding. Defaults to 'utf-8'.
+        lines (bool, optional): Write JSON Lines instead of a JSON array
+        prefix (str, optional): Translation prefix of the document ids
 
     Returns:
         bool: True if conversion was successful, False otherwise
@@ -28,26 +83,18 @@ def csv_to_json(csv_file_path, json_file_path=None, encoding="utf-8"):
     try:
         # Read the CSV file
         with open(csv_file_path, "r", encoding=encoding) as csv_file:
-            csv_reader = csv.reader(csv_file, escapechar="\\")
-
-            output = []
-            for col in csv_reader:
-                output.append(
-                    {
-                        "id": f"nasb95:{col[0]}:{col[1]}:{col[2]}",
-                        "_text_": remove_markup_tags(col[3]),
-                    }
-                )
+            docs = iter_docs(csv_file, prefix)
 
             # Convert to JSON
             if json_file_path:
                 # Write to a file
                 with open(json_file_path, "w", encoding=encoding) as json_file:
-                    json.dump(output, json_file, ensure_ascii=False, indent=4)
+                    write_docs(docs, json_file, lines)
                 print(f"Conversion successful. JSON saved to {json_file_path}")
             else:
                 # Print to stdout
-                print(json.dumps(output, indent=4))
+                write_docs(docs, sys.stdout, lines)
+                sys.stdout.flush()
 
             return True
     except Exception as e:
@@ -67,12 +114,23 @@ def main():
     parser.add_argument(
         "-e", "--encoding", default="utf-8", help="File encoding (default: utf-8)"
     )
+    parser.add_argument(
+        "-l",
+        "--jsonl",
+        action="store_true",
+        help="Write JSON Lines, e.g. to pipe straight into doc_to_solr.py -",
+    )
+    parser.add_argument(
+        "--prefix", default="nasb95", help="Translation prefix of the document ids"
+    )
 
     # Parse arguments
     args = parser.parse_args()
 
     # Perform the conversion
-    csv_to_json(args.csv_file, args.output, args.encoding)
+    csv_to_json(
+        args.csv_file, args.output, args.encoding, lines=args.jsonl, prefix=args.prefix
+    )
 
 
 if __name__ == "__main__":
@@ -1,92 +1,341 @@
 #!/usr/bin/env python3
 import argparse
+import itertools
 import json
 import os
 import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
 
+import redis
 import requests
 from dotenv import load_dotenv
+from manifest import SOLR, content_hash, deleted_verses, manifest_key
+from requests.adapters import HTTPAdapter
 
 
-def post_to_solr(json_file, solr_url, collection):
+def redis_connection():
+    """Connection to the local Redis server"""
+    return redis.Redis(
+        host="localhost",
+        port=6379,
+        db=0,
+        password=os.getenv("REDIS_PASS"),
+        decode_responses=True,  # Automatically decode responses to strings
+    )
+
+
+def bump_revision(hash_prefix):
     """
-    Post JSON documents to a Solr collection
+    Bump the translation's data revision so workers drop cached responses
+
+    Args:
+        hash_prefix (str): Translation prefix, e.g. 'nasb95'
+    """
+    try:
+        redis_connection().hincrby(hash_prefix, "revision", 1)
+    except redis.ConnectionError as e:
+        print(f"Could not bump the data revision: {e}", file=sys.stderr)
+
+
+class Changes:
+    """
+    Filter documents down to those that changed since they were last posted
+
+    Compares each document against the content hashes in the translation's
+    Solr manifest as the documents stream past, remembering every id seen
+    so the deleted ones can be worked out at the end.
+    """
+
+    def __init__(self, manifest, prune=False):
+        self.manifest = manifest
+        self.prune = prune
+        self.hashes = {}
+        self.changed = []
+
+    def filter(self, docs):
+        """Yield only the added or changed documents"""
+        for doc in docs:
+            digest = content_hash(json.dumps(doc, sort_keys=True, ensure_ascii=False))
+            self.hashes[doc["id"]] = digest
+            if self.manifest.get(doc["id"]) != digest:
+                self.changed.append(doc["id"])
+                yield doc
+
+    def deleted(self):
+        """Ids of documents no longer in the input"""
+        return deleted_verses(self.manifest, self.hashes, self.prune)
+
+
+def delete_documents(ids, solr_url, collection, batch_size=1000, commit_within=None):
+    """
+    Delete documents from a Solr collection by id
+
+    Returns:
+        bool: True if operation was successful, False otherwise
+    """
+    update_url = f"{solr_url}/{collection}/update"
+    auth = (os.getenv("SOLR_USER"), os.getenv("SOLR_PASS"))
+    params = {"commitWithin": commit_within} if commit_within else {"commit": "true"}
+    with requests.Session() as session:
+        for batch in iter_batches(ids, batch_size):
+            try:
+                response = session.post(
+                    update_url,
+                    data=json.dumps({"delete": batch}).encode("utf-8"),
+                    params=params,
+                    headers={"Content-type": "application/json"},
+                    auth=auth,
+                    timeout=120,
+                )
+            except requests.RequestException as e:
+                print(f"Error deleting documents: {e}", file=sys.stderr)
+                return False
+            if response.status_code != 200:
+                print(f"Error deleting documents: {response.text}", file=sys.stderr)
+                return False
+    print(f"Deleted {len(ids)} documents from Solr")
+    return True
+
+
+def post_changes(json_file, solr_url, collection, hash_prefix, prune=False, **kwargs):
+    """
+    Post only the documents added or changed since the last run, and delete
+    those that are gone
+
+    The translation's Solr manifest (content hashes by document id, kept in
+    Redis) is only updated once Solr has taken the changes, so a failed run
+    is simply redone.
+
+    Args:
+        json_file (str): Path to the JSON or JSON Lines file containing documents
+        solr_url (str): Base URL of the Solr instance
+        collection (str): Name of the Solr collection
+        hash_prefix (str): Translation the documents belong to
+        prune (bool): The input is the whole translation, so documents missing
+            from it are deleted wherever they are
+        **kwargs: Batching options passed to post_documents
+
+    Returns:
+        tuple: (success, whether anything changed)
+    """
+    r = redis_connection()
+    key = manifest_key(hash_prefix, SOLR)
+    changes = Changes(r.hgetall(key), prune)
+
+    if not post_to_solr(
+        json_file, solr_url, collection, select=changes.filter, **kwargs
+    ):
+        return False, False
+    deleted = changes.deleted()
+    if deleted and not delete_documents(
+        deleted,
+        solr_url,
+        collection,
+        batch_size=kwargs.get("batch_size", 1000),
+        commit_within=kwargs.get("commit_within"),
+    ):
+        return False, False
+
+    pipe = r.pipeline(transaction=False)
+    if changes.changed:
+        pipe.hset(
+            key, mapping={doc_id: changes.hashes[doc_id] for doc_id in changes.changed}
+        )
+    if deleted:
+        pipe.hdel(key, *deleted)
+    pipe.execute()
+    print(f"{len(changes.changed)} documents changed, {len(deleted)} deleted")
+    return True, bool(changes.changed or deleted)
+
+
+def iter_batches(docs, batch_size):
+    """Yield lists of at most batch_size documents from any iterable"""
+    docs = iter(docs)
+    while True:
+        batch = list(itertools.islice(docs, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def post_batch(session, update_url, batch, auth, commit_within=None):
+    """
+    Post one batch of documents to Solr in a single request
+
+    Returns:
+        str: None on success, otherwise the error message
+    """
+    params = {"commitWithin": commit_within} if commit_within else None
+    try:
+        response = session.post(
+            update_url,
+            data=json.dumps(batch, ensure_ascii=False).encode("utf-8"),
+            params=params,
+            headers={"Content-type": "application/json"},
+            auth=auth,
+            timeout=120,
+        )
+    except requests.RequestException as e:
+        return str(e)
+
+    if response.status_code != 200:
+        return response.text
+    return None
+
+
+def post_documents(
+    docs,
+    solr_url,
+    collection,
+    batch_size=1000,
+    workers=1,
+    commit_within=None,
+    retries=3,
+):
+    """
+    Stream documents to a Solr collection in batches
 
     Args:
-        json_file (str): Path to the JSON file containing documents
+        docs (iterable): Documents to index
         solr_url (str): Base URL of the Solr instance (e.g., 'http://localhost:8983/solr')
         collection (str): Name of the Solr collection
+        batch_size (int): Documents per update request
+        workers (int): Batches posted concurrently
+        commit_within (int, optional): Let Solr commit within this many ms
+            instead of issuing a blocking commit at the end
+        retries (int): Times a failed batch is re-posted before giving up
 
     Returns:
         bool: True if operation was successful, False otherwise
     """
-    # Construct the full Solr update URL
     update_url = f"{solr_url}/{collection}/update/json/docs"
     auth = (os.getenv("SOLR_USER"), os.getenv("SOLR_PASS"))
 
-    try:
-        # Read the JSON file
-        with open(json_file, "r", encoding="utf-8") as f:
-            data = json.load(f)
+    # one pooled session, so batches reuse kept-alive connections
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_maxsize=workers))
+    session.mount("https://", HTTPAdapter(pool_maxsize=workers))
 
-        # If data is a list, we'll post each document individually
-        if isinstance(data, list):
-            print(f"Posting {len(data)} documents to Solr...")
+    start = time.perf_counter()
+    posted = 0
+    failed = []
 
-            # Set up the headers
-            headers = {"Content-type": "application/json"}
+    def post(batch):
+        return batch, post_batch(session, update_url, batch, auth, commit_within)
 
-            # Post each document
-            for i, doc in enumerate(data):
-                response = requests.post(
-                    update_url, json=doc, headers=headers, auth=auth
-                )
+    def collect(future):
+        nonlocal posted
+        batch, error = future.result()
+        if error:
+            print(f"Error posting batch: {error}", file=sys.stderr)
+            failed.append(batch)
+        else:
+            posted += len(batch)
+            print(f"Posted {posted} documents...")
 
-                if response.status_code != 200:
-                    print(
-                        f"Error posting document {i+1}: {response.text}",
-                        file=sys.stderr,
-                    )
-                    return False
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for batch in iter_batches(docs, batch_size):
+            # keep at most two batches per worker in memory
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    collect(future)
+            pending.add(pool.submit(post, batch))
+        for future in pending:
+            collect(future)
 
-                if (i + 1) % 100 == 0:
-                    print(f"Posted {i+1} documents...")
+    # retry only the batches that failed
+    for attempt in range(1, retries + 1):
+        if not failed:
+            break
+        time.sleep(2 ** (attempt - 1))
+        print(f"Retrying {len(failed)} failed batches (attempt {attempt})...")
+        batches, failed = failed, []
+        for batch in batches:
+            error = post_batch(session, update_url, batch, auth, commit_within)
+            if error:
+                print(f"Error posting batch: {error}", file=sys.stderr)
+                failed.append(batch)
+            else:
+                posted += len(batch)
 
-            # Commit the changes
-            commit_url = f"{solr_url}/{collection}/update"
-            response = requests.get(f"{commit_url}?commit=true", auth=auth)
+    if failed:
+        print(
+            f"Gave up on {sum(len(batch) for batch in failed)} documents",
+            file=sys.stderr,
+        )
+        return False
 
-            if response.status_code != 200:
-                print(f"Error committing changes: {response.text}", file=sys.stderr)
-                return False
+    if not commit_within:
+        # Commit the changes
+        commit_url = f"{solr_url}/{collection}/update"
+        response = session.get(f"{commit_url}?commit=true", auth=auth)
 
-            print(f"Successfully posted {len(data)} documents to Solr")
-            return True
-        else:
-            # If data is a single document
-            print("Posting single document to Solr...")
+        if response.status_code != 200:
+            print(f"Error committing changes: {response.text}", file=sys.stderr)
+            return False
 
-            # Set up the headers
-            headers = {"Content-type": "application/json"}
+    elapsed = time.perf_counter() - start
+    print(
+        f"Successfully posted {posted} documents to Solr "
+        f"in {elapsed:.1f}s ({posted / elapsed if elapsed else 0:.0f} docs/sec)"
+    )
+    return True
 
-            # Post the document
-            response = requests.post(update_url, json=data, headers=headers, auth=auth)
 
-            if response.status_code != 200:
-                print(f"Error posting document: {response.text}", file=sys.stderr)
-                return False
+def iter_json_lines(f):
+    """Yield one document per non-empty line of a JSON Lines stream"""
+    for line in f:
+        if line.strip():
+            yield json.loads(line)
 
-            # Commit the changes
-            commit_url = f"{solr_url}/{collection}/update"
-            response = requests.get(f"{commit_url}?commit=true", auth=auth)
 
-            if response.status_code != 200:
-                print(f"Error committing changes: {response.text}", file=sys.stderr)
-                return False
+def post_to_solr(json_file, solr_url, collection, select=None, **kwargs):
+    """
+    Post JSON documents to a Solr collection
+
+    JSON Lines input (``-`` for stdin, or a ``.jsonl`` file) is streamed
+    straight through to Solr, so memory use stays flat whatever its size.
 
-            print("Successfully posted document to Solr")
-            return True
+    Args:
+        json_file (str): Path to the JSON or JSON Lines file containing documents
+        solr_url (str): Base URL of the Solr instance (e.g., 'http://localhost:8983/solr')
+        collection (str): Name of the Solr collection
+        select (callable, optional): Filter applied to the stream of documents
+        **kwargs: Batching options passed to post_documents
+
+    Returns:
+        bool: True if operation was successful, False otherwise
+    """
+    if select is None:
+        select = iter
+    try:
+        if json_file == "-":
+            print("Posting documents from stdin to Solr...")
+            return post_documents(
+                select(iter_json_lines(sys.stdin)), solr_url, collection, **kwargs
+            )
+
+        if json_file.endswith(".jsonl"):
+            print(f"Posting documents from {json_file} to Solr...")
+            with open(json_file, "r", encoding="utf-8") as f:
+                return post_documents(
+                    select(iter_json_lines(f)), solr_url, collection, **kwargs
+                )
+
+        # Read the JSON file
+        with open(json_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        # a file may also hold a single document
+        if not isinstance(data, list):
+            data = [data]
+
+        print(f"Posting {len(data)} documents to Solr...")
+        return post_documents(select(data), solr_url, collection, **kwargs)
 
     except Exception as e:
         print(f"Error: {str(e)}", file=sys.stderr)
@@ -96,7 +345,10 @@ def post_to_solr(json_file, solr_url, collection):
 def main():
     # Set up argument parser
     parser = argparse.ArgumentParser(description="Post JSON documents to Solr")
-    parser.add_argument("json_file", help="Path to the JSON file containing documents")
+    parser.add_argument(
+        "json_file",
+        help="Path to the JSON/JSON Lines file containing documents, or - for stdin",
+    )
     parser.add_argument(
         "-u",
         "--url",
@@ -106,22 +358,82 @@ def main():
     parser.add_argument(
         "-c", "--collection", required=True, help="Name of the Solr collection"
     )
+    parser.add_argument(
+        "-b",
+        "--batch-size",
+        type=int,
+        default=1000,
+        help="Documents per update request (default: 1000)",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=1,
+        help="Batches posted concurrently (default: 1)",
+    )
+    parser.add_argument(
+        "--commit-within",
+        type=int,
+        help="Let Solr commit within this many ms instead of a blocking commit",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=3,
+        help="Times a failed batch is retried (default: 3)",
+    )
+    parser.add_argument(
+        "--prefix",
+        default="nasb95",
+        help="Translation whose cached search responses to invalidate",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only post documents added or changed since the last run, and "
+        "delete those gone from the chapters the input covers",
+    )
+    parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="With --incremental, the input is the whole translation: delete "
+        "every document missing from it",
+    )
 
     # Parse arguments
     args = parser.parse_args()
     load_dotenv()
 
     # Check if the JSON file exists
-    if not Path(args.json_file).is_file():
+    if args.json_file != "-" and not Path(args.json_file).is_file():
         print(f"Error: JSON file '{args.json_file}' not found", file=sys.stderr)
         sys.exit(1)
 
+    options = {
+        "batch_size": args.batch_size,
+        "workers": args.workers,
+        "commit_within": args.commit_within,
+        "retries": args.retries,
+    }
+
     # Post the documents to Solr
-    success = post_to_solr(
-        args.json_file,
-        args.url,
-        args.collection,
-    )
+    if args.incremental:
+        success, changed = post_changes(
+            args.json_file,
+            args.url,
+            args.collection,
+            args.prefix,
+            prune=args.prune,
+            **options,
+        )
+    else:
+        success = changed = post_to_solr(
+            args.json_file, args.url, args.collection, **options
+        )
+
+    if success and changed:
+        bump_revision(args.prefix)
 
     # Exit with appropriate status code
     sys.exit(0 if success else 1)
@@ -0,0 +1,54 @@
+import hashlib
+
+# manifests of what each pipeline last wrote, {prefix}:manifest:{target}
+REDIS = "redis"
+SOLR = "solr"
+
+
+def manifest_key(hash_prefix, target):
+    """
+    Redis hash holding a pipeline's manifest for a translation
+
+    The manifest maps each verse to the content hash of what the pipeline
+    last wrote for it: ``luk:1:1`` for the verse hashes bible_to_redis.py
+    writes, the document id for what doc_to_solr.py posts.
+
+    Args:
+        hash_prefix (str): Translation prefix, e.g. 'nasb95'
+        target (str): REDIS or SOLR
+    """
+    return f"{hash_prefix}:manifest:{target}"
+
+
+def content_hash(text):
+    """Short, stable hash of a verse's content"""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def chapter_of(verse):
+    """The chapter part of a verse key or document id, e.g. 'luk:1' of 'luk:1:5'"""
+    return verse.rsplit(":", 1)[0]
+
+
+def deleted_verses(manifest, seen, prune=False):
+    """
+    Verses in a manifest that are no longer in the input
+
+    An input may hold a single chapter, so unless ``prune`` is set only
+    verses of the chapters it covers count as deleted.
+
+    Args:
+        manifest (dict): Verse to content hash, as last written
+        seen (iterable): Verses in the input
+        prune (bool): The input is the whole translation
+
+    Returns:
+        list: Verses to delete
+    """
+    seen = set(seen)
+    chapters = {chapter_of(verse) for verse in seen}
+    return [
+        verse
+        for verse in manifest
+        if verse not in seen and (prune or chapter_of(verse) in chapters)
+    ]
@@ -93,8 +93,11 @@ def print_tree(redis_client, tree, depth=0, separator=":", path=None):
         current_path = path + [key_part]
         full_key = separator.join(current_path)
 
-        # Get node data from Redis
-        node_data = redis_client.hgetall(full_key)
+        # Get node data from Redis; indexes (canon list, concordance sets)
+        # aren't tree nodes
+        node_data = {}
+        if redis_client.type(full_key) == "hash":
+            node_data = redis_client.hgetall(full_key)
 
         # Print node information with indentation based on depth
         indent = "  " * depth
@@ -6,22 +6,26 @@ import redis
 from dotenv import load_dotenv
 
 
-def csv_to_redis_hash(hash_prefix="nasb95"):
+def csv_to_redis_hash(hash_prefix="nasb95", name="NASB 95 Translation", r=None):
     """
     insert each row as a Redis hash.
 
     Args:
         hash_prefix (str): Prefix for Redis hash keys
+        name (str): Display name of the translation
+        r (redis.Redis, optional): Connection to load into instead of the
+            local Redis server
     """
 
     # Connect to Redis
-    r = redis.Redis(
-        host="localhost",
-        port=6379,
-        db=0,
-        password=os.getenv("REDIS_PASS"),
-        decode_responses=True,  # Automatically decode responses to strings
-    )
+    if r is None:
+        r = redis.Redis(
+            host="localhost",
+            port=6379,
+            db=0,
+            password=os.getenv("REDIS_PASS"),
+            decode_responses=True,  # Automatically decode responses to strings
+        )
 
     # Check connection
     try:
@@ -31,7 +35,7 @@ def csv_to_redis_hash(hash_prefix="nasb95"):
         print(f"Failed to connect to Redis: {e}")
         return
 
-    r.hset(hash_prefix, mapping={"name": hash_prefix, "data": "NASB 95 Translation"})
+    r.hset(hash_prefix, mapping={"name": hash_prefix, "data": name})
 
     book_map = [
         {"genesis": "gen"},
@@ -109,17 +113,36 @@ def csv_to_redis_hash(hash_prefix="nasb95"):
         )
         count += 1
 
+    # the whole table in one hash plus the canonical order, so workers can
+    # load it in a single round trip instead of scanning the books:* keys
+    pipe = r.pipeline()
+    pipe.delete(f"{hash_prefix}:books", f"{hash_prefix}:canon")
+    pipe.hset(
+        f"{hash_prefix}:books",
+        mapping={name: code for book in book_map for name, code in book.items()},
+    )
+    pipe.rpush(
+        f"{hash_prefix}:canon", *[code for book in book_map for code in book.values()]
+    )
+    # book names are in the verse JSON, so the verse store goes stale too
+    pipe.hincrby(hash_prefix, "text_revision", 1)
+    pipe.hincrby(hash_prefix, "revision", 1)
+    pipe.execute()
+
     print(f"Import complete. Processed {count} rows.")
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Import CSV data to Redis hashes")
     parser.add_argument("--prefix", default="nasb95", help="Prefix for Redis hash keys")
+    parser.add_argument(
+        "--name", default="NASB 95 Translation", help="Display name of the translation"
+    )
 
     args = parser.parse_args()
     load_dotenv()
 
     try:
-        csv_to_redis_hash(hash_prefix=args.prefix)
+        csv_to_redis_hash(hash_prefix=args.prefix, name=args.name)
     except Exception as e:
         print(f"Error: {e}")
@@ -52,6 +52,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # first, so it times everything below it
+    "bible.middleware.request_metrics",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -108,10 +110,89 @@ CACHES = {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
             "PASSWORD": os.getenv("REDIS_PASS"),
             "CONNECTION_POOL_KWARGS": {"decode_responses": True},
+            "REDIS_CLIENT_CLASS": "bible.utilities.metrics.InstrumentedRedis",
         },
-    }
+    },
+    # cached /ll/search/ responses; raw bytes, so no decode_responses here
+    "search": {
+        "BACKEND": "django_redis.cache.RedisCache",
+        "LOCATION": "redis://localhost:6379/0",
+        "KEY_PREFIX": "search",
+        "TIMEOUT": 300,
+        "OPTIONS": {
+            "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            "PASSWORD": os.getenv("REDIS_PASS"),
+            "REDIS_CLIENT_CLASS": "bible.utilities.metrics.InstrumentedRedis",
+        },
+    },
 }
 
+# Per-worker tier in front of the "search" cache, and the Cache-Control
+# max-age sent so nginx can cache responses too
+SEARCH_CACHE = {
+    "ENABLED": True,
+    "LOCAL_SIZE": 1024,
+    "LOCAL_TIMEOUT": 60,
+    "MAX_AGE": 60,
+}
+
+# Full-text search of the verses collection.  POOL_SIZE is the number of
+# kept-alive connections per worker and should cover the gunicorn threads.
+SOLR = {
+    "URL": "http://localhost:8983/solr/verses/",
+    "TIMEOUT": 10,
+    "POOL_SIZE": 10,
+    "USER": os.getenv("SOLR_USER"),
+    "PASSWORD": os.getenv("SOLR_PASS"),
+}
+
+# Full-text engine: "solr", "local" (the embedded index only, for small
+# deployments) or "fallback" (Solr, with the embedded index answering while
+# Solr errors or misses its BUDGET in seconds; FAILURES such misses in a row
+# open the circuit for RESET seconds).  Indexes are built per translation
+# with "manage.py build_fulltext".
+FULLTEXT = {
+    "MODE": os.getenv("LAMPLIGHT_FULLTEXT", "solr"),
+    "PATH": BASE_DIR / "fulltext" / "{translation}.idx",
+    "BUDGET": 0.5,
+    "FAILURES": 5,
+    "RESET": 30,
+}
+
+# Memory-mapped verse text per translation, built after each load with
+# "manage.py build_verse_store"; searches read verses from it instead of
+# Redis while it matches the translation's revision
+VERSE_STORE = {
+    "ENABLED": os.getenv("LAMPLIGHT_VERSE_STORE", "1") == "1",
+    "PATH": BASE_DIR / "versestore" / "{translation}.vs",
+}
+
+# /ll/navigate/ reads whole chapters through a per-worker LRU of
+# CACHE_SIZE chapters kept for CACHE_TIMEOUT seconds, and with PREFETCH
+# reads the chapters either side into it in the background after each page
+NAVIGATION = {
+    "CACHE_SIZE": 512,
+    "CACHE_TIMEOUT": 300,
+    "PREFETCH": True,
+}
+
+# Translations that can be picked with ?v=; each is loaded under its own
+# prefix by the ingest scripts' --prefix option
+BIBLE_TRANSLATIONS = ["nasb95"]
+BIBLE_DEFAULT_TRANSLATION = "nasb95"
+
+# Serve /ll/search/ with the async view; asgi.py turns this on so ASGI
+# workers don't run the blocking view in a thread
+ASYNC_VIEWS = os.getenv("LAMPLIGHT_ASYNC_VIEWS") == "1"
+
+# How often (seconds) a worker re-checks the data revision of its in-memory
+# bible indexes (book names, ...) against Redis
+BIBLE_INDEX_REFRESH_SECONDS = 30
+
+# Build those indexes when the app loads, for a gunicorn master with
+# preload_app to share with its workers; gunicorn.conf.py turns this on
+BIBLE_PRELOAD = os.getenv("LAMPLIGHT_PRELOAD") == "1"
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -0,0 +1,33 @@
+"""
+API-only settings for the gunicorn workers serving /ll/.
+
+Everything in ``settings`` minus what the search API never touches: the
+admin, auth, sessions, messages and static files apps, their middleware
+(CSRF included; nothing here takes a form post) and the MySQL backend.
+Workers start faster and smaller without them.  Run the admin, migrations
+and management commands with the full ``lamplight.settings``.
+
+Select it with ``DJANGO_SETTINGS_MODULE=lamplight.settings_api``.
+"""
+
+from .settings import *  # noqa: F401,F403 pylint: disable=wildcard-import,unused-wildcard-import
+
+INSTALLED_APPS = [
+    "bible",
+]
+
+MIDDLEWARE = [
+    # first, so it times everything below it
+    "bible.middleware.request_metrics",
+    "django.middleware.security.SecurityMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+]
+
+ROOT_URLCONF = "lamplight.urls_api"
+
+# the API only answers JSON
+TEMPLATES = []
+
+# no database: any query fails loudly instead of opening a MySQL connection
+DATABASES = {}
@@ -0,0 +1,7 @@
+"""URL configuration for the API-only settings: the Bible app without the admin."""
+
+from django.urls import include, path
+
+urlpatterns = [
+    path("ll/", include("bible.urls")),
+]